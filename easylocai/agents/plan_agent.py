@@ -1,20 +1,50 @@
 import logging
+import re
+from typing import Literal
 
 from ollama import AsyncClient
 from pydantic import BaseModel
 
 from easylocai.core.agent import Agent
+from easylocai.core.metrics import get_metrics_registry
 from easylocai.llm_calls.planner import Planner, PlannerInput, PlannerOutput
 from easylocai.llm_calls.query_reformatter import (
     QueryReformatter,
     QueryReformatterInput,
     QueryReformatterOutput,
 )
+from easylocai.llm_calls.reformat_planner import (
+    ReformatPlanner,
+    ReformatPlannerInput,
+    ReformatPlannerOutput,
+)
+from easylocai.llm_calls.task_graph_planner import (
+    TaskGraphPlanner,
+    TaskGraphPlannerOutput,
+)
 from easylocai.schemas.common import UserConversation
 from easylocai.schemas.context import WorkflowContext
 
 logger = logging.getLogger(__name__)
 
+# off: always QueryReformatter then Planner.
+# skip: plan short queries directly when there is nothing to de-reference.
+# combined: short queries are reformatted and planned in one ReformatPlanner call.
+#           With task graph planning this behaves like skip.
+# Longer queries keep both calls in either mode, so the reformatter can extract their preamble.
+FastPlanMode = Literal["off", "skip", "combined"]
+
+# Words that usually refer back to an earlier turn
+_ANAPHORA_PATTERN = re.compile(
+    r"\b(it|its|it's|this|that|these|those|they|them|their|he|him|his|she|her"
+    r"|above|previous|previously|earlier|former|latter|same|again|one|ones)\b",
+    re.IGNORECASE,
+)
+
+
+def has_anaphora(query: str) -> bool:
+    return _ANAPHORA_PATTERN.search(query) is not None
+
 
 class PlanAgentInput(BaseModel):
     workflow_context: WorkflowContext
@@ -24,15 +54,57 @@ class PlanAgentOutput(BaseModel):
     query_context: str | None
     reformatted_user_query: str
     task_list: list[str]
+    # Per task, the indices of earlier tasks it depends on. None unless planned as a task graph.
+    task_dependencies: list[list[int]] | None = None
 
 
 class PlanAgent(Agent[PlanAgentInput, PlanAgentOutput]):
-    def __init__(self, *, client: AsyncClient):
+    def __init__(
+        self,
+        *,
+        client: AsyncClient,
+        plan_task_graph: bool = False,
+        fast_plan: FastPlanMode = "off",
+        fast_plan_max_query_chars: int = 300,
+    ):
         self._ollama_client = client
+        self._reformatter = QueryReformatter(client=client)
+        self._planner = Planner(client=client)
+        self._task_graph_planner = TaskGraphPlanner(client=client) if plan_task_graph else None
+        self._fast_plan = fast_plan
+        self._fast_plan_max_query_chars = fast_plan_max_query_chars
+        # The combined schema has no dependency edges, so task graph planning always uses the planner
+        self._reformat_planner = (
+            ReformatPlanner(client=client)
+            if fast_plan == "combined" and not plan_task_graph
+            else None
+        )
+
+    def _needs_reformatting(self, ctx: WorkflowContext) -> bool:
+        if self._fast_plan == "off":
+            return True
+        return bool(ctx.conversation_histories) and has_anaphora(ctx.original_user_query)
 
     async def _run(self, input_: PlanAgentInput) -> PlanAgentOutput:
         ctx = input_.workflow_context
 
+        # Long queries are where preambles (query_context) are worth a dedicated reformatter call;
+        # skipping it would drop their facts
+        if (
+            not self._needs_reformatting(ctx)
+            and len(ctx.original_user_query) <= self._fast_plan_max_query_chars
+        ):
+            if self._reformat_planner is None:
+                get_metrics_registry().increment("fast_plan.skipped")
+                return await self._plan(
+                    ctx, reformed_query=ctx.original_user_query, query_context=None
+                )
+            get_metrics_registry().increment("fast_plan.combined")
+            return await self._reformat_and_plan(ctx)
+
+        if self._fast_plan != "off":
+            get_metrics_registry().increment("fast_plan.full")
+
         previous_conversations = [
             UserConversation(
                 user_query=h.original_user_query,
@@ -45,19 +117,52 @@ class PlanAgent(Agent[PlanAgentInput, PlanAgentOutput]):
             user_query=ctx.original_user_query,
             previous_conversations=previous_conversations,
         )
-        reformatter: QueryReformatter = QueryReformatter(client=self._ollama_client)
-        reformatter_output: QueryReformatterOutput = await reformatter.call(reformatter_input)
+        reformatter_output: QueryReformatterOutput = await self._reformatter.call(
+            reformatter_input
+        )
 
-        planner_input = PlannerInput(
-            user_query=reformatter_output.reformed_query,
+        return await self._plan(
+            ctx,
+            reformed_query=reformatter_output.reformed_query,
             query_context=reformatter_output.query_context,
+        )
+
+    async def _plan(
+        self, ctx: WorkflowContext, *, reformed_query: str, query_context: str | None
+    ) -> PlanAgentOutput:
+        planner_input = PlannerInput(
+            user_query=reformed_query,
+            query_context=query_context,
             conversation_histories=ctx.conversation_histories,
         )
-        planner = Planner(client=self._ollama_client)
-        planner_output: PlannerOutput = await planner.call(planner_input)
+        if self._task_graph_planner is not None:
+            task_graph_output: TaskGraphPlannerOutput = await self._task_graph_planner.call(
+                planner_input
+            )
+            return PlanAgentOutput(
+                query_context=query_context,
+                reformatted_user_query=reformed_query,
+                task_list=[t.task for t in task_graph_output.tasks],
+                task_dependencies=[t.depends_on for t in task_graph_output.tasks],
+            )
+
+        planner_output: PlannerOutput = await self._planner.call(planner_input)
 
         return PlanAgentOutput(
-            query_context=reformatter_output.query_context,
-            reformatted_user_query=reformatter_output.reformed_query,
+            query_context=query_context,
+            reformatted_user_query=reformed_query,
             task_list=planner_output.tasks,
         )
+
+    async def _reformat_and_plan(self, ctx: WorkflowContext) -> PlanAgentOutput:
+        output: ReformatPlannerOutput = await self._reformat_planner.call(
+            ReformatPlannerInput(
+                user_query=ctx.original_user_query,
+                conversation_histories=ctx.conversation_histories,
+            )
+        )
+        return PlanAgentOutput(
+            query_context=output.query_context,
+            reformatted_user_query=output.reformed_query,
+            task_list=output.tasks,
+        )
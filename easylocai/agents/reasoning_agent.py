@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field
 
 from easylocai.core.agent import Agent
 from easylocai.core.contants import DEFAULT_LLM_MODEL
+from easylocai.core.think_policy import ThinkPolicy, think_param
 from easylocai.llm_calls.reasoning import Reasoning, ReasoningInput, ReasoningOutput
 from easylocai.schemas.context import ConversationHistory
 
@@ -18,6 +19,10 @@ class ReasoningAgentInput(BaseModel):
     previous_task_results: list[dict]
     previous_subtask_results: list[dict] = Field(default_factory=list)
     conversation_histories: list[ConversationHistory] = Field(default_factory=list)
+    # Signals that the subtask is hard: the confidence of the task's previous reasoning answer and
+    # the number of its subtasks that failed so far
+    previous_confidence: int | None = None
+    failures: int = 0
 
 
 class ReasoningAgentOutput(BaseModel):
@@ -34,8 +39,10 @@ class ReasoningAgent(Agent[ReasoningAgentInput, ReasoningAgentOutput]):
     ):
         self._ollama_client = client
         self._model = DEFAULT_LLM_MODEL
+        self._reasoning = Reasoning(client=client)
+        self._think_policy = ThinkPolicy()
 
-    async def run(self, input_: ReasoningAgentInput) -> ReasoningAgentOutput:
+    async def _run(self, input_: ReasoningAgentInput) -> ReasoningAgentOutput:
         reasoning_input = ReasoningInput(
             original_task=input_.original_task,
             subtask=input_.task["description"],
@@ -44,11 +51,31 @@ class ReasoningAgent(Agent[ReasoningAgentInput, ReasoningAgentOutput]):
             previous_subtask_results=input_.previous_subtask_results,
             conversation_histories=input_.conversation_histories,
         )
-        reasoning = Reasoning(client=self._ollama_client)
-        # TODO: adjust think time based on task complexity
-        reasoning_output: ReasoningOutput = await reasoning.call(
-            reasoning_input, think="medium"
+        level = self._think_policy.choose(
+            Reasoning.__name__,
+            default=Reasoning.default_think,
+            text=reasoning_input.subtask,
+            failures=input_.failures,
+            previous_confidence=input_.previous_confidence,
         )
+        reasoning_output: ReasoningOutput = await self._reasoning.call(
+            reasoning_input, think=think_param(level)
+        )
+
+        for _ in range(self._think_policy.max_escalations):
+            if not self._think_policy.is_low_confidence(reasoning_output.confidence):
+                break
+            level = self._think_policy.escalate(level)
+            if level is None:
+                break
+            logger.info(
+                f"Low confidence ({reasoning_output.confidence}), retrying reasoning with think={level}"
+            )
+            escalated_output: ReasoningOutput = await self._reasoning.call(
+                reasoning_input, think=think_param(level)
+            )
+            if escalated_output.confidence >= reasoning_output.confidence:
+                reasoning_output = escalated_output
 
         response = ReasoningAgentOutput(**reasoning_output.model_dump())
 
@@ -1,9 +1,10 @@
 import logging
+from typing import AsyncIterator
 
 from ollama import AsyncClient
 from pydantic import BaseModel
 
-from easylocai.core.agent import Agent
+from easylocai.core.agent import Agent, AgentStreamEvent
 from easylocai.llm_calls.replanner import Replanner, ReplannerInput, ReplannerOutput
 from easylocai.schemas.context import WorkflowContext
 
@@ -22,8 +23,11 @@ class ReplanAgentOutput(BaseModel):
 class ReplanAgent(Agent[ReplanAgentInput, ReplanAgentOutput]):
     def __init__(self, *, client: AsyncClient):
         self._ollama_client = client
+        self._replanner = Replanner(client=client)
 
-    async def _run(self, input_: ReplanAgentInput) -> ReplanAgentOutput:
+    async def _run_stream(
+        self, input_: ReplanAgentInput
+    ) -> AsyncIterator[AgentStreamEvent[ReplanAgentOutput]]:
         ctx = input_.workflow_context
 
         task_results = [
@@ -39,12 +43,20 @@ class ReplanAgent(Agent[ReplanAgentInput, ReplanAgentOutput]):
             conversation_histories=ctx.conversation_histories,
         )
 
-        replanner = Replanner(client=self._ollama_client)
-        replanner_output: ReplannerOutput = await replanner.call(replanner_input)
+        replanner_output: ReplannerOutput | None = None
+        async for event in self._replanner.call_stream(replanner_input):
+            if event.type == "field" and event.field == "tasks" and event.value:
+                # Show the next task while the replanner is still writing the rest of its output
+                yield AgentStreamEvent(type="status", message=event.value[0])
+            elif event.type == "output":
+                replanner_output = event.output
 
         logger.debug(f"ReplanAgent output: {replanner_output}")
 
-        return ReplanAgentOutput(
-            tasks=replanner_output.tasks,
-            response=replanner_output.response,
+        yield AgentStreamEvent(
+            type="output",
+            output=ReplanAgentOutput(
+                tasks=replanner_output.tasks,
+                response=replanner_output.response,
+            ),
         )
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Any
+from typing import Any, AsyncIterator, Literal
 
 from ollama import AsyncClient
 from pydantic import BaseModel, ValidationError
@@ -9,7 +10,10 @@ from easylocai.agents.reasoning_agent import (
     ReasoningAgentInput,
     ReasoningAgentOutput,
 )
-from easylocai.core.agent import Agent
+from easylocai.core.agent import Agent, AgentStreamEvent
+from easylocai.core.llm_call import LLMStreamEvent
+from easylocai.core.metrics import get_metrics_registry
+from easylocai.core.result_prefilter import SubtaskResultPrefilter
 from easylocai.core.tool_manager import ToolManager
 from easylocai.llm_calls.subtask_result_filter import (
     SubtaskResultFilter,
@@ -19,12 +23,22 @@ from easylocai.llm_calls.task_result_filter import (
     TaskResultFilter,
     TaskResultFilterInput,
 )
-from easylocai.llm_calls.task_router import TaskRouter, TaskRouterInput, TaskRouterOutput
+from easylocai.llm_calls.task_router import (
+    Subtask,
+    TaskRouter,
+    TaskRouterInput,
+    TaskRouterOutput,
+    TaskRouterOutputV2,
+    TaskRouterV2,
+)
 from easylocai.llm_calls.tool_selector import (
     ToolInput,
     ToolSelector,
     ToolSelectorInput,
+    ToolSelectorInputV2,
     ToolSelectorOutput,
+    ToolSelectorOutputV2,
+    ToolSelectorV2,
 )
 from easylocai.schemas.context import ConversationHistory, SingleTaskAgentContext, SubtaskResult
 
@@ -36,33 +50,204 @@ class SingleTaskAgentOutput(BaseModel):
     result: str
 
 
+SpeculationMode = Literal["off", "prefetch", "route"]
+
+# Context fields the first routing step depends on; speculative work is reused only if they match.
+_SPECULATION_KEY_FIELDS = {
+    "original_task",
+    "query_context",
+    "conversation_histories",
+    "executed_task_results",
+}
+
+
+class TaskPrefetch(BaseModel):
+    """Work for a task done ahead of time, while the replanner was still deciding on it."""
+
+    tool_candidates: list[dict]
+    first_route: TaskRouterOutput | None = None
+
+
 class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
     N_TOOL_RESULTS = 18
 
-    def __init__(self, *, client: AsyncClient, tool_manager: ToolManager):
+    def __init__(
+        self,
+        *,
+        client: AsyncClient,
+        tool_manager: ToolManager,
+        parallel_subtasks: bool = False,
+        prefilter_subtask_results: bool = True,
+        speculation: SpeculationMode = "off",
+    ):
         self._ollama_client = client
         self._tool_manager = tool_manager
+        self._parallel_subtasks = parallel_subtasks
+        # LLM calls keep no per-call state, so one instance of each serves every iteration and the
+        # concurrent subtasks of the parallel path.
+        self._task_router = TaskRouter(client=client)
+        self._tool_selector = ToolSelector(client=client)
+        if parallel_subtasks:
+            self._task_router_v2 = TaskRouterV2(client=client)
+            self._tool_selector_v2 = ToolSelectorV2(client=client)
+        self._subtask_result_filter = SubtaskResultFilter(client=client)
+        self._result_prefilter = SubtaskResultPrefilter() if prefilter_subtask_results else None
+        self._task_result_filter = TaskResultFilter(client=client)
+        self._reasoning_agent = ReasoningAgent(client=client)
 
-    async def _run(self, input_: SingleTaskAgentContext) -> SingleTaskAgentOutput:
-        ctx = input_
+        self._speculation_mode = speculation
+        self._speculation: tuple[str, asyncio.Task[TaskPrefetch]] | None = None
+        # Speculative routing must not delay the replanner it overlaps with.
+        # The parallel subtask path routes with TaskRouterV2, so only tool candidates are prefetched there.
+        self._speculative_task_router = (
+            TaskRouter(client=client, priority="low")
+            if speculation == "route" and not parallel_subtasks
+            else None
+        )
+
+    def speculate(self, ctx: SingleTaskAgentContext):
+        """
+        Start preparing `ctx` in the background: prefetch tool candidates and, in "route" mode,
+        run the first routing step. `run`/`run_stream` commit the work if they are called with a
+        matching context and cancel it otherwise.
+        """
+        if self._speculation_mode == "off":
+            return
+        self.cancel_speculation("replaced")
+        self._speculation = (
+            self._speculation_key(ctx),
+            asyncio.create_task(self._prefetch(ctx)),
+        )
+
+    def cancel_speculation(self, reason: str = "discarded"):
+        """Cancel pending speculative work, e.g. when the replanner finished the run instead."""
+        if self._speculation is None:
+            return
+        _, prefetch_task = self._speculation
+        self._speculation = None
+        prefetch_task.cancel()
+        get_metrics_registry().increment(f"speculation.{reason}")
+
+    async def _take_speculation(self, ctx: SingleTaskAgentContext) -> TaskPrefetch | None:
+        if self._speculation is None:
+            return None
+        key, prefetch_task = self._speculation
+        if key != self._speculation_key(ctx):
+            logger.debug(f"Speculation missed, next task is: {ctx.original_task}")
+            self.cancel_speculation("miss")
+            return None
+
+        self._speculation = None
+        try:
+            prefetch = await prefetch_task
+        except Exception as e:
+            logger.warning(f"Speculative preparation failed, starting over: {e}")
+            get_metrics_registry().increment("speculation.failed")
+            return None
+        get_metrics_registry().increment("speculation.hit")
+        return prefetch
+
+    async def _prefetch(self, ctx: SingleTaskAgentContext) -> TaskPrefetch:
         tool_candidates = await self._get_tool_candidates([ctx.original_task])
+        first_route = None
+        if self._speculative_task_router is not None:
+            first_route = await self._speculative_task_router.call(
+                TaskRouterInput(
+                    task=ctx.original_task,
+                    query_context=ctx.query_context,
+                    conversation_histories=ctx.conversation_histories,
+                    tool_candidates=tool_candidates,
+                    previous_task_results=self._previous_task_results(ctx),
+                    iteration_results=[],
+                )
+            )
+        return TaskPrefetch(tool_candidates=tool_candidates, first_route=first_route)
+
+    @staticmethod
+    def _speculation_key(ctx: SingleTaskAgentContext) -> str:
+        return ctx.model_dump_json(include=_SPECULATION_KEY_FIELDS)
 
-        previous_task_results = [
+    @staticmethod
+    def _previous_task_results(ctx: SingleTaskAgentContext) -> list[dict]:
+        return [
             {"task": r.executed_task, "result": r.result}
             for r in ctx.executed_task_results
         ]
 
+    async def _run_stream(
+        self, input_: SingleTaskAgentContext
+    ) -> AsyncIterator[AgentStreamEvent[SingleTaskAgentOutput]]:
+        ctx = input_
+        prefetch = await self._take_speculation(ctx)
+        if prefetch is not None:
+            tool_candidates = prefetch.tool_candidates
+        else:
+            tool_candidates = await self._get_tool_candidates([ctx.original_task])
+
+        previous_task_results = self._previous_task_results(ctx)
+
+        if self._parallel_subtasks:
+            subtask_events = self._run_parallel_subtasks(
+                ctx, tool_candidates, previous_task_results
+            )
+        else:
+            subtask_events = self._run_sequential_subtasks(
+                ctx,
+                tool_candidates,
+                previous_task_results,
+                first_route=prefetch.first_route if prefetch is not None else None,
+            )
+        async for event in subtask_events:
+            yield event
+
+        final_result = await self._filter_task_result(
+            task=ctx.original_task,
+            subtask_results=[r.model_dump() for r in ctx.subtask_results],
+            query_context=ctx.query_context,
+        )
+
+        yield AgentStreamEvent(
+            type="output",
+            output=SingleTaskAgentOutput(
+                executed_task=ctx.original_task,
+                result=final_result,
+            ),
+        )
+
+    async def _run_sequential_subtasks(
+        self,
+        ctx: SingleTaskAgentContext,
+        tool_candidates: list[dict],
+        previous_task_results: list[dict],
+        *,
+        first_route: TaskRouterOutput | None = None,
+    ) -> AsyncIterator[AgentStreamEvent[SingleTaskAgentOutput]]:
+        """
+        Route, execute and filter one subtask per iteration until the router finishes the task.
+        `first_route` is a speculatively computed output of the first routing step.
+        """
         while True:
             iteration_results = [r.model_dump() for r in ctx.subtask_results]
 
-            task_router_output = await self._route_task(
-                task=ctx.original_task,
-                query_context=ctx.query_context,
-                conversation_histories=ctx.conversation_histories,
-                tool_candidates=tool_candidates,
-                previous_task_results=previous_task_results,
-                iteration_results=iteration_results,
-            )
+            task_router_output: TaskRouterOutput | None = first_route
+            first_route = None
+            if task_router_output is not None:
+                if task_router_output.subtask:
+                    yield AgentStreamEvent(type="status", message=task_router_output.subtask)
+            else:
+                async for event in self._route_task_stream(
+                    task=ctx.original_task,
+                    query_context=ctx.query_context,
+                    conversation_histories=ctx.conversation_histories,
+                    tool_candidates=tool_candidates,
+                    previous_task_results=previous_task_results,
+                    iteration_results=iteration_results,
+                ):
+                    if event.type == "field" and event.field == "subtask" and event.value:
+                        # Surface the next subtask before the router finishes its whole output
+                        yield AgentStreamEvent(type="status", message=event.value)
+                    elif event.type == "output":
+                        task_router_output = event.output
 
             if task_router_output.finished:
                 logger.debug(f"Task finished: {task_router_output.finished_reason}")
@@ -88,23 +273,137 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
                     conversation_histories=ctx.conversation_histories,
                     previous_task_results=previous_task_results,
                     previous_subtask_results=iteration_results,
+                    previous_confidence=ctx.reasoning_confidence,
+                    failures=ctx.failed_subtasks,
                 )
             else:
                 raise ValueError(f"Unknown subtask type: {subtask_type}")
 
+            self._record_subtask_outcome(ctx, subtask_type, result)
             filtered_result = await self._filter_subtask_result(subtask=subtask, result=result)
             ctx.subtask_results.append(SubtaskResult(subtask=subtask, result=filtered_result))
 
-        final_result = await self._filter_task_result(
-            task=ctx.original_task,
-            subtask_results=[r.model_dump() for r in ctx.subtask_results],
-            query_context=ctx.query_context,
-        )
+    async def _run_parallel_subtasks(
+        self,
+        ctx: SingleTaskAgentContext,
+        tool_candidates: list[dict],
+        previous_task_results: list[dict],
+    ) -> AsyncIterator[AgentStreamEvent[SingleTaskAgentOutput]]:
+        """
+        Route independent subtasks in batches: one TaskRouterV2 call per batch, one ToolSelectorV2 call for
+        all of its tool subtasks, then tool calls, reasoning and result filtering fan out concurrently.
+        """
+        while True:
+            iteration_results = [r.model_dump() for r in ctx.subtask_results]
+
+            task_router_output: TaskRouterOutputV2 = await self._task_router_v2.call(
+                TaskRouterInput(
+                    task=ctx.original_task,
+                    query_context=ctx.query_context,
+                    conversation_histories=ctx.conversation_histories,
+                    tool_candidates=tool_candidates,
+                    previous_task_results=previous_task_results,
+                    iteration_results=iteration_results,
+                )
+            )
+            logger.debug(f"TaskRouterV2 output: {task_router_output}")
 
-        return SingleTaskAgentOutput(
-            executed_task=ctx.original_task,
-            result=final_result,
+            if task_router_output.finished or not task_router_output.subtasks:
+                logger.debug(f"Task finished: {task_router_output.finished_reason}")
+                break
+
+            subtasks = task_router_output.subtasks
+            for subtask in subtasks:
+                yield AgentStreamEvent(type="status", message=subtask.subtask)
+
+            tool_subtasks = [s.subtask for s in subtasks if s.subtask_type == "tool"]
+            tool_inputs = await self._select_tools(
+                original_task=ctx.original_task,
+                subtasks=tool_subtasks,
+                query_context=ctx.query_context,
+                conversation_histories=ctx.conversation_histories,
+                previous_task_results=previous_task_results,
+                iteration_results=iteration_results,
+            )
+
+            async def execute(subtask: Subtask) -> dict[str, Any]:
+                if subtask.subtask_type == "tool":
+                    tool_input = tool_inputs[subtask.subtask]
+                    if isinstance(tool_input, ToolInput):
+                        return await self._call_tool(tool_input)
+                    return {"error": tool_input}
+                return await self._execute_reasoning_subtask(
+                    original_task=ctx.original_task,
+                    subtask=subtask.subtask,
+                    query_context=ctx.query_context,
+                    conversation_histories=ctx.conversation_histories,
+                    previous_task_results=previous_task_results,
+                    previous_subtask_results=iteration_results,
+                    # Signals as of the start of the batch; its subtasks run concurrently
+                    previous_confidence=ctx.reasoning_confidence,
+                    failures=ctx.failed_subtasks,
+                )
+
+            async def execute_and_filter(subtask: Subtask) -> tuple[dict[str, Any], str]:
+                result = await execute(subtask)
+                filtered = await self._filter_subtask_result(subtask=subtask.subtask, result=result)
+                return result, filtered
+
+            outcomes = await asyncio.gather(*(execute_and_filter(s) for s in subtasks))
+            # Results are recorded in routing order, independent of completion order.
+            for subtask, (result, filtered_result) in zip(subtasks, outcomes):
+                self._record_subtask_outcome(ctx, subtask.subtask_type, result)
+                ctx.subtask_results.append(
+                    SubtaskResult(subtask=subtask.subtask, result=filtered_result)
+                )
+
+    async def _select_tools(
+        self,
+        *,
+        original_task: str,
+        subtasks: list[str],
+        query_context: str | None,
+        conversation_histories: list[ConversationHistory],
+        previous_task_results: list[dict],
+        iteration_results: list[dict],
+    ) -> dict[str, ToolInput | str]:
+        """Select tools for all subtasks in one call. Maps each subtask to its tool input or a failure reason."""
+        if not subtasks:
+            return {}
+
+        subtask_tool_candidates = await self._get_tool_candidates(subtasks)
+        tool_selector_input = ToolSelectorInputV2(
+            original_task=original_task,
+            subtasks=subtasks,
+            query_context=query_context,
+            conversation_histories=conversation_histories,
+            tool_candidates=subtask_tool_candidates,
+            previous_task_results=previous_task_results,
+            iteration_results=iteration_results,
         )
+        try:
+            tool_selector_output: ToolSelectorOutputV2 = await self._tool_selector_v2.call(
+                tool_selector_input
+            )
+        except ValidationError as e:
+            logger.error(f"Failed to parse ToolSelectorV2 response: {e}")
+            return {subtask: "Failed to parse tool selector response" for subtask in subtasks}
+
+        selections = {r.subtask: r for r in tool_selector_output.results}
+        tool_inputs: dict[str, ToolInput | str] = {}
+        for index, subtask in enumerate(subtasks):
+            # Match by subtask text; fall back to position if the model paraphrased it
+            selection = selections.get(subtask)
+            if selection is None and index < len(tool_selector_output.results):
+                selection = tool_selector_output.results[index]
+            if selection is None:
+                tool_inputs[subtask] = "No tool was selected for the subtask"
+            elif selection.selected_tool is None:
+                logger.warning(f"No tool selected for subtask: {subtask}")
+                tool_inputs[subtask] = selection.failure_reason or "No matching tool found"
+            else:
+                tool_inputs[subtask] = selection.selected_tool
+        return tool_inputs
 
     async def _get_tool_candidates(self, queries: list[str]) -> list[dict]:
         tools = await self._tool_manager.search_tools(queries, n_results=self.N_TOOL_RESULTS)
@@ -118,7 +417,7 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
             for t in tools
         ]
 
-    async def _route_task(
+    async def _route_task_stream(
         self,
         *,
         task: str,
@@ -127,7 +426,7 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
         tool_candidates: list[dict],
         previous_task_results: list[dict],
         iteration_results: list[dict],
-    ) -> TaskRouterOutput:
+    ) -> AsyncIterator[LLMStreamEvent[TaskRouterOutput]]:
         task_router_input = TaskRouterInput(
             task=task,
             query_context=query_context,
@@ -136,10 +435,10 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
             previous_task_results=previous_task_results,
             iteration_results=iteration_results,
         )
-        task_router = TaskRouter(client=self._ollama_client)
-        output: TaskRouterOutput = await task_router.call(task_router_input)
-        logger.debug(f"TaskRouter output: {output}")
-        return output
+        async for event in self._task_router.call_stream(task_router_input):
+            if event.type == "output":
+                logger.debug(f"TaskRouter output: {event.output}")
+            yield event
 
     async def _execute_tool_subtask(
         self,
@@ -161,14 +460,12 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
             previous_task_results=previous_task_results,
             iteration_results=iteration_results,
         )
-        tool_selector = ToolSelector(client=self._ollama_client)
         try:
-            tool_selector_output: ToolSelectorOutput = await tool_selector.call(tool_selector_input)
-        except ValidationError:
-            llm_call_response = tool_selector.current_llm_call_response
-            logger.error(
-                f"Failed to parse ToolSelector response: {llm_call_response['message']['content']}"
+            tool_selector_output: ToolSelectorOutput = await self._tool_selector.call(
+                tool_selector_input
             )
+        except ValidationError as e:
+            logger.error(f"Failed to parse ToolSelector response: {e}")
             return {"error": "Failed to parse tool selector response"}
 
         if tool_selector_output.selected_tool is None:
@@ -186,6 +483,8 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
         conversation_histories: list[ConversationHistory],
         previous_task_results: list[dict],
         previous_subtask_results: list[dict],
+        previous_confidence: int | None = None,
+        failures: int = 0,
     ) -> dict[str, Any]:
         reasoning_agent_input = ReasoningAgentInput(
             original_task=original_task,
@@ -194,12 +493,25 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
             conversation_histories=conversation_histories,
             previous_task_results=previous_task_results,
             previous_subtask_results=previous_subtask_results,
+            previous_confidence=previous_confidence,
+            failures=failures,
+        )
+        reasoning_agent_output: ReasoningAgentOutput = await self._reasoning_agent.run(
+            reasoning_agent_input
         )
-        reasoning_agent = ReasoningAgent(client=self._ollama_client)
-        reasoning_agent_output: ReasoningAgentOutput = await reasoning_agent.run(reasoning_agent_input)
         logger.debug(f"ReasoningAgent output: {reasoning_agent_output}")
         return reasoning_agent_output.model_dump()
 
+    @staticmethod
+    def _record_subtask_outcome(
+        ctx: SingleTaskAgentContext, subtask_type: str, result: dict[str, Any]
+    ):
+        """Keep the per-task signals that pick the think level of later reasoning subtasks."""
+        if "error" in result:
+            ctx.failed_subtasks += 1
+        if subtask_type == "reasoning":
+            ctx.reasoning_confidence = result.get("confidence")
+
     async def _call_tool(self, tool_input: ToolInput) -> dict[str, Any]:
         tool_result = await self._tool_manager._server_manager.call_tool(
             tool_input.server_name,
@@ -214,9 +526,13 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
         return {"content": tool_result.content}
 
     async def _filter_subtask_result(self, subtask: str, result: dict[str, Any]) -> str:
+        if self._result_prefilter is not None:
+            prefiltered = self._result_prefilter.apply(result)
+            if prefiltered is not None:
+                return prefiltered
+
         subtask_result_filter_input = SubtaskResultFilterInput(subtask=subtask, result=result)
-        subtask_result_filter = SubtaskResultFilter(client=self._ollama_client)
-        output = await subtask_result_filter.call(subtask_result_filter_input)
+        output = await self._subtask_result_filter.call(subtask_result_filter_input)
         return output.root
 
     async def _filter_task_result(
@@ -230,6 +546,5 @@ class SingleTaskAgent(Agent[SingleTaskAgentContext, SingleTaskAgentOutput]):
             subtask_results=subtask_results,
             query_context=query_context,
         )
-        task_result_filter = TaskResultFilter(client=self._ollama_client)
-        output = await task_result_filter.call(task_result_filter_input)
+        output = await self._task_result_filter.call(task_result_filter_input)
         return output.root
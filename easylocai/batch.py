@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import sys
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Callable, Iterator, TextIO
+
+from ollama import AsyncClient
+from pydantic import BaseModel
+
+from easylocai.main import load_config_dict, log_session_stats
+from easylocai.schemas.context import GlobalContext
+from easylocai.search_engines.advanced_search_engine import AdvancedSearchEngine
+from easylocai.workflow import EasylocaiWorkflow, build_workflow_pool
+
+logger = logging.getLogger(__name__)
+
+
+class BatchQuery(BaseModel):
+    # Defaults to the 1-based line number in the input file
+    id: str
+    query: str
+    # Set when the input line is not a valid query; `query` then holds the line as is
+    error: str | None = None
+
+
+class BatchResult(BaseModel):
+    id: str
+    query: str
+    answer: str | None = None
+    # A deadline cut the run short; `answer` holds the results gathered so far
+    partial: bool = False
+    error: str | None = None
+    started_at: float
+    # Seconds from the start of the run to the first status output and to the answer
+    first_status_seconds: float | None = None
+    duration_seconds: float
+
+
+def read_batch_queries(lines: Iterator[str]) -> Iterator[BatchQuery]:
+    """
+    Parse JSONL queries: objects with a "query" and an optional "id", or plain JSON strings.
+    Blank lines are skipped. Invalid lines are yielded with an `error`, so they are reported
+    in the results instead of stopping the batch.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield BatchQuery(id=str(line_number), query=line.strip(), error=f"Invalid JSON: {e}")
+            continue
+        if isinstance(value, str):
+            value = {"query": value}
+        if not isinstance(value, dict) or not isinstance(value.get("query"), str):
+            yield BatchQuery(
+                id=str(line_number),
+                query=line.strip(),
+                error='Expected a JSON string or an object with a "query" string',
+            )
+            continue
+        yield BatchQuery(id=str(value.get("id", line_number)), query=value["query"])
+
+
+async def run_batch_query(workflow: EasylocaiWorkflow, batch_query: BatchQuery) -> BatchResult:
+    """Run one query with a fresh conversation. Errors are reported in the result, not raised."""
+    if batch_query.error is not None:
+        return BatchResult(
+            id=batch_query.id,
+            query=batch_query.query,
+            error=batch_query.error,
+            started_at=time.time(),
+            duration_seconds=0.0,
+        )
+
+    started_at = time.time()
+    start = time.perf_counter()
+    first_status_seconds = None
+    answer = None
+    partial = False
+    error = None
+    try:
+        async for output in workflow.run(batch_query.query, global_context=GlobalContext()):
+            if output.type == "status":
+                if first_status_seconds is None:
+                    first_status_seconds = time.perf_counter() - start
+            elif output.type == "result":
+                answer = output.message
+                partial = output.partial
+    except Exception as e:
+        logger.exception(f"Batch query {batch_query.id} failed")
+        error = f"{type(e).__name__}: {e}"
+
+    return BatchResult(
+        id=batch_query.id,
+        query=batch_query.query,
+        answer=answer,
+        partial=partial,
+        error=error,
+        started_at=started_at,
+        first_status_seconds=first_status_seconds,
+        duration_seconds=time.perf_counter() - start,
+    )
+
+
+async def process_batch(
+    batch_queries: Iterator[BatchQuery],
+    workflows: list[EasylocaiWorkflow],
+    on_result: Callable[[BatchResult], None],
+) -> int:
+    """
+    Run the queries with one worker per workflow, so at most `len(workflows)` run at once.
+    `on_result` is called as each query finishes (not in input order). Returns the number of queries.
+
+    If `on_result` raises (e.g. the output disk is full), the queries still running are cancelled
+    and its error is raised.
+    """
+    queries: asyncio.Queue[BatchQuery | None] = asyncio.Queue(maxsize=len(workflows))
+    count = 0
+
+    async def worker(workflow: EasylocaiWorkflow):
+        while (batch_query := await queries.get()) is not None:
+            on_result(await run_batch_query(workflow, batch_query))
+
+    try:
+        # A failing worker cancels the others and this task, which may be waiting on a full queue
+        async with asyncio.TaskGroup() as workers:
+            for workflow in workflows:
+                workers.create_task(worker(workflow))
+            for batch_query in batch_queries:
+                await queries.put(batch_query)
+                count += 1
+            for _ in workflows:
+                await queries.put(None)
+    except ExceptionGroup as e:
+        raise e.exceptions[0]
+    return count
+
+
+def _write_result(out: TextIO, result: BatchResult):
+    out.write(result.model_dump_json() + "\n")
+    out.flush()
+
+
+async def run_batch(input_path: str, output_path: str, *, concurrency: int = 2):
+    """Answer every query of a JSONL file with one warm set of MCP servers and tool index."""
+    ollama_client = AsyncClient(host="http://localhost:11434")
+    workflows = build_workflow_pool(
+        concurrency,
+        config_dict=load_config_dict(),
+        search_engine=AdvancedSearchEngine(),
+        ollama_client=ollama_client,
+    )
+
+    start = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        for workflow in workflows:
+            await workflow.initialize(stack)
+
+        with open(input_path, encoding="utf-8") as in_file:
+            out = (
+                sys.stdout
+                if output_path == "-"
+                else stack.enter_context(open(Path(output_path), "w", encoding="utf-8"))
+            )
+            count = await process_batch(
+                read_batch_queries(in_file),
+                workflows,
+                lambda result: _write_result(out, result),
+            )
+
+    logger.info(f"Batch: {count} queries in {time.perf_counter() - start:.1f}s")
+    log_session_stats()
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+from rich import get_console
+
+from easylocai.schemas.common import EasyLocaiWorkflowOutput
+from easylocai.schemas.server import ServerRequest
+from easylocai.utlis.console_util import multiline_input, render_chat, stream_answer
+
+logger = logging.getLogger(__name__)
+
+
+class ServerError(RuntimeError):
+    pass
+
+
+class WorkflowClient:
+    """Client of `easylocai serve`. Each client is one conversation (session) with its own history."""
+
+    def __init__(self, socket_path: str | Path, *, session: str | None = None):
+        self._socket_path = Path(socket_path).expanduser()
+        self._session = session or uuid.uuid4().hex[:12]
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def __aenter__(self) -> "WorkflowClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(str(self._socket_path))
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def ping(self) -> bool:
+        await self._send(ServerRequest(type="ping", session=self._session))
+        return (await self._receive())["type"] == "pong"
+
+    async def reset(self):
+        await self._send(ServerRequest(type="reset", session=self._session))
+        await self._receive()
+
+    async def run(self, user_query: str) -> AsyncIterator[EasyLocaiWorkflowOutput]:
+        """
+        Stream the outputs of one run. Breaking out of the loop early cancels the run on the server,
+        which also closes the connection; the next run reconnects to the same session.
+        """
+        if self._writer is None:
+            await self.connect()
+        await self._send(ServerRequest(type="run", query=user_query, session=self._session))
+        finished = False
+        try:
+            while True:
+                message = await self._receive()
+                if message["type"] == "error":
+                    finished = True
+                    raise ServerError(message["message"])
+                output = EasyLocaiWorkflowOutput.model_validate(message)
+                if output.type == "result":
+                    finished = True
+                yield output
+                if finished:
+                    return
+        finally:
+            if not finished and self._writer is not None:
+                self._writer.write(self._encode(ServerRequest(type="cancel", session=self._session)))
+                await self.close()
+
+    async def _send(self, request: ServerRequest):
+        if self._writer is None:
+            raise ServerError("Not connected")
+        self._writer.write(self._encode(request))
+        await self._writer.drain()
+
+    @staticmethod
+    def _encode(request: ServerRequest) -> bytes:
+        return request.model_dump_json(exclude_none=True).encode("utf-8") + b"\n"
+
+    async def _receive(self) -> dict:
+        line = await self._reader.readline()
+        if not line:
+            raise ServerError("The server closed the connection")
+        return json.loads(line)
+
+
+async def run_client_main(socket_path: str | Path):
+    """The interactive chat of `easylocai`, answered by a running `easylocai serve`."""
+    console = get_console()
+    messages = []
+
+    try:
+        client = WorkflowClient(socket_path)
+        await client.connect()
+    except (FileNotFoundError, ConnectionRefusedError):
+        console.print(f"No easylocai server on {socket_path}. Start one with `easylocai serve`.")
+        return
+
+    async with client:
+        while True:
+            render_chat(console, messages)
+            try:
+                user_input = await multiline_input("> ")
+            except KeyboardInterrupt:
+                logger.warning("User interrupted the input")
+                print("\nExiting...")
+                break
+            if user_input.strip().lower() in {"exit", "quit"}:
+                break
+
+            messages.append({"role": "user", "content": user_input})
+            render_chat(console, messages)
+
+            try:
+                await stream_answer(console, client.run(user_input), messages)
+            except ServerError as e:
+                messages.append({"role": "assistant", "content": f"Error: {e}"})
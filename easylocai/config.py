@@ -3,6 +3,9 @@ from pathlib import Path
 
 DEFAULT_CONFIG = {"mcpServers": {}}
 
+# Unix socket of `easylocai serve`
+DEFAULT_SOCKET_PATH = "~/.easylocai/easylocai.sock"
+
 
 def user_config_path() -> Path:
     return Path.home() / ".config" / "easylocai" / "config.json"
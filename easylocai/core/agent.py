@@ -1,26 +1,49 @@
 from __future__ import annotations
 
 from abc import ABC
-from typing import AsyncIterator, Generic, TypeVar
+from typing import AsyncIterator, Generic, Literal, TypeVar
 
 from pydantic import BaseModel
 
+from easylocai.core.metrics import metrics_scope, scoped_stream
+
 InModel = TypeVar("InModel", bound=BaseModel)
 OutModel = TypeVar("OutModel", bound=BaseModel)
 
 
+class AgentStreamEvent(BaseModel, Generic[OutModel]):
+    type: Literal["status", "output"]
+    # "status" event: human-readable progress message (e.g. the subtask being executed)
+    message: str | None = None
+    # "output" event: the final output of the agent
+    output: OutModel | None = None
+
+
 class Agent(ABC, Generic[InModel, OutModel]):
     async def run(self, input_: InModel) -> OutModel:
         """Validate input -> run -> validate output."""
-        return await self._run(input_)
-
-    async def run_stream(self, input_: str | dict | InModel) -> AsyncIterator[OutModel]:
-        """Validate input -> stream raw chunks -> validate each output."""
-        async for output in self._run_stream(input_):
-            yield output
+        with metrics_scope(agent=self.__class__.__name__):
+            return await self._run(input_)
+
+    async def run_stream(
+        self, input_: InModel
+    ) -> AsyncIterator[AgentStreamEvent[OutModel]]:
+        """Run and stream progress: zero or more "status" events, then exactly one "output" event."""
+        async for event in scoped_stream(
+            self._run_stream(input_), agent=self.__class__.__name__
+        ):
+            yield event
 
     # TODO: Make these abstractmethods once subclasses are updated.
-    async def _run(self, query: InModel) -> OutModel: ...
+    # Subclasses implement either _run or _run_stream; each default is built on the other.
+    async def _run(self, input_: InModel) -> OutModel:
+        async for event in self._run_stream(input_):
+            if event.type == "output":
+                return event.output
+        raise RuntimeError(f"{self.__class__.__name__} stream ended without output")
 
     # TODO: Make these abstractmethods once subclasses are updated.
-    async def _run_stream(self, query: InModel) -> AsyncIterator[OutModel]: ...
+    async def _run_stream(
+        self, input_: InModel
+    ) -> AsyncIterator[AgentStreamEvent[OutModel]]:
+        yield AgentStreamEvent(type="output", output=await self._run(input_))
@@ -0,0 +1,89 @@
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, Field, ValidationError
+
+from easylocai.schemas.context import SingleTaskAgentContext, WorkflowContext
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = "~/.easylocai/checkpoints"
+
+# planned: the next task in `task_list` has not started yet
+# task: `pending_task` was interrupted after some of its subtasks
+# replan: the last task finished, the replanner has not decided yet
+CheckpointStage = Literal["planned", "task", "replan"]
+
+
+class WorkflowCheckpoint(BaseModel):
+    run_id: str
+    stage: CheckpointStage
+    workflow_context: WorkflowContext
+    # Dependency edges of `task_list` if it is still the task graph of the initial plan
+    task_dependencies: list[list[int]] | None = None
+    pending_task: SingleTaskAgentContext | None = None
+    updated_at: float = Field(default_factory=time.time)
+
+
+class CheckpointStore:
+    """
+    One JSON file per unfinished workflow run, overwritten after every step.
+
+    Writes go through a temporary file and an atomic rename, so a crash mid-write leaves the previous
+    checkpoint intact. A run's checkpoint is deleted once it produced its answer; only the
+    `max_checkpoints` most recent ones are kept.
+    """
+
+    def __init__(self, directory: str | Path = DEFAULT_CHECKPOINT_DIR, *, max_checkpoints: int = 20):
+        self._directory = Path(directory).expanduser()
+        self._max_checkpoints = max_checkpoints
+
+    def _path(self, run_id: str) -> Path:
+        return self._directory / f"{run_id}.json"
+
+    def save(self, checkpoint: WorkflowCheckpoint):
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(checkpoint.run_id)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(checkpoint.model_dump_json(), encoding="utf-8")
+        os.replace(tmp_path, path)
+        self._prune()
+
+    def load(self, run_id: str | None = None) -> WorkflowCheckpoint | None:
+        """The checkpoint of `run_id`, or the most recent one. None if there is none."""
+        if run_id is not None:
+            paths = [self._path(run_id)]
+        else:
+            paths = self._paths_newest_first()
+
+        for path in paths:
+            try:
+                return WorkflowCheckpoint.model_validate_json(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                continue
+            except ValidationError as e:
+                logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+    def delete(self, run_id: str):
+        self._path(run_id).unlink(missing_ok=True)
+
+    def run_ids(self) -> list[str]:
+        """Run ids with a checkpoint, most recent first."""
+        return [path.stem for path in self._paths_newest_first()]
+
+    def _paths_newest_first(self) -> list[Path]:
+        if not self._directory.exists():
+            return []
+        return sorted(
+            self._directory.glob("*.json"),
+            key=lambda path: path.stat().st_mtime_ns,
+            reverse=True,
+        )
+
+    def _prune(self):
+        for path in self._paths_newest_first()[self._max_checkpoints :]:
+            path.unlink(missing_ok=True)
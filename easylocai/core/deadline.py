@@ -0,0 +1,51 @@
+import asyncio
+import time
+from typing import AsyncIterator, TypeVar
+
+T = TypeVar("T")
+
+# The event loop runs timers up to one clock tick early
+_CLOCK_RESOLUTION = time.get_clock_info("monotonic").resolution
+
+
+def deadline_after(timeout: float | None, *, within: float | None = None) -> float | None:
+    """
+    Event loop time `timeout` seconds from now, capped at the enclosing deadline `within`.
+    None means no deadline.
+    """
+    if timeout is None:
+        return within
+    deadline = asyncio.get_running_loop().time() + timeout
+    return deadline if within is None else min(deadline, within)
+
+
+def is_expired(deadline: float | None) -> bool:
+    """
+    Whether `deadline` has passed. Use it to tell a TimeoutError raised by the deadline from one
+    raised inside the guarded code, e.g. by an HTTP client.
+    """
+    return (
+        deadline is not None
+        and asyncio.get_running_loop().time() + _CLOCK_RESOLUTION >= deadline
+    )
+
+
+async def deadline_stream(stream: AsyncIterator[T], deadline: float | None) -> AsyncIterator[T]:
+    """
+    Re-yield `stream` until `deadline`, then raise TimeoutError.
+
+    The deadline only applies while the stream itself runs, not while the consumer handles an item.
+    On expiry the pending step is cancelled, which aborts in-flight LLM requests and tool calls.
+    """
+    if deadline is None:
+        async for item in stream:
+            yield item
+        return
+
+    while True:
+        try:
+            async with asyncio.timeout_at(deadline):
+                item = await anext(stream)
+        except StopAsyncIteration:
+            return
+        yield item
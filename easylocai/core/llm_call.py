@@ -1,29 +1,63 @@
 import logging
+import time
 from abc import ABC
-from typing import Generic, TypeVar, Any, Type, Union, AsyncIterator
+from typing import Generic, TypeVar, Any, Type, AsyncIterator, Literal
 
-from jinja2 import Template, Environment, FileSystemLoader, StrictUndefined
-from ollama import AsyncClient, ChatResponse
+from jinja2 import Template
+from ollama import AsyncClient
 from pydantic import BaseModel, RootModel, ValidationError
 
-from easylocai.utlis.prompt import pretty_prompt_text
-from easylocai.utlis.resource_util import installed_resources_dir
+from easylocai.core.llm_scheduler import get_llm_scheduler
+from easylocai.core.llm_settings import (
+    MessageLayout,
+    Priority,
+    ThinkLevel,
+    get_llm_settings,
+)
+from easylocai.core.metrics import get_metrics_registry
+from easylocai.core.model_router import get_model_router
+from easylocai.core.prompt_registry import get_prompt_registry
+from easylocai.core.response_cache import get_response_cache, make_cache_key
+from easylocai.core.think_policy import ThinkPolicy, think_level, think_param
+from easylocai.core.token_budget import TokenBudget, estimate_messages_tokens
+from easylocai.utlis.json_repair import repair_json
+from easylocai.utlis.json_stream import IncrementalJSONObjectParser
+from easylocai.utlis.prompt import LazyPrettyPromptText
 
 logger = logging.getLogger(__name__)
 
-resources_dir = installed_resources_dir()
-
 InModel = TypeVar("InModel", bound=BaseModel)
 OutModel = TypeVar("OutModel", bound=BaseModel)
 
+RecoveryPath = Literal["first_try", "repaired", "corrective"]
+
+_MAX_CORRECTION_ERROR_LENGTH = 1000
+
+
+class LLMStreamEvent(BaseModel, Generic[OutModel]):
+    type: Literal["field", "output"]
+    # "field" event: top-level output field whose value has just been completed
+    field: str | None = None
+    value: Any = None
+    # "output" event: the validated output model
+    output: OutModel | None = None
+
 
 class LLMCallV2(ABC, Generic[InModel, OutModel]):
+    # Scheduling priority of this call type; overridable by LLMSettings.scheduler.priority_by_call
+    default_priority: Priority = "normal"
+    # Input fields that may be windowed/truncated to fit the token budget, least important first
+    budgeted_fields: tuple[str, ...] = ()
+    # Base think level when the caller does not pass `think`; None leaves it to the server default
+    default_think: ThinkLevel | None = None
+
     _client: AsyncClient
     _model: str
     _options: dict[str, Any]
     _output_model: Type[OutModel]
+    _output_model_format: dict | None
 
-    _system_prompt_template: Template
+    _system_prompt_path: str | None
     _user_prompt_template: Template
 
     def __init__(
@@ -34,95 +68,478 @@ class LLMCallV2(ABC, Generic[InModel, OutModel]):
         system_prompt_path: str | None,
         user_prompt_path: str | None,
         output_model: Type[OutModel],
+        message_layout: MessageLayout | None = None,
+        keep_alive: str | float | None = None,
+        priority: Priority | None = None,
     ):
         self._client = client
-        self._model = model
+        # Model per escalation tier: the configured model first, then the model used after validation failures
+        self._model_tiers = get_model_router().tiers(self.__class__.__name__, model)
+        self._model = self._model_tiers[0]
         self._options = options
 
-        env = Environment(
-            loader=FileSystemLoader(str(resources_dir)),
-            undefined=StrictUndefined,
+        settings = get_llm_settings()
+        self._message_layout = message_layout or settings.message_layout
+        self._keep_alive = (
+            keep_alive
+            if keep_alive is not None
+            else settings.keep_alive_for(self.__class__.__name__)
+        )
+        self._priority = priority or settings.scheduler.priority_by_call.get(
+            self.__class__.__name__, self.default_priority
         )
+
+        budget_settings = settings.token_budget
+        self._token_budget = None
+        if budget_settings.enabled:
+            # A fixed num_ctx per model avoids Ollama reloading the model between calls.
+            self._options = {"num_ctx": budget_settings.num_ctx, **options}
+            self._token_budget = TokenBudget(
+                budget_settings.max_prompt_tokens_for(self.__class__.__name__)
+            )
+
+        self._think_policy = ThinkPolicy(settings.think_policy)
+
+        # Templates and schemas are compiled once per process and shared by all instances.
+        registry = get_prompt_registry()
+        self._system_prompt_path = system_prompt_path
         if system_prompt_path is not None:
-            self._system_prompt_template = env.get_template(system_prompt_path)
+            # Compile eagerly so that a broken template fails at construction time.
+            registry.get_template(system_prompt_path)
         if user_prompt_path is not None:
-            self._user_prompt_template = env.get_template(user_prompt_path)
+            self._user_prompt_template = registry.get_template(user_prompt_path)
         self._output_model = output_model
+        self._output_model_format = registry.get_output_format(output_model)
+        # Nothing below changes per call: one instance can serve concurrent calls.
+        self._response_cache = get_response_cache()
 
-    @property
-    def llm_call_response(
-        self,
-    ) -> Union[ChatResponse, AsyncIterator[ChatResponse], None]:
-        return self._current_llm_call_response
+    def render_messages(self, input_: InModel) -> list[dict[str, str]]:
+        """Render each prompt message exactly once."""
+        started_at = time.perf_counter()
+        input_dict = input_.model_dump()
+        messages = self._build_messages(input_dict)
 
-    async def call(self, input_: InModel, *, think=None, max_retries: int = 3) -> OutModel:
-        system_prompt = self._system_prompt_template.render()
-        logger.debug(
-            pretty_prompt_text(
-                f"{self.__class__.__name__} System Prompt", system_prompt
+        if self._token_budget is not None:
+            prompt_tokens = estimate_messages_tokens(messages)
+            max_prompt_tokens = self._token_budget.max_prompt_tokens
+            if prompt_tokens > max_prompt_tokens:
+                logger.info(
+                    f"{self.__class__.__name__} prompt of ~{prompt_tokens} tokens exceeds budget of "
+                    f"{max_prompt_tokens}, sections: "
+                    f"{self._token_budget.section_tokens(input_dict, self.budgeted_fields)}"
+                )
+                input_dict = self._token_budget.fit(
+                    input_dict,
+                    fields=self.budgeted_fields,
+                    excess_tokens=prompt_tokens - max_prompt_tokens,
+                )
+                messages = self._build_messages(input_dict)
+        render_duration = time.perf_counter() - started_at
+
+        # Box formatting is deferred until a handler actually emits the record.
+        name = self.__class__.__name__
+        for message in messages:
+            logger.debug(
+                LazyPrettyPromptText(
+                    f"{name} {message['role'].capitalize()} Prompt", message["content"]
+                )
             )
-        )
-        user_prompt = self._user_prompt_template.render(**input_.model_dump())
         logger.debug(
-            pretty_prompt_text(f"{self.__class__.__name__} User Prompt", user_prompt)
+            "%s rendered %d messages in %.2f ms (%d chars)",
+            name,
+            len(messages),
+            render_duration * 1000,
+            sum(len(m["content"]) for m in messages),
         )
+        return messages
 
-        # If output model is a RootModel (e.g., RootModel[str]), no format is provided to LLM. (pure text)
-        # Otherwise, provide JSON schema to LLM for structured output.
-        # Caution: If RootModel is sent to LLM with format, wrong result is returned.
-        if issubclass(self._output_model, RootModel):
-            output_model_format = None
-        else:
-            output_model_format = self._output_model.model_json_schema()
-
+    def _build_messages(self, input_dict: dict) -> list[dict[str, str]]:
+        system_prompt = get_prompt_registry().get_static_text(self._system_prompt_path)
         messages = [
             {
                 "role": "system",
-                "content": self._system_prompt_template.render(),
-            },
-            {
-                "role": "user",
-                "content": self._user_prompt_template.render(**input_.model_dump()),
+                "content": system_prompt,
             },
         ]
+        if self._message_layout == "prefix_stable":
+            messages.extend(self._prefix_stable_user_messages(input_dict))
+        else:
+            messages.append(
+                {
+                    "role": "user",
+                    "content": self._user_prompt_template.render(**input_dict),
+                }
+            )
+        return messages
+
+    def _prefix_stable_user_messages(self, input_dict: dict) -> list[dict[str, str]]:
+        """
+        Lay out the conversation so that successive calls of the same type share a byte-identical prefix:
+        system prompt -> prior conversation turns -> the rendered user prompt.
+        Ollama can then reuse the KV cache for the prefix instead of re-evaluating the whole prompt.
+        Everything that changes per call, including searched tool candidates, stays in the user prompt.
+        """
+        messages = []
+        conversation_histories = input_dict.get("conversation_histories")
+        if conversation_histories:
+            for history in conversation_histories:
+                messages.append({"role": "user", "content": history["original_user_query"]})
+                messages.append({"role": "assistant", "content": history["response"]})
+            # prior turns are now part of the message list, so templates must not render them again
+            input_dict = {**input_dict, "conversation_histories": []}
+
+        messages.append(
+            {"role": "user", "content": self._user_prompt_template.render(**input_dict)}
+        )
+        return messages
+
+    async def call(self, input_: InModel, *, think=None, max_retries: int = 3) -> OutModel:
+        render_started_at = time.perf_counter()
+        messages = self.render_messages(input_)
+        render_duration = time.perf_counter() - render_started_at
+        think = self._resolve_think(think)
+        request_think = think
 
+        # None for RootModel output (pure text), JSON schema otherwise. See PromptRegistry.get_output_format.
+        output_model_format = self._output_model_format
+
+        router = get_model_router()
+        models = router.route(self.__class__.__name__, self._model_tiers)
+
+        cached_response = self._lookup_cache(messages, think, model=models[0])
+        if cached_response is not None:
+            self._record_metric(
+                None, model=models[0], cached=True, render_duration=render_duration
+            )
+            return cached_response
+        request_messages = messages
         last_error: Exception | None = None
         for attempt in range(max_retries):
-            llm_call_response = await self._client.chat(
-                model=self._model,
-                messages=messages,
-                options=self._options,
-                think=think,
-                format=output_model_format,
-            )
+            model = router.model_for_attempt(models, attempt)
+            queued_at = time.perf_counter()
+            async with get_llm_scheduler().slot(self._priority):
+                started_at = time.perf_counter()
+                llm_call_response = await self._client.chat(
+                    model=model,
+                    messages=request_messages,
+                    options=self._options,
+                    think=think,
+                    format=output_model_format,
+                    keep_alive=self._keep_alive,
+                )
 
-            self._current_llm_call_response = llm_call_response
+            wall_duration = time.perf_counter() - started_at
+            router.residency.touch(model)
             content = llm_call_response["message"]["content"]
+            thinking = llm_call_response["message"].get("thinking")
 
-            if not content:
-                logger.warning(
-                    f"{self.__class__.__name__} received empty response "
-                    f"(attempt {attempt + 1}/{max_retries}), retrying..."
-                )
-                last_error = ValueError("LLM returned empty response")
-                continue
-
-            try:
-                if issubclass(self._output_model, RootModel):
-                    # RootModel[str] case: validate plain text
-                    response = self._output_model.model_validate(content)
-                else:
-                    # BaseModel object output: JSON validate
-                    response = self._output_model.model_validate_json(content)
-                logger.debug(f"{self.__class__.__name__} Response:\n{response}")
+            response, recovery_path, last_error = self._validate_content(
+                content, thinking=thinking, attempt=attempt, max_retries=max_retries
+            )
+            self._record_metric(
+                llm_call_response,
+                model=model,
+                attempt=attempt,
+                recovery_path=recovery_path,
+                render_duration=render_duration if attempt == 0 else 0.0,
+                queue_wait=started_at - queued_at,
+                wall_duration=wall_duration,
+            )
+            if response is not None:
+                self._store_cache(messages, request_think, response, thinking, model=model)
                 return response
-            except ValidationError as e:
-                thinking = llm_call_response["message"].get("thinking")
-                logger.error(
-                    f"{self.__class__.__name__} failed to parse response "
-                    f"(attempt {attempt + 1}/{max_retries}): {content}"
-                    + (f"\nThinking: {thinking}" if thinking else "")
+
+            request_messages = self._corrective_messages(messages, content, last_error)
+            think = self._escalated_think(think)
+
+        raise last_error
+
+    async def call_stream(
+        self, input_: InModel, *, think=None, max_retries: int = 3
+    ) -> AsyncIterator["LLMStreamEvent[OutModel]"]:
+        """
+        Streaming variant of `call`.
+
+        Yields a "field" event for each top-level field of the output model as soon as its value is complete,
+        then a single "output" event with the validated output. Generation is aborted as soon as the closing
+        brace of the JSON object arrives. For RootModel (plain text) outputs only the "output" event is yielded.
+        """
+        render_started_at = time.perf_counter()
+        messages = self.render_messages(input_)
+        render_duration = time.perf_counter() - render_started_at
+        think = self._resolve_think(think)
+        request_think = think
+        output_model_format = self._output_model_format
+
+        router = get_model_router()
+        models = router.route(self.__class__.__name__, self._model_tiers)
+
+        cached_response = self._lookup_cache(messages, think, model=models[0])
+        if cached_response is not None:
+            self._record_metric(
+                None,
+                model=models[0],
+                streamed=True,
+                cached=True,
+                render_duration=render_duration,
+            )
+            if output_model_format is not None:
+                for field, value in cached_response.model_dump().items():
+                    yield LLMStreamEvent(type="field", field=field, value=value)
+            yield LLMStreamEvent(type="output", output=cached_response)
+            return
+
+        request_messages = messages
+        last_error: Exception | None = None
+        for attempt in range(max_retries):
+            model = router.model_for_attempt(models, attempt)
+            parser = (
+                IncrementalJSONObjectParser()
+                if output_model_format is not None
+                else None
+            )
+            content_chunks = []
+            thinking_chunks = []
+            last_chunk = None
+            aborted = False
+
+            queued_at = time.perf_counter()
+            async with get_llm_scheduler().slot(self._priority):
+                started_at = time.perf_counter()
+                stream = await self._client.chat(
+                    model=model,
+                    messages=request_messages,
+                    options=self._options,
+                    think=think,
+                    format=output_model_format,
+                    keep_alive=self._keep_alive,
+                    stream=True,
                 )
-                last_error = e
+                try:
+                    async for chunk in stream:
+                        last_chunk = chunk
+                        message = chunk["message"]
+                        if message.get("thinking"):
+                            thinking_chunks.append(message["thinking"])
+                        delta = message.get("content")
+                        if not delta:
+                            continue
+                        content_chunks.append(delta)
+
+                        if parser is None:
+                            continue
+                        for field, value in parser.feed(delta):
+                            yield LLMStreamEvent(type="field", field=field, value=value)
+                        if parser.done:
+                            # Everything after the closing brace is discarded anyway.
+                            logger.debug(
+                                "%s closing brace received, aborting generation",
+                                self.__class__.__name__,
+                            )
+                            aborted = True
+                            break
+                finally:
+                    # Closing the stream closes the HTTP response, which makes Ollama stop generating.
+                    aclose = getattr(stream, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
+
+            wall_duration = time.perf_counter() - started_at
+            router.residency.touch(model)
+            content = parser.text if parser is not None and parser.done else "".join(content_chunks)
+            thinking = "".join(thinking_chunks) or None
+
+            response, recovery_path, last_error = self._validate_content(
+                content, thinking=thinking, attempt=attempt, max_retries=max_retries
+            )
+            # The final chunk carries Ollama's durations and token counts (absent if aborted)
+            self._record_metric(
+                last_chunk,
+                model=model,
+                attempt=attempt,
+                streamed=True,
+                aborted=aborted,
+                recovery_path=recovery_path,
+                render_duration=render_duration if attempt == 0 else 0.0,
+                queue_wait=started_at - queued_at,
+                wall_duration=wall_duration,
+            )
+            if response is not None:
+                self._store_cache(messages, request_think, response, thinking, model=model)
+                yield LLMStreamEvent(type="output", output=response)
+                return
+
+            request_messages = self._corrective_messages(messages, content, last_error)
+            think = self._escalated_think(think)
 
         raise last_error
+
+    def _resolve_think(self, think: bool | str | None) -> bool | str | None:
+        if think is not None:
+            return think
+        return think_param(
+            self._think_policy.choose(self.__class__.__name__, default=self.default_think)
+        )
+
+    def _escalated_think(self, think: bool | str | None) -> bool | str | None:
+        """Think one level harder on the retry after a failed attempt."""
+        escalated = self._think_policy.escalate(think_level(think))
+        if escalated is None:
+            return think
+        logger.debug(f"{self.__class__.__name__} escalating think level to {escalated}")
+        return think_param(escalated)
+
+    def _record_metric(self, response, *, model: str | None = None, **kwargs):
+        get_metrics_registry().record_call(
+            call_name=self.__class__.__name__,
+            model=model or self._model,
+            response=response,
+            **kwargs,
+        )
+
+    def _validate_content(
+        self,
+        content: str | None,
+        *,
+        thinking: str | None,
+        attempt: int,
+        max_retries: int,
+    ) -> tuple[OutModel | None, RecoveryPath | None, Exception | None]:
+        """
+        Validate the LLM output, falling back to local JSON repair before another LLM round trip is paid.
+
+        Returns (output, recovery path, None) on success, or (None, None, error) when a corrective
+        follow-up turn is needed. The recovery path tells which path produced the output: "first_try",
+        "repaired" (local repair of a malformed response) or "corrective" (after a follow-up turn).
+        It is recorded on the attempt's LLMCallMetric.
+        """
+        name = self.__class__.__name__
+        if not content:
+            logger.warning(
+                f"{name} received empty response "
+                f"(attempt {attempt + 1}/{max_retries}), retrying..."
+            )
+            return None, None, ValueError("LLM returned empty response")
+
+        try:
+            response = self._parse_content(content)
+            logger.debug("%s Response:\n%s", name, response)
+            return response, "first_try" if attempt == 0 else "corrective", None
+        except ValidationError as e:
+            error = e
+
+        logger.error(
+            f"{name} failed to parse response "
+            f"(attempt {attempt + 1}/{max_retries}): {content}"
+            + (f"\nThinking: {thinking}" if thinking else "")
+        )
+
+        # Plain text outputs cannot be repaired
+        if self._output_model_format is not None:
+            repaired = repair_json(content)
+            if repaired is not None and repaired != content:
+                try:
+                    response = self._parse_content(repaired)
+                except ValidationError:
+                    pass
+                else:
+                    logger.warning(f"{name} repaired response locally: {repaired}")
+                    return response, "repaired", None
+
+        return None, None, error
+
+    def _corrective_messages(
+        self,
+        messages: list[dict[str, str]],
+        content: str | None,
+        error: Exception,
+    ) -> list[dict[str, str]]:
+        """Original messages plus a short follow-up turn that shows the model what was wrong."""
+        if not content:
+            instruction = "Your previous response was empty."
+            follow_up = []
+        else:
+            instruction = (
+                "Your previous response could not be parsed:\n"
+                f"{str(error)[:_MAX_CORRECTION_ERROR_LENGTH]}"
+            )
+            follow_up = [{"role": "assistant", "content": content}]
+
+        if self._output_model_format is not None:
+            instruction += "\nRespond again with only a JSON object that follows the required schema."
+        else:
+            instruction += "\nRespond again with the answer text only."
+
+        return [*messages, *follow_up, {"role": "user", "content": instruction}]
+
+    def _cache_key(self, messages: list[dict[str, str]], think, *, model: str) -> str:
+        return make_cache_key(
+            model=model,
+            options=self._options,
+            think=think,
+            format=self._output_model_format,
+            messages=messages,
+        )
+
+    def _lookup_cache(
+        self, messages: list[dict[str, str]], think, *, model: str
+    ) -> OutModel | None:
+        """Parsed cached output of `model` for this request, or None (also when caching is disabled)."""
+        if self._response_cache is None:
+            return None
+
+        cache_key = self._cache_key(messages, think, model=model)
+        cached = self._response_cache.get(cache_key, call_name=self.__class__.__name__)
+        if cached is None:
+            return None
+
+        try:
+            response = self._parse_content(cached["message"]["content"])
+        except (KeyError, ValidationError):
+            # e.g. the output model changed after the entry was written
+            logger.warning(f"{self.__class__.__name__} ignored invalid cache entry {cache_key}")
+            return None
+
+        logger.debug("%s Response (cached):\n%s", self.__class__.__name__, response)
+        return response
+
+    def _store_cache(
+        self,
+        messages: list[dict[str, str]],
+        think,
+        response: OutModel,
+        thinking: str | None,
+        *,
+        model: str,
+    ):
+        """
+        Cache `response` under the model that produced it. An answer of a routed or escalated model
+        is therefore only replayed to calls that would ask that model first.
+        `messages` and `think` are those of the original request, not of a corrective retry.
+        """
+        if self._response_cache is None:
+            return
+        # Store the validated output rather than the raw content, which may have needed repair.
+        if isinstance(response, RootModel):
+            content = response.root
+        else:
+            content = response.model_dump_json()
+        self._response_cache.put(
+            self._cache_key(messages, think, model=model),
+            {
+                "model": model,
+                "message": {
+                    "role": "assistant",
+                    "content": content,
+                    "thinking": thinking,
+                },
+            },
+            call_name=self.__class__.__name__,
+        )
+
+    def _parse_content(self, content: str) -> OutModel:
+        if issubclass(self._output_model, RootModel):
+            # RootModel[str] case: validate plain text
+            return self._output_model.model_validate(content)
+        # BaseModel object output: JSON validate
+        return self._output_model.model_validate_json(content)
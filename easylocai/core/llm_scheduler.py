@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from easylocai.core.llm_settings import (
+    Priority,
+    SchedulerSettings,
+    get_llm_settings,
+)
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANKS: dict[Priority, int] = {
+    "high": 0,
+    "normal": 1,
+    "low": 2,
+}
+
+
+class _PriorityStats:
+    __slots__ = ("requests", "cancelled", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.requests = 0
+        self.cancelled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "cancelled": self.cancelled,
+            "avg_wait": self.total_wait / self.requests if self.requests else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+class LLMScheduler:
+    """
+    Priority scheduler shared by every call to the Ollama server.
+
+    At most `max_in_flight` requests run at once (match OLLAMA_NUM_PARALLEL, otherwise the server just
+    queues the excess FIFO). Waiting requests are served by priority, then in arrival order, so the
+    user-facing path (e.g. Replanner producing the final answer) does not starve behind background work
+    (e.g. result filtering).
+
+    Cancelling a task that waits for a slot removes it from the queue; cancelling a task that holds a
+    slot cancels its HTTP request and frees the slot.
+    """
+
+    def __init__(self, max_in_flight: int = 1):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self._max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._stats = {priority: _PriorityStats() for priority in PRIORITY_RANKS}
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = "normal") -> AsyncIterator[None]:
+        """Hold one of the in-flight slots for the duration of the block."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self._max_in_flight,
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "by_priority": {
+                priority: stats.to_dict() for priority, stats in self._stats.items()
+            },
+        }
+
+    async def _acquire(self, priority: Priority):
+        stats = self._stats[priority]
+        stats.requests += 1
+
+        if self._in_flight < self._max_in_flight and not self.queued:
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (PRIORITY_RANKS[priority], next(self._sequence), waiter)
+        )
+        queued_at = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before the cancellation: pass it on.
+                self._release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            wait = time.perf_counter() - queued_at
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+
+        if wait > 1:
+            logger.debug(f"LLM request ({priority}) waited {wait:.2f}s for a slot")
+
+    def _release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # Hand the slot over directly; in_flight stays the same.
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+
+_llm_scheduler: LLMScheduler | None = None
+_llm_scheduler_settings: SchedulerSettings | None = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Process-wide scheduler built from `LLMSettings.scheduler`."""
+    global _llm_scheduler, _llm_scheduler_settings
+
+    settings = get_llm_settings().scheduler
+    if settings is not _llm_scheduler_settings:
+        _llm_scheduler = LLMScheduler(settings.max_in_flight)
+        _llm_scheduler_settings = settings
+    return _llm_scheduler
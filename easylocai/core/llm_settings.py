@@ -0,0 +1,208 @@
+import os
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+MessageLayout = Literal["default", "prefix_stable"]
+CacheMode = Literal["write_through", "read_only", "bypass"]
+Priority = Literal["high", "normal", "low"]
+ThinkLevel = Literal["off", "low", "medium", "high"]
+
+
+def _default_max_in_flight() -> int:
+    return int(os.environ.get("OLLAMA_NUM_PARALLEL", "1"))
+
+
+def _default_max_loaded_models() -> int:
+    return int(os.environ.get("OLLAMA_MAX_LOADED_MODELS", "2"))
+
+
+class SchedulerSettings(BaseModel):
+    max_in_flight: int = Field(
+        default_factory=_default_max_in_flight,
+        ge=1,
+        description="Maximum concurrent requests to Ollama. Defaults to $OLLAMA_NUM_PARALLEL or 1.",
+    )
+    priority_by_call: dict[str, Priority] = Field(
+        default_factory=dict,
+        description="Priority override per LLM call class name (e.g. {'TaskResultFilter': 'normal'}).",
+    )
+
+
+class ResponseCacheSettings(BaseModel):
+    mode: CacheMode = Field(
+        default="write_through",
+        description="'write_through' reads and writes, 'read_only' never writes, 'bypass' disables lookups and writes.",
+    )
+    path: str | None = Field(
+        default=None,
+        description="Cache directory. Defaults to ~/.easylocai/cache/llm",
+    )
+    max_size_mb: int = Field(
+        default=512,
+        description="Least recently used entries are evicted above this size.",
+    )
+    mode_by_call: dict[str, CacheMode] = Field(
+        default_factory=dict,
+        description="Mode override per LLM call class name (e.g. {'Reasoning': 'bypass'}).",
+    )
+
+
+class TokenBudgetSettings(BaseModel):
+    enabled: bool = Field(
+        default=True,
+        description="Trim prompt inputs to fit the context window and send num_ctx with every call.",
+    )
+    num_ctx: int = Field(
+        default=16384,
+        description="Context window requested from Ollama. Kept fixed so that the model is not reloaded.",
+    )
+    response_reserve_tokens: int = Field(
+        default=4096,
+        description="Tokens kept free for thinking and the response.",
+    )
+    max_prompt_tokens_by_call: dict[str, int] = Field(
+        default_factory=dict,
+        description="Prompt token budget per LLM call class name. Defaults to num_ctx - response_reserve_tokens.",
+    )
+
+    def max_prompt_tokens_for(self, call_name: str) -> int:
+        return self.max_prompt_tokens_by_call.get(
+            call_name, self.num_ctx - self.response_reserve_tokens
+        )
+
+
+class ThinkPolicySettings(BaseModel):
+    enabled: bool = Field(
+        default=True,
+        description="Adapt the think level per call. When disabled, every call uses its static level.",
+    )
+    level_by_call: dict[str, ThinkLevel] = Field(
+        default_factory=dict,
+        description="Base think level per LLM call class name (e.g. {'TaskRouter': 'low'}).",
+    )
+    min_level: ThinkLevel = Field(
+        default="low",
+        description="Lowest level the policy may pick. 'off' is only usable with models that can disable thinking.",
+    )
+    max_level: ThinkLevel = Field(
+        default="high",
+        description="Highest level the policy may escalate to.",
+    )
+    short_text_chars: int = Field(
+        default=80,
+        description="Subtasks up to this length are considered trivial and get one level less.",
+    )
+    long_text_chars: int = Field(
+        default=400,
+        description="Subtasks longer than this get one level more.",
+    )
+    low_confidence: int = Field(
+        default=50,
+        description="Reasoning confidence (0-100) below which the think level is escalated.",
+    )
+    max_escalations: int = Field(
+        default=1,
+        ge=0,
+        description="How many times a low-confidence reasoning answer is regenerated with a higher level.",
+    )
+
+
+class ModelRoutingSettings(BaseModel):
+    model_by_call: dict[str, str] = Field(
+        default_factory=dict,
+        description="Model per LLM call class name (e.g. {'SubtaskResultFilter': 'qwen3:4b'}).",
+    )
+    escalation_model: str | None = Field(
+        default=None,
+        description="Model used after an output validation failure. Defaults to the call's built-in model.",
+    )
+    prefer_resident: bool = Field(
+        default=True,
+        description="Skip to the escalation model when it is loaded and the call's model is not.",
+    )
+    max_loaded_models: int = Field(
+        default_factory=_default_max_loaded_models,
+        ge=1,
+        description="Models Ollama keeps loaded at once. Defaults to $OLLAMA_MAX_LOADED_MODELS or 2.",
+    )
+    residency_ttl: float = Field(
+        default=300,
+        description="Seconds a model is assumed to stay loaded after its last use (Ollama's default keep_alive).",
+    )
+
+
+class LLMSettings(BaseModel):
+    """
+    Process-wide settings shared by every LLMCallV2 instance.
+
+    Loaded from the optional "llm" section of the user config file.
+    """
+
+    message_layout: MessageLayout = Field(
+        default="default",
+        description=(
+            "'default' renders everything into one user message. "
+            "'prefix_stable' puts stable sections (system prompt, prior turns) "
+            "first as separate messages so that Ollama can reuse its prompt cache."
+        ),
+    )
+    keep_alive: str | float | None = Field(
+        default=None,
+        description="Ollama keep_alive for every call (e.g. '30m', -1). None uses the server default.",
+    )
+    keep_alive_by_call: dict[str, str | float] = Field(
+        default_factory=dict,
+        description="keep_alive override per LLM call class name (e.g. {'Reasoning': '5m'}).",
+    )
+
+    response_cache: ResponseCacheSettings | None = Field(
+        default=None,
+        description="On-disk cache of validated LLM responses. Disabled when None.",
+    )
+
+    scheduler: SchedulerSettings = Field(
+        default_factory=SchedulerSettings,
+        description="Concurrency limit and priorities of requests to Ollama.",
+    )
+
+    token_budget: TokenBudgetSettings = Field(
+        default_factory=TokenBudgetSettings,
+        description="Per-call prompt token budgets and num_ctx.",
+    )
+
+    think_policy: ThinkPolicySettings = Field(
+        default_factory=ThinkPolicySettings,
+        description="Think level per call and its escalation.",
+    )
+
+    model_routing: ModelRoutingSettings = Field(
+        default_factory=ModelRoutingSettings,
+        description="Model per call, escalation on validation failure and residency-aware ordering.",
+    )
+
+    metrics_path: str | None = Field(
+        default=None,
+        description="File the per-call LLM metrics are written to (JSON) at the end of a session.",
+    )
+
+    def keep_alive_for(self, call_name: str) -> str | float | None:
+        return self.keep_alive_by_call.get(call_name, self.keep_alive)
+
+
+_llm_settings = LLMSettings()
+
+
+def get_llm_settings() -> LLMSettings:
+    return _llm_settings
+
+
+def configure_llm_settings(settings: LLMSettings | dict | None) -> LLMSettings:
+    """Replace the process-wide settings. Must be called before LLM calls are constructed."""
+    global _llm_settings
+    if settings is None:
+        settings = LLMSettings()
+    elif isinstance(settings, dict):
+        settings = LLMSettings.model_validate(settings)
+    _llm_settings = settings
+    return _llm_settings
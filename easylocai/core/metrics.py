@@ -0,0 +1,306 @@
+import json
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_NANOSECONDS = 1_000_000_000
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded.
+LATENCY_BUCKETS: tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+_current_agent: ContextVar[str | None] = ContextVar("easylocai_agent", default=None)
+_current_run_id: ContextVar[str | None] = ContextVar("easylocai_run_id", default=None)
+
+
+@contextmanager
+def metrics_scope(*, agent: str | None = None, run_id: str | None = None) -> Iterator[None]:
+    """Tag every LLM call made inside the block with the given agent and/or workflow run id."""
+    agent_token = _current_agent.set(agent) if agent is not None else None
+    run_id_token = _current_run_id.set(run_id) if run_id is not None else None
+    try:
+        yield
+    finally:
+        if run_id_token is not None:
+            _current_run_id.reset(run_id_token)
+        if agent_token is not None:
+            _current_agent.reset(agent_token)
+
+
+async def scoped_stream(
+    stream: AsyncIterator[T], *, agent: str | None = None, run_id: str | None = None
+) -> AsyncIterator[T]:
+    """
+    Re-yield `stream` with `metrics_scope` active only while the stream itself runs.
+
+    The scope is entered per step rather than around the whole loop, so it never leaks into
+    the consumer's code between items.
+    """
+    while True:
+        with metrics_scope(agent=agent, run_id=run_id):
+            try:
+                item = await anext(stream)
+            except StopAsyncIteration:
+                return
+        yield item
+
+
+class LLMCallMetric(BaseModel):
+    call_name: str
+    model: str
+    agent: str | None = None
+    run_id: str | None = None
+    # 0-based; > 0 means a corrective retry
+    attempt: int = 0
+    streamed: bool = False
+    # served from the response cache, no request was sent
+    cached: bool = False
+    # streamed generation aborted at the closing brace; Ollama reports no durations/counts then
+    aborted: bool = False
+    # How the attempt produced a valid output: "first_try", "repaired" (local JSON repair) or
+    # "corrective" (after a corrective follow-up turn). None if it did not, or for a cache hit.
+    recovery_path: str | None = None
+    recorded_at: float
+    # Seconds spent rendering the prompt (first attempt only), waiting for a scheduler slot and
+    # in the request itself (client side)
+    render_duration: float = 0.0
+    queue_wait: float = 0.0
+    wall_duration: float = 0.0
+    # Seconds / token counts reported by Ollama
+    total_duration: float | None = None
+    load_duration: float | None = None
+    prompt_eval_count: int | None = None
+    prompt_eval_duration: float | None = None
+    eval_count: int | None = None
+    eval_duration: float | None = None
+
+    @classmethod
+    def from_response(cls, response, **kwargs) -> "LLMCallMetric":
+        """Build a metric from an Ollama `ChatResponse` (or final stream chunk)."""
+
+        def seconds(key: str) -> float | None:
+            value = response.get(key) if response is not None else None
+            return value / _NANOSECONDS if value is not None else None
+
+        def count(key: str) -> int | None:
+            return response.get(key) if response is not None else None
+
+        return cls(
+            recorded_at=time.time(),
+            total_duration=seconds("total_duration"),
+            load_duration=seconds("load_duration"),
+            prompt_eval_count=count("prompt_eval_count"),
+            prompt_eval_duration=seconds("prompt_eval_duration"),
+            eval_count=count("eval_count"),
+            eval_duration=seconds("eval_duration"),
+            **kwargs,
+        )
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def observe(self, value: float):
+        self._counts[bisect_left(self._buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self) -> dict[str, Any]:
+        labels = [f"<={bound}" for bound in self._buckets] + [f">{self._buckets[-1]}"]
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(zip(labels, self._counts)),
+        }
+
+
+class _CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.cached = 0
+        self.retries = 0
+        self.aborted = 0
+        self.recovery: Counter[str] = Counter()
+        self.render_duration = 0.0
+        self.wall_duration = Histogram()
+        self.queue_wait = Histogram()
+        self.load_duration = 0.0
+        self.prompt_eval_count = 0
+        self.prompt_eval_duration = 0.0
+        self.eval_count = 0
+        self.eval_duration = 0.0
+
+    def add(self, metric: LLMCallMetric):
+        self.calls += 1
+        # Cache hits render their prompt too, for the cache key
+        self.render_duration += metric.render_duration
+        if metric.cached:
+            self.cached += 1
+            return
+        if metric.attempt > 0:
+            self.retries += 1
+        if metric.aborted:
+            self.aborted += 1
+        if metric.recovery_path is not None:
+            self.recovery[metric.recovery_path] += 1
+        self.wall_duration.observe(metric.wall_duration)
+        self.queue_wait.observe(metric.queue_wait)
+        self.load_duration += metric.load_duration or 0.0
+        # Token rates are only meaningful when both the count and its duration were reported
+        if metric.prompt_eval_count is not None and metric.prompt_eval_duration:
+            self.prompt_eval_count += metric.prompt_eval_count
+            self.prompt_eval_duration += metric.prompt_eval_duration
+        if metric.eval_count is not None and metric.eval_duration:
+            self.eval_count += metric.eval_count
+            self.eval_duration += metric.eval_duration
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "cached": self.cached,
+            "retries": self.retries,
+            "aborted": self.aborted,
+            "recovery": dict(self.recovery),
+            "render_duration": self.render_duration,
+            "wall_duration": self.wall_duration.to_dict(),
+            "queue_wait": self.queue_wait.to_dict(),
+            "load_duration": self.load_duration,
+            "prompt_eval_count": self.prompt_eval_count,
+            "prompt_eval_duration": self.prompt_eval_duration,
+            "prompt_tokens_per_sec": (
+                self.prompt_eval_count / self.prompt_eval_duration
+                if self.prompt_eval_duration
+                else None
+            ),
+            "eval_count": self.eval_count,
+            "eval_duration": self.eval_duration,
+            "eval_tokens_per_sec": (
+                self.eval_count / self.eval_duration if self.eval_duration else None
+            ),
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process registry of per-call LLM metrics.
+
+    Aggregates are kept per LLM call class, per agent and per workflow run; the raw records
+    are kept up to `max_records` (oldest dropped first) for the session dump.
+    Named counters record how often non-LLM fast paths fire (e.g. "subtask_prefilter.error").
+    """
+
+    def __init__(self, max_records: int = 10000):
+        self._records: deque[LLMCallMetric] = deque(maxlen=max_records)
+        self._by_call: dict[str, _CallStats] = defaultdict(_CallStats)
+        self._by_agent: dict[str, _CallStats] = defaultdict(_CallStats)
+        self._by_run: dict[str, _CallStats] = defaultdict(_CallStats)
+        self._total = _CallStats()
+        self._counters: Counter[str] = Counter()
+
+    @property
+    def records(self) -> list[LLMCallMetric]:
+        return list(self._records)
+
+    def record(self, metric: LLMCallMetric):
+        self._records.append(metric)
+        self._total.add(metric)
+        self._by_call[metric.call_name].add(metric)
+        self._by_agent[metric.agent or "-"].add(metric)
+        if metric.run_id is not None:
+            self._by_run[metric.run_id].add(metric)
+
+    def increment(self, name: str, value: int = 1):
+        self._counters[name] += value
+
+    def counters(self, prefix: str = "") -> dict[str, int]:
+        return {
+            name: count
+            for name, count in sorted(self._counters.items())
+            if name.startswith(prefix)
+        }
+
+    def hit_rate(self, prefix: str) -> float | None:
+        """`<prefix>hit` over all counters starting with `prefix`. None if none was counted."""
+        counters = self.counters(prefix)
+        total = sum(counters.values())
+        return counters.get(prefix + "hit", 0) / total if total else None
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "total": self._total.to_dict(),
+            "counters": self.counters(),
+            "by_call": {name: stats.to_dict() for name, stats in self._by_call.items()},
+            "by_agent": {name: stats.to_dict() for name, stats in self._by_agent.items()},
+            "by_run": {run_id: stats.to_dict() for run_id, stats in self._by_run.items()},
+        }
+
+    def dump(self, path: str | Path):
+        """Write the summary and raw records as JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "summary": self.summary(),
+                    "records": [record.model_dump() for record in self._records],
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    def clear(self):
+        self._records.clear()
+        self._by_call.clear()
+        self._by_agent.clear()
+        self._by_run.clear()
+        self._total = _CallStats()
+        self._counters.clear()
+
+    def record_call(
+        self,
+        *,
+        call_name: str,
+        model: str,
+        response=None,
+        **kwargs,
+    ) -> LLMCallMetric:
+        """Record one LLM request (or cache hit), tagged with the current agent and workflow run."""
+        metric = LLMCallMetric.from_response(
+            response,
+            call_name=call_name,
+            model=model,
+            agent=_current_agent.get(),
+            run_id=_current_run_id.get(),
+            **kwargs,
+        )
+        self.record(metric)
+        return metric
+
+
+_metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _metrics_registry
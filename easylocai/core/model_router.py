@@ -0,0 +1,94 @@
+import logging
+import time
+
+from easylocai.core.llm_settings import ModelRoutingSettings, get_llm_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelResidency:
+    """
+    Which models Ollama most likely has loaded, tracked from this process's own requests.
+
+    A model counts as resident if it is among the `max_loaded_models` most recently used models
+    and was used within `ttl` seconds. This avoids polling the server before every call.
+    """
+
+    def __init__(self, max_loaded_models: int, ttl: float):
+        self._max_loaded_models = max_loaded_models
+        self._ttl = ttl
+        self._last_used: dict[str, float] = {}
+
+    def touch(self, model: str):
+        self._last_used.pop(model, None)
+        self._last_used[model] = time.monotonic()
+        while len(self._last_used) > self._max_loaded_models:
+            # dicts keep insertion order: the first entry is the least recently used
+            del self._last_used[next(iter(self._last_used))]
+
+    def is_resident(self, model: str) -> bool:
+        last_used = self._last_used.get(model)
+        return last_used is not None and time.monotonic() - last_used <= self._ttl
+
+    def resident_models(self) -> list[str]:
+        return [model for model in self._last_used if self.is_resident(model)]
+
+
+class ModelRouter:
+    """
+    Routes each LLM call to a model tier list: the call's configured model first, then the
+    escalation model that is used once the output fails validation.
+
+    With `prefer_resident`, a call whose model is not loaded starts at the first tier that is,
+    so e.g. a small filter model does not evict the large model between two large-model calls.
+    """
+
+    def __init__(self, settings: ModelRoutingSettings):
+        self._settings = settings
+        self._residency = ModelResidency(settings.max_loaded_models, settings.residency_ttl)
+
+    @property
+    def residency(self) -> ModelResidency:
+        return self._residency
+
+    def model_for(self, call_name: str, default_model: str) -> str:
+        return self._settings.model_by_call.get(call_name, default_model)
+
+    def tiers(self, call_name: str, default_model: str) -> list[str]:
+        """Models in escalation order, without duplicates."""
+        models = [
+            self.model_for(call_name, default_model),
+            self._settings.escalation_model or default_model,
+        ]
+        return list(dict.fromkeys(models))
+
+    def route(self, call_name: str, tiers: list[str]) -> list[str]:
+        """The tiers to try for one call, residency-aware."""
+        if not self._settings.prefer_resident or self._residency.is_resident(tiers[0]):
+            return tiers
+        for index, model in enumerate(tiers[1:], start=1):
+            if self._residency.is_resident(model):
+                logger.debug(
+                    f"{call_name}: {tiers[0]} is not loaded, using resident {model} instead"
+                )
+                return tiers[index:]
+        return tiers
+
+    def model_for_attempt(self, tiers: list[str], attempt: int) -> str:
+        """Attempt 0 uses the first tier; every failed attempt moves one tier up."""
+        return tiers[min(attempt, len(tiers) - 1)]
+
+
+_model_router: ModelRouter | None = None
+_model_router_settings: ModelRoutingSettings | None = None
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router built from `LLMSettings.model_routing`."""
+    global _model_router, _model_router_settings
+
+    settings = get_llm_settings().model_routing
+    if settings is not _model_router_settings:
+        _model_router = ModelRouter(settings)
+        _model_router_settings = settings
+    return _model_router
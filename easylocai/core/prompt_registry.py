@@ -0,0 +1,88 @@
+import functools
+import logging
+import threading
+from pathlib import Path
+from typing import Type
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+from pydantic import BaseModel, RootModel
+
+from easylocai.utlis.resource_util import installed_resources_dir
+
+logger = logging.getLogger(__name__)
+
+
+class PromptRegistry:
+    """
+    Process-wide cache for everything LLMCallV2 derives from static resources.
+
+    - Jinja templates are loaded and compiled once per path.
+    - Templates without variables (system prompts) are rendered once and reused as text.
+    - Output model JSON schemas are generated once per model class.
+    """
+
+    def __init__(self, resources_dir: str | Path):
+        self._env = Environment(
+            loader=FileSystemLoader(str(resources_dir)),
+            undefined=StrictUndefined,
+            # prompts are part of the installed package and do not change at runtime
+            auto_reload=False,
+        )
+        self._lock = threading.Lock()
+        self._templates: dict[str, Template] = {}
+        self._static_texts: dict[str, str] = {}
+        self._output_formats: dict[Type[BaseModel], dict | None] = {}
+
+    def get_template(self, path: str) -> Template:
+        template = self._templates.get(path)
+        if template is not None:
+            return template
+
+        with self._lock:
+            template = self._templates.get(path)
+            if template is None:
+                logger.debug(f"Compiling prompt template: {path}")
+                template = self._env.get_template(path)
+                self._templates[path] = template
+        return template
+
+    def get_static_text(self, path: str) -> str:
+        """Render a template that takes no variables (e.g. a system prompt) once and cache the text."""
+        text = self._static_texts.get(path)
+        if text is not None:
+            return text
+
+        text = self.get_template(path).render()
+        self._static_texts[path] = text
+        return text
+
+    def get_output_format(self, output_model: Type[BaseModel]) -> dict | None:
+        """
+        Return the `format` argument sent to Ollama for the given output model.
+
+        If output model is a RootModel (e.g., RootModel[str]), no format is provided to LLM. (pure text)
+        Otherwise, JSON schema of the model is provided to LLM for structured output.
+        Caution: If RootModel is sent to LLM with format, wrong result is returned.
+        """
+        if output_model in self._output_formats:
+            return self._output_formats[output_model]
+
+        if issubclass(output_model, RootModel):
+            output_format = None
+        else:
+            output_format = output_model.model_json_schema()
+        self._output_formats[output_model] = output_format
+        return output_format
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self._static_texts.clear()
+            self._output_formats.clear()
+            if self._env.cache is not None:
+                self._env.cache.clear()
+
+
+@functools.cache
+def get_prompt_registry() -> PromptRegistry:
+    return PromptRegistry(installed_resources_dir())
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from easylocai.core.llm_settings import (
+    CacheMode,
+    ResponseCacheSettings,
+    get_llm_settings,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_dir() -> Path:
+    return Path.home() / ".easylocai" / "cache" / "llm"
+
+
+def make_cache_key(
+    *,
+    model: str,
+    options: dict[str, Any] | None,
+    think: bool | str | None,
+    format: dict | str | None,
+    messages: list[dict[str, Any]],
+) -> str:
+    """Content address of a chat request: everything that can change the model output."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "options": options,
+            "think": think,
+            "format": format,
+            "messages": messages,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Content-addressed on-disk cache of LLM chat responses with size-bounded LRU eviction.
+
+    Every entry is one JSON file named after its key. The file mtime is the last access time,
+    so the least recently used entries are evicted first once the directory exceeds `max_size_bytes`.
+
+    Modes:
+      - write_through: serve hits from disk, store responses of misses
+      - read_only: serve hits from disk, never write (e.g. shared/pre-warmed caches)
+      - bypass: neither read nor write
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_size_bytes: int,
+        mode: CacheMode = "write_through",
+        mode_by_call: dict[str, CacheMode] | None = None,
+    ):
+        self._path = Path(path).expanduser()
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._max_size_bytes = max_size_bytes
+        self._mode = mode
+        self._mode_by_call = mode_by_call or {}
+        self._lock = threading.Lock()
+
+        self._sizes: dict[str, int] = {}
+        for entry in self._path.glob("*.json"):
+            self._sizes[entry.stem] = entry.stat().st_size
+        self._total_size = sum(self._sizes.values())
+
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+    def mode_for(self, call_name: str | None = None) -> CacheMode:
+        if call_name is None:
+            return self._mode
+        return self._mode_by_call.get(call_name, self._mode)
+
+    def get(self, key: str, *, call_name: str | None = None) -> dict | None:
+        if self.mode_for(call_name) == "bypass":
+            return None
+
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            # touch for LRU ordering
+            os.utime(entry_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            self._hits += 1
+        return entry["response"]
+
+    def put(self, key: str, response: dict, *, call_name: str | None = None):
+        if self.mode_for(call_name) != "write_through":
+            return
+
+        data = json.dumps(
+            {"created_at": time.time(), "response": response},
+            ensure_ascii=False,
+            default=str,
+        ).encode("utf-8")
+        if len(data) > self._max_size_bytes:
+            logger.debug(f"Response of {len(data)} bytes is larger than the cache, skipped")
+            return
+
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, entry_path)
+
+        with self._lock:
+            self._total_size += len(data) - self._sizes.get(key, 0)
+            self._sizes[key] = len(data)
+            self._writes += 1
+            if self._total_size > self._max_size_bytes:
+                self._evict()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "writes": self._writes,
+                "evictions": self._evictions,
+                "entries": len(self._sizes),
+                "size_bytes": self._total_size,
+            }
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._sizes):
+                self._remove(key)
+
+    def _evict(self):
+        # Evict down to 90% of the budget so that every write near the limit does not scan the directory.
+        target_size = int(self._max_size_bytes * 0.9)
+        entries = []
+        for key in self._sizes:
+            try:
+                entries.append((self._entry_path(key).stat().st_mtime, key))
+            except FileNotFoundError:
+                entries.append((0.0, key))
+        entries.sort()
+
+        for _, key in entries:
+            if self._total_size <= target_size:
+                break
+            self._remove(key)
+            self._evictions += 1
+
+    def _remove(self, key: str):
+        self._total_size -= self._sizes.pop(key, 0)
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _entry_path(self, key: str) -> Path:
+        return self._path / f"{key}.json"
+
+
+_response_cache: LLMResponseCache | None = None
+_response_cache_settings: ResponseCacheSettings | None = None
+
+
+def get_response_cache() -> LLMResponseCache | None:
+    """Process-wide response cache built from `LLMSettings.response_cache`. None if caching is disabled."""
+    global _response_cache, _response_cache_settings
+
+    settings = get_llm_settings().response_cache
+    if settings is None:
+        return None
+    if settings is not _response_cache_settings:
+        _response_cache = LLMResponseCache(
+            settings.path or default_cache_dir(),
+            max_size_bytes=settings.max_size_mb * 1024 * 1024,
+            mode=settings.mode,
+            mode_by_call=settings.mode_by_call,
+        )
+        _response_cache_settings = settings
+    return _response_cache
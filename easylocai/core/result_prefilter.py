@@ -0,0 +1,82 @@
+import json
+import logging
+from typing import Any
+
+from easylocai.core.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+_REASONING_KEYS = {"reasoning", "final", "confidence"}
+
+
+class SubtaskResultPrefilter:
+    """
+    Rule-based stage in front of `SubtaskResultFilter` that returns the filtered text directly
+    when an LLM call cannot add value:
+
+    - error: `{"error": ...}` results are passed through as the failure reason
+    - reasoning_final: a reasoning result with confidence >= `min_reasoning_confidence` is reduced to its `final`
+    - small_content: the text of an unstructured tool result that fits in `max_chars`
+    - structured: structured content that fits in `max_chars`, as compact JSON
+
+    Anything else goes to the LLM. Every decision increments the `subtask_prefilter.<rule>`
+    counter of the metrics registry (`subtask_prefilter.llm` for the fallback).
+    """
+
+    COUNTER_PREFIX = "subtask_prefilter."
+
+    def __init__(self, *, max_chars: int = 800, min_reasoning_confidence: int = 80):
+        self._max_chars = max_chars
+        self._min_reasoning_confidence = min_reasoning_confidence
+
+    def apply(self, result: dict[str, Any]) -> str | None:
+        """The filtered result, or None if it needs the LLM filter."""
+        rule, text = self._match(result)
+        get_metrics_registry().increment(self.COUNTER_PREFIX + (rule or "llm"))
+        if rule is not None:
+            logger.debug(f"Subtask result prefiltered by rule '{rule}'")
+        return text
+
+    def _match(self, result: dict[str, Any]) -> tuple[str | None, str | None]:
+        if set(result) == {"error"}:
+            return "error", f"Error: {result['error']}"
+
+        if _REASONING_KEYS <= set(result):
+            confidence = result.get("confidence")
+            if (
+                isinstance(confidence, int)
+                and confidence >= self._min_reasoning_confidence
+                and isinstance(result["final"], str)
+            ):
+                return "reasoning_final", result["final"]
+            return None, None
+
+        if set(result) == {"content"}:
+            text = _content_text(result["content"])
+            if text is not None and len(text) <= self._max_chars:
+                return "small_content", text
+            return None, None
+
+        text = json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=str)
+        if len(text) <= self._max_chars:
+            return "structured", text
+        return None, None
+
+
+def _content_text(content: Any) -> str | None:
+    """Text of MCP tool content (a string or a list of content blocks). None if it has non-text blocks."""
+    if isinstance(content, str):
+        return content
+    if not isinstance(content, list):
+        return None
+
+    texts = []
+    for block in content:
+        if isinstance(block, dict):
+            block_type, text = block.get("type"), block.get("text")
+        else:
+            block_type, text = getattr(block, "type", None), getattr(block, "text", None)
+        if block_type != "text" or not isinstance(text, str):
+            return None
+        texts.append(text)
+    return "\n".join(texts)
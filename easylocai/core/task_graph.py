@@ -0,0 +1,60 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TaskGraph:
+    """
+    Dependency graph of planned tasks, identified by their index in the plan.
+
+    A task may only depend on tasks listed before it, which keeps the graph acyclic and makes the
+    plan order a valid topological order. Invalid edges (self, forward or out of range) are dropped.
+    """
+
+    def __init__(self, tasks: list[str], depends_on: list[list[int]]):
+        if len(tasks) != len(depends_on):
+            raise ValueError("tasks and depends_on must have the same length")
+        self._tasks = tasks
+        self._depends_on: list[tuple[int, ...]] = []
+        for index, dependencies in enumerate(depends_on):
+            valid = sorted({d for d in dependencies if 0 <= d < index})
+            if len(valid) != len(set(dependencies)):
+                logger.warning(
+                    f"Dropped invalid dependencies of task {index} ({tasks[index]}): "
+                    f"{sorted(set(dependencies) - set(valid))}"
+                )
+            self._depends_on.append(tuple(valid))
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def tasks(self) -> list[str]:
+        return list(self._tasks)
+
+    def task(self, index: int) -> str:
+        return self._tasks[index]
+
+    def dependencies(self, index: int) -> tuple[int, ...]:
+        return self._depends_on[index]
+
+    def ancestors(self, index: int) -> list[int]:
+        """All direct and transitive dependencies of a task, in plan order."""
+        seen = set()
+        stack = list(self._depends_on[index])
+        while stack:
+            dependency = stack.pop()
+            if dependency not in seen:
+                seen.add(dependency)
+                stack.extend(self._depends_on[dependency])
+        return sorted(seen)
+
+    def levels(self) -> list[list[int]]:
+        """Tasks grouped by depth; tasks of the same level do not depend on each other."""
+        depths: list[int] = []
+        for dependencies in self._depends_on:
+            depths.append(max((depths[d] + 1 for d in dependencies), default=0))
+        levels: list[list[int]] = [[] for _ in range(max(depths, default=-1) + 1)]
+        for index, depth in enumerate(depths):
+            levels[depth].append(index)
+        return levels
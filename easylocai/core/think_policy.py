@@ -0,0 +1,102 @@
+import logging
+
+from easylocai.core.llm_settings import (
+    ThinkLevel,
+    ThinkPolicySettings,
+    get_llm_settings,
+)
+
+logger = logging.getLogger(__name__)
+
+THINK_LEVELS: tuple[ThinkLevel, ...] = ("off", "low", "medium", "high")
+
+
+def think_param(level: ThinkLevel | None) -> bool | str | None:
+    """Value of Ollama's `think` parameter for a level. None leaves it to the server default."""
+    if level is None:
+        return None
+    if level == "off":
+        return False
+    return level
+
+
+def think_level(think: bool | str | None) -> ThinkLevel | None:
+    """Inverse of `think_param`. None if `think` is not a level (server default or plain `True`)."""
+    if think is False:
+        return "off"
+    if isinstance(think, str) and think in THINK_LEVELS:
+        return think
+    return None
+
+
+class ThinkPolicy:
+    """
+    Picks the think level of an LLM call from cheap signals, so trivial work does not pay for
+    reasoning tokens it does not need.
+
+    The base level of a call is `ThinkPolicySettings.level_by_call`, falling back to the call's
+    `default_think`. It is then adjusted one step at a time:
+    - down for short texts (e.g. a trivial subtask) when nothing went wrong before
+    - up for long texts, after failures, and when the previous answer had low confidence
+    and clamped to [min_level, max_level]. Calls without a base level are left to the server default.
+    """
+
+    def __init__(self, settings: ThinkPolicySettings | None = None):
+        self._settings = settings or get_llm_settings().think_policy
+
+    @property
+    def enabled(self) -> bool:
+        return self._settings.enabled
+
+    @property
+    def max_escalations(self) -> int:
+        return self._settings.max_escalations if self._settings.enabled else 0
+
+    def base_level(self, call_name: str, default: ThinkLevel | None) -> ThinkLevel | None:
+        return self._settings.level_by_call.get(call_name, default)
+
+    def choose(
+        self,
+        call_name: str,
+        *,
+        default: ThinkLevel | None,
+        text: str | None = None,
+        failures: int = 0,
+        previous_confidence: int | None = None,
+    ) -> ThinkLevel | None:
+        level = self.base_level(call_name, default)
+        if level is None or not self._settings.enabled:
+            return level
+
+        low_confidence = self.is_low_confidence(previous_confidence)
+        steps = failures + (1 if low_confidence else 0)
+        if text is not None:
+            if len(text) > self._settings.long_text_chars:
+                steps += 1
+            elif len(text) <= self._settings.short_text_chars and steps == 0:
+                steps -= 1
+
+        chosen = self._shift(level, steps)
+        if chosen != level:
+            logger.debug(
+                f"{call_name} think level {level} -> {chosen} "
+                f"(text={len(text) if text is not None else None} chars, failures={failures}, "
+                f"previous_confidence={previous_confidence})"
+            )
+        return chosen
+
+    def escalate(self, level: ThinkLevel | None) -> ThinkLevel | None:
+        """The next higher level, or None if the policy is disabled or `level` is already the maximum."""
+        if level is None or not self._settings.enabled:
+            return None
+        escalated = self._shift(level, 1)
+        return escalated if escalated != level else None
+
+    def is_low_confidence(self, confidence: int | None) -> bool:
+        return confidence is not None and confidence < self._settings.low_confidence
+
+    def _shift(self, level: ThinkLevel, steps: int) -> ThinkLevel:
+        lowest = THINK_LEVELS.index(self._settings.min_level)
+        highest = THINK_LEVELS.index(self._settings.max_level)
+        index = THINK_LEVELS.index(level) + steps
+        return THINK_LEVELS[max(lowest, min(highest, index))]
@@ -0,0 +1,135 @@
+import copy
+import json
+import logging
+import math
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English text and JSON under the gpt-oss tokenizer; errs on the side of more tokens.
+CHARS_PER_TOKEN = 3.5
+# Per-message overhead of the chat template (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_TRUNCATION_MARKER = " ...[truncated]... "
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_value_tokens(value: Any) -> int:
+    if isinstance(value, str):
+        return estimate_tokens(value)
+    return estimate_tokens(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def estimate_messages_tokens(messages: list[dict[str, str]]) -> int:
+    return sum(
+        estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+class TokenBudget:
+    """
+    Keeps prompt inputs of an LLM call within a token budget.
+
+    Only the given `fields` of the input are touched, in order (put the least important first):
+    1. Window: drop the oldest entries of list fields, keeping the last `keep_last` entries of each.
+    2. Truncate: shorten the largest remaining strings in those fields (head and tail are kept).
+
+    Token counts are estimated per entry, so the prompt does not need to be re-rendered while trimming.
+    """
+
+    def __init__(
+        self,
+        max_prompt_tokens: int,
+        *,
+        keep_last: int = 1,
+        min_truncated_tokens: int = 64,
+    ):
+        self.max_prompt_tokens = max_prompt_tokens
+        self._keep_last = keep_last
+        self._min_truncated_tokens = min_truncated_tokens
+
+    def section_tokens(self, input_dict: dict, fields: tuple[str, ...]) -> dict[str, int]:
+        """Estimated tokens per prompt section (input field)."""
+        return {
+            field: estimate_value_tokens(input_dict[field])
+            for field in fields
+            if input_dict.get(field)
+        }
+
+    def fit(
+        self, input_dict: dict, *, fields: tuple[str, ...], excess_tokens: int
+    ) -> dict:
+        """Return a copy of `input_dict` with about `excess_tokens` removed from `fields`."""
+        input_dict = {
+            key: copy.deepcopy(value) if key in fields else value
+            for key, value in input_dict.items()
+        }
+        remaining = excess_tokens
+
+        for field in fields:
+            if remaining <= 0:
+                break
+            entries = input_dict.get(field)
+            if not isinstance(entries, list):
+                continue
+            dropped = 0
+            while remaining > 0 and len(entries) - dropped > self._keep_last:
+                remaining -= estimate_value_tokens(entries[dropped]) + 1
+                dropped += 1
+            if dropped:
+                input_dict[field] = entries[dropped:]
+                logger.debug(f"Token budget: dropped {dropped} oldest entries of {field}")
+
+        if remaining > 0:
+            remaining = self._truncate_largest_strings(input_dict, fields, remaining)
+
+        if remaining > 0:
+            logger.warning(
+                f"Token budget: prompt still exceeds budget by ~{remaining} tokens after trimming {fields}"
+            )
+        return input_dict
+
+    def _truncate_largest_strings(
+        self, input_dict: dict, fields: tuple[str, ...], remaining: int
+    ) -> int:
+        # (tokens, container, key) of every string leaf, largest first
+        leaves = []
+        for field in fields:
+            if field in input_dict:
+                _collect_string_leaves(input_dict, field, leaves)
+        leaves.sort(key=lambda leaf: leaf[0], reverse=True)
+
+        for tokens, container, key in leaves:
+            if remaining <= 0:
+                break
+            target_tokens = max(self._min_truncated_tokens, tokens - remaining)
+            if target_tokens >= tokens:
+                continue
+            container[key] = _truncate_middle(container[key], target_tokens)
+            remaining -= tokens - estimate_tokens(container[key])
+            logger.debug(f"Token budget: truncated a {tokens}-token value to {target_tokens}")
+        return remaining
+
+
+def _collect_string_leaves(container, key, leaves: list):
+    value = container[key]
+    if isinstance(value, str):
+        leaves.append((estimate_tokens(value), container, key))
+    elif isinstance(value, dict):
+        for child_key in value:
+            _collect_string_leaves(value, child_key, leaves)
+    elif isinstance(value, list):
+        for index in range(len(value)):
+            _collect_string_leaves(value, index, leaves)
+
+
+def _truncate_middle(text: str, target_tokens: int) -> str:
+    keep_chars = max(0, int(target_tokens * CHARS_PER_TOKEN) - len(_TRUNCATION_MARKER))
+    head = keep_chars * 2 // 3
+    tail = keep_chars - head
+    return text[:head] + _TRUNCATION_MARKER + (text[-tail:] if tail else "")
@@ -1,10 +1,14 @@
+import hashlib
 import logging
 import os
+import re
+from collections import OrderedDict
 from contextlib import AsyncExitStack
 
 from mcp import StdioServerParameters, stdio_client, ClientSession
 from mcp import Tool as McpTool
 
+from easylocai.core.metrics import get_metrics_registry
 from easylocai.core.search_engine import Record
 from easylocai.search_engines.advanced_search_engine import AdvancedSearchEngine
 
@@ -136,14 +140,76 @@ class ServerManager:
         return await server.call_tool(tool_name, tool_args)
 
 
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case, surrounding punctuation and whitespace do not change which tools a query finds."""
+    return _WHITESPACE_PATTERN.sub(" ", query).strip().strip(".!?").strip().lower()
+
+
+class ToolSearchCache:
+    """
+    Bounded LRU cache of tool search results, keyed on (normalized query, top_k).
+
+    Entries are (server_name, tool_name) pairs, resolved to `Tool`s on every read. The cache is
+    cleared whenever the catalog fingerprint changes.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, int], list[tuple[str, str]]] = OrderedDict()
+        self._catalog_fingerprint: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str, top_k: int) -> list[tuple[str, str]] | None:
+        key = (normalize_query(query), top_k)
+        entry = self._entries.get(key)
+        if entry is None:
+            get_metrics_registry().increment("tool_search_cache.miss")
+            return None
+        self._entries.move_to_end(key)
+        get_metrics_registry().increment("tool_search_cache.hit")
+        return entry
+
+    def put(self, query: str, top_k: int, tool_keys: list[tuple[str, str]]):
+        key = (normalize_query(query), top_k)
+        self._entries[key] = tool_keys
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def set_catalog(self, records: list[Record]):
+        """Clear the cache if the tool catalog (ids and descriptions) differs from the last one."""
+        digest = hashlib.sha256()
+        for record in sorted(records, key=lambda r: r.id):
+            digest.update(f"{record.id}\0{record.document}\0".encode("utf-8"))
+        fingerprint = digest.hexdigest()
+        if fingerprint != self._catalog_fingerprint:
+            self.clear()
+            self._catalog_fingerprint = fingerprint
+
+    def clear(self):
+        self._entries.clear()
+
+
 class ToolManager:
-    def __init__(self, search_engine: AdvancedSearchEngine, *, mpc_servers: dict):
+    def __init__(
+        self,
+        search_engine: AdvancedSearchEngine,
+        *,
+        mpc_servers: dict,
+        search_cache_size: int = 256,
+    ):
         server_manager = ServerManager()
         server_manager.add_servers_from_dict(mpc_servers)
 
         self._server_manager = server_manager
         self._search_engine = search_engine
         self._tool_collection = None
+        self._search_cache = ToolSearchCache(search_cache_size) if search_cache_size > 0 else None
 
     async def initialize(self, async_stack: AsyncExitStack):
         await self._server_manager.initialize_servers(async_stack)
@@ -168,6 +234,9 @@ class ToolManager:
                 )
                 records.append(record)
 
+        if self._search_cache is not None:
+            self._search_cache.set_catalog(records)
+
         if len(records) == 0:
             logger.warning("No tools found to initialize in ToolManager.")
             return
@@ -175,13 +244,36 @@ class ToolManager:
         await self._tool_collection.add(records)
 
     async def search_tools(self, queries: list[str], *, n_results: int) -> list[Tool]:
-        results = await self._tool_collection.query(queries, top_k=n_results)
-        tools: list[Tool] = []
+        """
+        Up to `n_results` tools per query. A tool found by several queries is listed once, where
+        it was first found.
+        """
+        tool_keys_per_query: list[list[tuple[str, str]] | None] = [
+            self._search_cache.get(query, n_results) if self._search_cache is not None else None
+            for query in queries
+        ]
+
+        missing = [i for i, tool_keys in enumerate(tool_keys_per_query) if tool_keys is None]
+        if missing:
+            results = await self._tool_collection.query(
+                [queries[i] for i in missing], top_k=n_results
+            )
+            for i, result_set in zip(missing, results):
+                tool_keys = [
+                    (record.metadata["server_name"], record.metadata["tool_name"])
+                    for record in result_set
+                ]
+                tool_keys_per_query[i] = tool_keys
+                if self._search_cache is not None:
+                    self._search_cache.put(queries[i], n_results, tool_keys)
 
-        for result_set in results:
-            for record in result_set:
-                server_name = record.metadata["server_name"]
-                tool_name = record.metadata["tool_name"]
+        tools: list[Tool] = []
+        seen: set[tuple[str, str]] = set()
+        for tool_keys in tool_keys_per_query:
+            for server_name, tool_name in tool_keys:
+                if (server_name, tool_name) in seen:
+                    continue
+                seen.add((server_name, tool_name))
                 tool = self._server_manager.get_server(server_name).get_tool(tool_name)
                 tools.append(tool)
         return tools
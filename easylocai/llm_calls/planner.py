@@ -29,7 +29,9 @@ class PlannerOutput(BaseModel):
 
 
 class Planner(LLMCallV2[PlannerInput, PlannerOutput]):
-    def __init__(self, *, client):
+    budgeted_fields = ("conversation_histories",)
+
+    def __init__(self, *, client, **kwargs):
         model = GPT_OSS_20B
         system_prompt_path = "prompts/planner_system_prompt.jinja2"
         user_prompt_path = "prompts/planner_user_prompt.jinja2"
@@ -44,4 +46,5 @@ class Planner(LLMCallV2[PlannerInput, PlannerOutput]):
             user_prompt_path=user_prompt_path,
             output_model=PlannerOutput,
             options=options,
+            **kwargs,
         )
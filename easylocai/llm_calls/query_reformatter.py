@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 
+from easylocai.constants.model import GPT_OSS_20B
 from easylocai.core.llm_call import LLMCallV2
 from easylocai.schemas.common import UserConversation
 
@@ -27,8 +28,11 @@ class QueryReformatterOutput(BaseModel):
 
 
 class QueryReformatter(LLMCallV2[QueryReformatterInput, QueryReformatterOutput]):
-    def __init__(self, *, client):
-        model = "gpt-oss:20b"
+    budgeted_fields = ("previous_conversations",)
+    default_think = "low"
+
+    def __init__(self, *, client, **kwargs):
+        model = GPT_OSS_20B
         system_prompt_path = "prompts/query_reformatter_system_prompt.jinja2"
         user_prompt_path = "prompts/query_reformatter_user_prompt.jinja2"
         options = {
@@ -42,4 +46,5 @@ class QueryReformatter(LLMCallV2[QueryReformatterInput, QueryReformatterOutput])
             user_prompt_path=user_prompt_path,
             output_model=QueryReformatterOutput,
             options=options,
+            **kwargs,
         )
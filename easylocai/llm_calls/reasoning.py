@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 
+from easylocai.constants.model import GPT_OSS_20B
 from easylocai.core.llm_call import LLMCallV2
 from easylocai.schemas.context import ConversationHistory
 
@@ -49,8 +50,15 @@ class ReasoningOutput(BaseModel):
 
 
 class Reasoning(LLMCallV2[ReasoningInput, ReasoningOutput]):
-    def __init__(self, *, client):
-        model = "gpt-oss:20b"
+    budgeted_fields = (
+        "conversation_histories",
+        "previous_task_results",
+        "previous_subtask_results",
+    )
+    default_think = "medium"
+
+    def __init__(self, *, client, **kwargs):
+        model = GPT_OSS_20B
         system_prompt_path = "prompts/reasoning_system_prompt.jinja2"
         user_prompt_path = "prompts/reasoning_user_prompt.jinja2"
         options = {
@@ -64,4 +72,5 @@ class Reasoning(LLMCallV2[ReasoningInput, ReasoningOutput]):
             user_prompt_path=user_prompt_path,
             output_model=ReasoningOutput,
             options=options,
+            **kwargs,
         )
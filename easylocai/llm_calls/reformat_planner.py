@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field
+
+from easylocai.constants.model import GPT_OSS_20B
+from easylocai.core.llm_call import LLMCallV2
+from easylocai.schemas.context import ConversationHistory
+
+
+class ReformatPlannerInput(BaseModel):
+    user_query: str = Field(
+        title="User Query",
+        description="The user's original query.",
+    )
+    conversation_histories: list[ConversationHistory] = Field(
+        default_factory=list,
+        title="Conversation Histories",
+        description="Previous conversation turns for multi-turn context.",
+    )
+
+
+class ReformatPlannerOutput(BaseModel):
+    reformed_query: str = Field(
+        title="Reformed Query",
+        description="The reformed version of the user query.",
+    )
+    query_context: str | None = Field(
+        title="Query Context",
+        description="Background facts given as a preamble in the user query.",
+    )
+    tasks: list[str] = Field(
+        title="Tasks",
+        description="A list of atomic, independent, simple, and semantic tasks",
+    )
+
+
+class ReformatPlanner(LLMCallV2[ReformatPlannerInput, ReformatPlannerOutput]):
+    """QueryReformatter and Planner in one call, for queries without references to resolve."""
+
+    budgeted_fields = ("conversation_histories",)
+
+    def __init__(self, *, client, **kwargs):
+        model = GPT_OSS_20B
+        system_prompt_path = "prompts/reformat_planner_system_prompt.jinja2"
+        user_prompt_path = "prompts/reformat_planner_user_prompt.jinja2"
+        options = {
+            "temperature": 0.2,
+        }
+
+        super().__init__(
+            client=client,
+            model=model,
+            system_prompt_path=system_prompt_path,
+            user_prompt_path=user_prompt_path,
+            output_model=ReformatPlannerOutput,
+            options=options,
+            **kwargs,
+        )
@@ -23,7 +23,11 @@ class ReplannerOutput(BaseModel):
 
 
 class Replanner(LLMCallV2[ReplannerInput, ReplannerOutput]):
-    def __init__(self, *, client):
+    # produces the final answer to the user
+    default_priority = "high"
+    budgeted_fields = ("conversation_histories", "task_results")
+
+    def __init__(self, *, client, **kwargs):
         model = GPT_OSS_20B
         system_prompt_path = "prompts/replanner_system_prompt_c1_decision_tree_verbatim_plan.jinja2"
         user_prompt_path = "prompts/replanner_user_prompt_c1_decision_tree_verbatim_plan.jinja2"
@@ -38,4 +42,5 @@ class Replanner(LLMCallV2[ReplannerInput, ReplannerOutput]):
             user_prompt_path=user_prompt_path,
             output_model=ReplannerOutput,
             options=options,
+            **kwargs,
         )
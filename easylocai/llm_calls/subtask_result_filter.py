@@ -17,7 +17,11 @@ class SubtaskResultFilterOutput(RootModel[str]):
 class SubtaskResultFilter(
     LLMCallV2[SubtaskResultFilterInput, SubtaskResultFilterOutput]
 ):
-    def __init__(self, *, client):
+    default_priority = "low"
+    budgeted_fields = ("result",)
+    default_think = "low"
+
+    def __init__(self, *, client, **kwargs):
         model = GPT_OSS_20B
         system_prompt_path = "prompts/subtask_result_filter_system_prompt.jinja2"
         user_prompt_path = "prompts/subtask_result_filter_user_prompt.jinja2"
@@ -32,4 +36,5 @@ class SubtaskResultFilter(
             user_prompt_path=user_prompt_path,
             output_model=SubtaskResultFilterOutput,
             options=options,
+            **kwargs,
         )
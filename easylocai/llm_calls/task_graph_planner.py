@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field
+
+from easylocai.constants.model import GPT_OSS_20B
+from easylocai.core.llm_call import LLMCallV2
+from easylocai.llm_calls.planner import PlannerInput
+
+
+class PlannedTask(BaseModel):
+    task: str = Field(
+        title="Task",
+        description="An atomic, simple, and semantic task",
+    )
+    depends_on: list[int] = Field(
+        title="Depends On",
+        description="0-based indices of earlier tasks whose results this task needs",
+    )
+
+
+class TaskGraphPlannerOutput(BaseModel):
+    tasks: list[PlannedTask] = Field(
+        title="Tasks",
+        description="Tasks in execution order with their dependencies",
+    )
+
+
+class TaskGraphPlanner(LLMCallV2[PlannerInput, TaskGraphPlannerOutput]):
+    """Planner variant that also returns dependency edges, so independent tasks can run in parallel."""
+
+    budgeted_fields = ("conversation_histories",)
+
+    def __init__(self, *, client, **kwargs):
+        model = GPT_OSS_20B
+        system_prompt_path = "prompts/task_graph_planner_system_prompt.jinja2"
+        user_prompt_path = "prompts/planner_user_prompt.jinja2"
+        options = {
+            "temperature": 0.2,
+        }
+
+        super().__init__(
+            client=client,
+            model=model,
+            system_prompt_path=system_prompt_path,
+            user_prompt_path=user_prompt_path,
+            output_model=TaskGraphPlannerOutput,
+            options=options,
+            **kwargs,
+        )
@@ -16,7 +16,11 @@ class TaskResultFilterOutput(RootModel[str]):
 
 
 class TaskResultFilter(LLMCallV2[TaskResultFilterInput, TaskResultFilterOutput]):
-    def __init__(self, *, client):
+    default_priority = "low"
+    budgeted_fields = ("subtask_results",)
+    default_think = "low"
+
+    def __init__(self, *, client, **kwargs):
         model = GPT_OSS_20B
         system_prompt_path = "prompts/task_result_filter_system_prompt.jinja2"
         user_prompt_path = "prompts/task_result_filter_user_prompt.jinja2"
@@ -31,4 +35,5 @@ class TaskResultFilter(LLMCallV2[TaskResultFilterInput, TaskResultFilterOutput])
             user_prompt_path=user_prompt_path,
             output_model=TaskResultFilterOutput,
             options=options,
+            **kwargs,
         )
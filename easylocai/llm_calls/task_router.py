@@ -2,6 +2,7 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from easylocai.constants.model import GPT_OSS_20B
 from easylocai.core.llm_call import LLMCallV2
 from easylocai.schemas.context import ConversationHistory
 
@@ -48,8 +49,14 @@ class TaskRouterOutputV2(BaseModel):
 
 
 class TaskRouter(LLMCallV2[TaskRouterInput, TaskRouterOutput]):
-    def __init__(self, *, client):
-        model = "gpt-oss:20b"
+    budgeted_fields = (
+        "conversation_histories",
+        "previous_task_results",
+        "iteration_results",
+    )
+
+    def __init__(self, *, client, **kwargs):
+        model = GPT_OSS_20B
         system_prompt_path = "prompts/task_router_system_prompt.jinja2"
         user_prompt_path = "prompts/task_router_user_prompt.jinja2"
         options = {
@@ -63,4 +70,29 @@ class TaskRouter(LLMCallV2[TaskRouterInput, TaskRouterOutput]):
             user_prompt_path=user_prompt_path,
             output_model=TaskRouterOutput,
             options=options,
+            **kwargs,
+        )
+
+
+class TaskRouterV2(LLMCallV2[TaskRouterInput, TaskRouterOutputV2]):
+    """Routes several independent subtasks at once, to be executed in parallel."""
+
+    budgeted_fields = TaskRouter.budgeted_fields
+
+    def __init__(self, *, client, **kwargs):
+        model = GPT_OSS_20B
+        system_prompt_path = "prompts/task_router_system_prompt_v2.jinja2"
+        user_prompt_path = "prompts/task_router_user_prompt.jinja2"
+        options = {
+            "temperature": 0.2,
+        }
+
+        super().__init__(
+            client=client,
+            model=model,
+            system_prompt_path=system_prompt_path,
+            user_prompt_path=user_prompt_path,
+            output_model=TaskRouterOutputV2,
+            options=options,
+            **kwargs,
         )
@@ -2,6 +2,7 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from easylocai.constants.model import GPT_OSS_20B
 from easylocai.core.llm_call import LLMCallV2
 from easylocai.schemas.context import ConversationHistory
 
@@ -48,6 +49,7 @@ class ToolSelectorInputV2(BaseModel):
     original_task: str
     subtasks: list[str]
     query_context: str | None
+    conversation_histories: list[ConversationHistory] = Field(default_factory=list)
     tool_candidates: list[dict]
     previous_task_results: list[dict]
     iteration_results: list[dict]
@@ -68,8 +70,14 @@ class ToolSelectorOutputV2(BaseModel):
 
 
 class ToolSelector(LLMCallV2[ToolSelectorInput, ToolSelectorOutput]):
-    def __init__(self, *, client):
-        model = "gpt-oss:20b"
+    budgeted_fields = (
+        "conversation_histories",
+        "previous_task_results",
+        "iteration_results",
+    )
+
+    def __init__(self, *, client, **kwargs):
+        model = GPT_OSS_20B
         system_prompt_path = "prompts/tool_selector_system_prompt.jinja2"
         user_prompt_path = "prompts/tool_selector_user_prompt.jinja2"
         options = {
@@ -83,4 +91,29 @@ class ToolSelector(LLMCallV2[ToolSelectorInput, ToolSelectorOutput]):
             user_prompt_path=user_prompt_path,
             output_model=ToolSelectorOutput,
             options=options,
+            **kwargs,
+        )
+
+
+class ToolSelectorV2(LLMCallV2[ToolSelectorInputV2, ToolSelectorOutputV2]):
+    """Selects tools for several independent subtasks in one call."""
+
+    budgeted_fields = ToolSelector.budgeted_fields
+
+    def __init__(self, *, client, **kwargs):
+        model = GPT_OSS_20B
+        system_prompt_path = "prompts/tool_selector_system_prompt_v2.jinja2"
+        user_prompt_path = "prompts/tool_selector_user_prompt_v2.jinja2"
+        options = {
+            "temperature": 0.2,
+        }
+
+        super().__init__(
+            client=client,
+            model=model,
+            system_prompt_path=system_prompt_path,
+            user_prompt_path=user_prompt_path,
+            output_model=ToolSelectorOutputV2,
+            options=options,
+            **kwargs,
         )
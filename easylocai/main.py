@@ -1,28 +1,55 @@
 import json
 import logging
 from contextlib import AsyncExitStack
+from pathlib import Path
 
 from ollama import AsyncClient
 from rich import get_console
 
 from easylocai.config import user_config_path
+from easylocai.core.llm_scheduler import get_llm_scheduler
+from easylocai.core.llm_settings import configure_llm_settings, get_llm_settings
+from easylocai.core.metrics import get_metrics_registry
+from easylocai.core.response_cache import get_response_cache
 from easylocai.schemas.context import GlobalContext
 from easylocai.search_engines.advanced_search_engine import AdvancedSearchEngine
-from easylocai.utlis.console_util import ConsoleSpinner, multiline_input, render_chat
+from easylocai.utlis.console_util import multiline_input, render_chat, stream_answer
 from easylocai.workflow import EasylocaiWorkflow
 
 logger = logging.getLogger(__name__)
 
 
-async def run_agent_workflow_main():
+def load_config_dict() -> dict:
+    with open(user_config_path()) as f:
+        config_dict = json.load(f)
+
+    # LLM calls read these settings when they are constructed, so configure them before any workflow.
+    configure_llm_settings(config_dict.get("llm"))
+    return config_dict
+
+
+def log_session_stats():
+    logger.info(f"LLM scheduler stats: {get_llm_scheduler().stats()}")
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        logger.info(f"LLM response cache stats: {response_cache.stats()}")
+
+    metrics_registry = get_metrics_registry()
+    logger.info(f"LLM call metrics: {metrics_registry.summary()['by_call']}")
+    logger.info(f"Fast path counters: {metrics_registry.counters()}")
+    logger.info(f"Speculation hit rate: {metrics_registry.hit_rate('speculation.')}")
+    logger.info(f"Tool search cache hit rate: {metrics_registry.hit_rate('tool_search_cache.')}")
+    metrics_path = get_llm_settings().metrics_path
+    if metrics_path is not None:
+        metrics_registry.dump(Path(metrics_path).expanduser())
+
+
+async def run_agent_workflow_main(*, resume: bool = False, run_id: str | None = None):
     console = get_console()
 
     ollama_client = AsyncClient(host="http://localhost:11434")
     search_engine = AdvancedSearchEngine()
-
-    config_path = user_config_path()
-    with open(config_path) as f:
-        config_dict = json.load(f)
+    config_dict = load_config_dict()
 
     workflow = EasylocaiWorkflow(
         config_dict=config_dict,
@@ -37,6 +64,28 @@ async def run_agent_workflow_main():
     async with stack:
         await workflow.initialize(stack)
 
+        if resume:
+            checkpoint = workflow.load_checkpoint(run_id)
+            if not workflow.checkpoints_enabled:
+                console.print(
+                    "Checkpointing is off. Set workflow.checkpoint_dir in the config to resume runs."
+                )
+            elif checkpoint is None:
+                console.print("No unfinished run to resume.")
+            else:
+                for history in checkpoint.workflow_context.conversation_histories:
+                    messages.append({"role": "user", "content": history.original_user_query})
+                    messages.append({"role": "assistant", "content": history.response})
+                messages.append(
+                    {"role": "user", "content": checkpoint.workflow_context.original_user_query}
+                )
+                render_chat(console, messages)
+                await stream_answer(
+                    console,
+                    workflow.resume(checkpoint, global_context=global_context),
+                    messages,
+                )
+
         while True:
             render_chat(console, messages)
             try:
@@ -51,17 +100,13 @@ async def run_agent_workflow_main():
             messages.append({"role": "user", "content": user_input})
             render_chat(console, messages)
 
-            async_generator = workflow.run(user_input, global_context=global_context)
+            await stream_answer(
+                console,
+                workflow.run(user_input, global_context=global_context),
+                messages,
+            )
 
-            answer = None
-            with ConsoleSpinner(console) as spinner:
-                async for output in async_generator:
-                    if output.type == "status":
-                        spinner.set_prefix(output.message)
-                        continue
-                    if output.type == "result":
-                        answer = output.message
-                        messages.append({"role": "assistant", "content": answer})
+    log_session_stats()
 
 
 workflow_registry = {
@@ -69,7 +114,9 @@ workflow_registry = {
 }
 
 
-async def run_agent_workflow(flag: str | None = None):
+async def run_agent_workflow(
+    flag: str | None = None, *, resume: bool = False, run_id: str | None = None
+):
     if flag is None:
         flag = "main"
 
@@ -77,4 +124,4 @@ async def run_agent_workflow(flag: str | None = None):
     if workflow_function is None:
         raise ValueError(f"Unknown workflow flag: {flag}")
 
-    await workflow_function()
+    await workflow_function(resume=resume, run_id=run_id)
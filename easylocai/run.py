@@ -4,8 +4,7 @@ import logging
 import logging.config
 import sys
 
-from easylocai.config import ensure_user_config
-from easylocai.main import run_agent_workflow
+from easylocai.config import DEFAULT_SOCKET_PATH, ensure_user_config
 from easylocai.utlis.loggers.default_dict import make_logging_config
 
 logger = logging.getLogger(__name__)
@@ -31,6 +30,64 @@ def build_parser() -> argparse.ArgumentParser:
         help="Overwrite existing config",
     )
 
+    # easylocai resume [run_id]
+    resume_parser = subparsers.add_parser(
+        "resume",
+        help="Continue an interrupted run from its last checkpoint",
+    )
+    resume_parser.add_argument(
+        "run_id",
+        nargs="?",
+        default=None,
+        help="Run to resume (default: the most recent unfinished run)",
+    )
+
+    # easylocai batch queries.jsonl -o results.jsonl
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Answer every query of a JSONL file without the interactive UI",
+    )
+    batch_parser.add_argument(
+        "input",
+        help='JSONL file with one query per line: {"id": "...", "query": "..."} or a JSON string',
+    )
+    batch_parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="JSONL file for the results, written as queries finish (default: stdout)",
+    )
+    batch_parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=2,
+        help="Number of queries run at once (default: 2)",
+    )
+
+    # easylocai serve / easylocai connect
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Keep MCP servers, the tool index and the model warm and answer runs over a Unix socket",
+    )
+    serve_parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of runs answered at once (default: 1)",
+    )
+    connect_parser = subparsers.add_parser(
+        "connect",
+        help="Interactive chat answered by a running 'easylocai serve'",
+    )
+    for subparser in (serve_parser, connect_parser):
+        subparser.add_argument(
+            "--socket",
+            default=DEFAULT_SOCKET_PATH,
+            help=f"Unix socket of the server (default: {DEFAULT_SOCKET_PATH})",
+        )
+
     # Global flag option for feature flags
     parser.add_argument(
         "--flag",
@@ -59,10 +116,43 @@ def run() -> int:
         print(f"Config initialized at: {path}")
         return 0
 
+    # Commands import their modules lazily: the client must start without loading the workflow stack.
+    if args.command == "connect":
+        from easylocai.client import run_client_main
+
+        try:
+            asyncio.run(run_client_main(args.socket))
+        except KeyboardInterrupt:
+            print("\nExiting...")
+        return 0
+
     ensure_user_config(overwrite=False)
 
+    if args.command == "batch":
+        from easylocai.batch import run_batch
+
+        asyncio.run(run_batch(args.input, args.output, concurrency=args.concurrency))
+        return 0
+
+    if args.command == "serve":
+        from easylocai.server import run_server
+
+        try:
+            asyncio.run(run_server(args.socket, concurrency=args.concurrency))
+        except KeyboardInterrupt:
+            print("\nStopped.")
+        return 0
+
+    from easylocai.main import run_agent_workflow
+
     try:
-        asyncio.run(run_agent_workflow(flag=args.flag))
+        asyncio.run(
+            run_agent_workflow(
+                flag=args.flag,
+                resume=args.command == "resume",
+                run_id=getattr(args, "run_id", None),
+            )
+        )
     except KeyboardInterrupt:
         print("\nExiting...")
         return 0
@@ -6,6 +6,8 @@ from pydantic import BaseModel, Field
 class EasyLocaiWorkflowOutput(BaseModel):
     type: Literal["status", "result"]
     message: str
+    # "result" only: True if a deadline cut the run short and `message` holds the results so far
+    partial: bool = False
 
 
 class UserConversation(BaseModel):
@@ -42,3 +42,6 @@ class SingleTaskAgentContext(BaseModel):
     # SingleTaskAgent-specific fields
     original_task: str
     subtask_results: list[SubtaskResult] = Field(default_factory=list)
+    # Think level signals for the task's reasoning subtasks
+    failed_subtasks: int = 0
+    reasoning_confidence: int | None = None
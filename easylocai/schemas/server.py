@@ -0,0 +1,19 @@
+from typing import Literal
+
+from pydantic import BaseModel, model_validator
+
+
+class ServerRequest(BaseModel):
+    """A request line sent to `easylocai serve`."""
+
+    # run: answer `query`; cancel: stop the current run; reset: forget the session's history
+    type: Literal["run", "cancel", "reset", "ping"]
+    query: str | None = None
+    # Conversation history is kept per session
+    session: str = "default"
+
+    @model_validator(mode="after")
+    def _check_query(self) -> "ServerRequest":
+        if self.type == "run" and not self.query:
+            raise ValueError("'run' requests need a query")
+        return self
@@ -0,0 +1,195 @@
+from array import array
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+
+class BM25Index:
+    """
+    Incrementally maintained BM25 (Okapi) index, scoring like `rank_bm25.BM25Okapi`.
+
+    Terms are interned to integer ids, and each document's term counts are appended to flat
+    integer arrays of (term id, doc index, frequency) postings, so the index holds neither the
+    token lists nor a Python object per posting. Appending documents only touches their own terms.
+    IDF and document length normalization depend on the whole corpus, so they are recomputed
+    lazily on the first query after an add instead of on every add.
+
+    For querying, the postings are laid out as a sparse term-document matrix in CSR form (one row
+    per term id) holding each posting's final BM25 weight. Scoring a query then only sums the rows
+    of its terms, and doesn't look at documents that contain none of them.
+    """
+
+    def __init__(self, *, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self._term_ids: dict[str, int] = {}
+        # Indexed by term id
+        self._doc_freqs = array("i")
+        # Postings in insertion order, so doc indices ascend within each term
+        self._posting_terms = array("i")
+        self._posting_docs = array("i")
+        self._posting_freqs = array("i")
+        self._doc_lens = array("i")
+        self._total_len = 0
+        self._idf: np.ndarray | None = None
+        # CSR matrix built from the postings; None when documents were added since
+        self._indptr: np.ndarray | None = None
+        self._doc_indices: np.ndarray | None = None
+        self._weights: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._doc_lens)
+
+    @property
+    def avgdl(self) -> float:
+        return self._total_len / len(self._doc_lens) if self._doc_lens else 0.0
+
+    def add(self, tokenized_documents: Iterable[list[str]]):
+        term_ids = self._term_ids
+        for tokens in tokenized_documents:
+            doc_index = len(self._doc_lens)
+            self._doc_lens.append(len(tokens))
+            self._total_len += len(tokens)
+            for term, frequency in Counter(tokens).items():
+                term_id = term_ids.get(term)
+                if term_id is None:
+                    term_id = term_ids[term] = len(term_ids)
+                    self._doc_freqs.append(0)
+                self._doc_freqs[term_id] += 1
+                self._posting_terms.append(term_id)
+                self._posting_docs.append(doc_index)
+                self._posting_freqs.append(frequency)
+        self._idf = None
+        self._weights = None
+
+    def document_frequency(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        return 0 if term_id is None else self._doc_freqs[term_id]
+
+    def term_id(self, term: str) -> int | None:
+        return self._term_ids.get(term)
+
+    def idf(self) -> np.ndarray:
+        """
+        Okapi IDF by term id. Terms in more than half of the documents would get a negative IDF;
+        they are floored at `epsilon` times the average IDF instead.
+        """
+        if self._idf is None:
+            doc_freqs = np.frombuffer(self._doc_freqs, dtype=np.int32).astype(np.float64)
+            idf = np.log(len(self._doc_lens) - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+            if len(idf):
+                idf[idf < 0] = self.epsilon * idf.mean()
+            self._idf = idf
+        return self._idf
+
+    def _build_matrix(self):
+        """Lay the postings out as CSR arrays with the BM25 weight of every (term, document) pair."""
+        idf = self.idf()
+        posting_terms = np.frombuffer(self._posting_terms, dtype=np.int32)
+        # Group the postings by term; stable, so doc indices stay ascending within a row
+        order = np.argsort(posting_terms, kind="stable")
+        row_lengths = np.frombuffer(self._doc_freqs, dtype=np.int32)
+        indptr = np.zeros(len(row_lengths) + 1, dtype=np.int64)
+        np.cumsum(row_lengths, out=indptr[1:])
+
+        doc_indices = np.frombuffer(self._posting_docs, dtype=np.int32)[order]
+        frequencies = np.frombuffer(self._posting_freqs, dtype=np.int32)[order].astype(np.float64)
+        length_norm = self.k1 * (
+            1 - self.b + self.b * np.frombuffer(self._doc_lens, dtype=np.int32) / self.avgdl
+        )
+        weights = (
+            np.repeat(idf, row_lengths)
+            * frequencies
+            * (self.k1 + 1)
+            / (frequencies + length_norm[doc_indices])
+        )
+
+        self._indptr = indptr
+        self._doc_indices = doc_indices
+        self._weights = weights
+
+    def get_scores(self, query_tokens: list[str]) -> np.ndarray:
+        """BM25 score of every document. Only the postings of the query terms are touched."""
+        return self.get_batch_scores([query_tokens])[0]
+
+    def get_batch_scores(self, list_of_query_tokens: list[list[str]]) -> np.ndarray:
+        """
+        BM25 scores of every document for several queries at once, shaped (queries, documents).
+
+        This is the sparse product of the query-term count matrix with the term-document weight
+        matrix: the postings rows of all (query, term) pairs are gathered in one pass and summed
+        per (query, document) with `bincount`.
+        """
+        query_count, doc_count = len(list_of_query_tokens), len(self._doc_lens)
+        if not doc_count or not query_count:
+            return np.zeros((query_count, doc_count))
+        if self._weights is None:
+            self._build_matrix()
+
+        # Nonzeros of the query-term matrix; a repeated query term counts once per occurrence,
+        # as in rank_bm25
+        query_ids, rows, counts = [], [], []
+        for query_id, query_tokens in enumerate(list_of_query_tokens):
+            for term, count in Counter(query_tokens).items():
+                row = self._term_ids.get(term)
+                if row is not None:
+                    query_ids.append(query_id)
+                    rows.append(row)
+                    counts.append(count)
+        if not rows:
+            return np.zeros((query_count, doc_count))
+
+        starts = self._indptr[rows]
+        lengths = self._indptr[np.array(rows) + 1] - starts
+        # Positions of all gathered postings: each row's range start..start + length, concatenated
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+        cells = np.repeat(np.array(query_ids, dtype=np.int64) * doc_count, lengths)
+        cells += self._doc_indices[positions]
+        values = np.repeat(np.array(counts, dtype=np.float64), lengths) * self._weights[positions]
+        scores = np.bincount(cells, weights=values, minlength=query_count * doc_count)
+        return scores.reshape(query_count, doc_count)
+
+    def top_k(
+        self,
+        list_of_query_tokens: list[list[str]],
+        k: int,
+        *,
+        max_batch_cells: int = 131_072,
+    ) -> list[np.ndarray]:
+        """
+        Document indices of the `k` best matches of each query, best first.
+
+        Queries are scored in batches of at most `max_batch_cells` (queries x documents) scores.
+        Batching saves per-query overhead on small catalogs; on large ones a dense score matrix
+        bigger than the CPU cache is slower than scoring the queries one at a time, so the default
+        keeps it around 1 MiB.
+        """
+        batch_size = max(1, max_batch_cells // max(1, len(self._doc_lens)))
+        results = []
+        for start in range(0, len(list_of_query_tokens), batch_size):
+            batch_scores = self.get_batch_scores(list_of_query_tokens[start : start + batch_size])
+            results.extend(top_k_indices(scores, k) for scores in batch_scores)
+        return results
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the `k` highest scores, best first; equal scores keep ascending index order.
+
+    Uses `argpartition` so only the selected `k` are sorted, instead of all N scores.
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+
+    threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+    above = np.flatnonzero(scores > threshold)
+    # argpartition picks arbitrary ties at the boundary; take the lowest indices instead
+    ties = np.flatnonzero(scores == threshold)[: k - len(above)]
+    candidates = np.concatenate([above, ties])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
@@ -1,20 +1,21 @@
 import logging
 import re
 
-from pydantic import BaseModel
-from rank_bm25 import BM25Okapi
-
 from easylocai.core.search_engine import SearchEngine, SearchEngineCollection, Record
+from easylocai.search_engines.bm25_index import BM25Index
 
 logger = logging.getLogger(__name__)
 
 
-class KeywordRecord(BaseModel):
-    idx: int
-    id: str
-    document: str
-    metadata: dict | None = None
-    tokenized: list[str]
+class KeywordRecord:
+    """An indexed document. Its tokens live only in the BM25 index, as interned term counts."""
+
+    __slots__ = ("id", "document", "metadata")
+
+    def __init__(self, id: str, document: str, metadata: dict | None):
+        self.id = id
+        self.document = document
+        self.metadata = metadata
 
 
 class KeywordSearchEngineCollection(SearchEngineCollection):
@@ -25,53 +26,41 @@ class KeywordSearchEngineCollection(SearchEngineCollection):
     ):
         self._records: list[KeywordRecord] = []
         self._id_set = set()
-        self._bm25 = None
+        self._bm25 = BM25Index()
         self._min_gram = min_gram
         self._max_gram = max_gram
 
     async def add(self, records: list[Record]):
-        for idx, record in enumerate(records):
-            id_ = records[idx].id
-
-            if id_ in self._id_set:
-                raise ValueError(f"Document with id {id_} already exists in the index.")
-            self._id_set.add(id_)
-
-            metadata = records[idx].metadata
-            document = records[idx].document
-
-            self._records.append(
-                KeywordRecord(
-                    idx=len(self._records),
-                    id=id_,
-                    document=document,
-                    metadata=metadata,
-                    tokenized=self._tokenize(document),
-                )
-            )
-
-        # Rebuild BM25 index with all documents
-        self._bm25 = BM25Okapi([r.tokenized for r in self._records])
+        # Validate the whole batch first, so a duplicate id leaves the index unchanged
+        batch_ids = set()
+        for record in records:
+            if record.id in self._id_set or record.id in batch_ids:
+                raise ValueError(f"Document with id {record.id} already exists in the index.")
+            batch_ids.add(record.id)
+
+        new_records = [
+            KeywordRecord(record.id, record.document, record.metadata) for record in records
+        ]
+        # Only the new documents' terms are indexed; existing postings are kept. Documents are
+        # tokenized one at a time, so a token list is dropped as soon as it is counted.
+        self._bm25.add(self._tokenize(record.document) for record in new_records)
+        self._records.extend(new_records)
+        self._id_set.update(batch_ids)
 
     async def query(self, query_list: list[str], *, top_k: int) -> list[list[Record]]:
-        if self._bm25 is None:
+        if len(self._bm25) == 0:
             raise ValueError("The collection is empty. Add documents before querying.")
 
-        list_of_records = []
-        for query in query_list:
-            records = self._handle_one_query(query, top_k)
-            list_of_records.append(records)
-        return list_of_records
-
-    def _handle_one_query(self, query: str, top_k: int) -> list[Record]:
-        tokenized_query = self._tokenize(query)
-        scores = self._bm25.get_scores(tokenized_query)
-        top_n_indices = sorted(
-            range(len(scores)), key=lambda i: scores[i], reverse=True
-        )[:top_k]
+        # All queries are scored together in one sparse product
+        list_of_indices = self._bm25.top_k(
+            [self._tokenize(query) for query in query_list], top_k
+        )
+        return [self._to_records(indices) for indices in list_of_indices]
 
+    def _to_records(self, indices) -> list[Record]:
+        # Records are only built for the returned hits
         records = []
-        for i in top_n_indices:
+        for i in indices:
             records.append(
                 Record(
                     id=self._records[i].id,
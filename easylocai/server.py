@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from collections import OrderedDict, defaultdict
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from ollama import AsyncClient
+from pydantic import ValidationError
+
+from easylocai.config import DEFAULT_SOCKET_PATH
+from easylocai.constants.model import GPT_OSS_20B
+from easylocai.core.llm_settings import get_llm_settings
+from easylocai.core.model_router import get_model_router
+from easylocai.main import load_config_dict, log_session_stats
+from easylocai.schemas.context import GlobalContext
+from easylocai.schemas.server import ServerRequest
+from easylocai.search_engines.advanced_search_engine import AdvancedSearchEngine
+from easylocai.workflow import EasylocaiWorkflow, build_workflow_pool
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowServer:
+    """
+    Serves `EasylocaiWorkflow.run` over a Unix socket, one JSON object per line.
+
+    A connection sends one request at a time and receives the run's outputs as they are produced,
+    the last one being the "result" (or an "error"). While a run streams, the client may send
+    {"type": "cancel"}; closing the connection cancels the run as well, which aborts its in-flight
+    LLM requests and tool calls. Conversation history is kept per session id, for the
+    `max_sessions` most recently used sessions.
+    """
+
+    def __init__(self, workflows: list[EasylocaiWorkflow], *, max_sessions: int = 100):
+        self._workflows: asyncio.Queue[EasylocaiWorkflow] = asyncio.Queue()
+        for workflow in workflows:
+            self._workflows.put_nowait(workflow)
+        self._max_sessions = max_sessions
+        self._sessions: OrderedDict[str, GlobalContext] = OrderedDict()
+        self._session_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def serve(self, socket_path: str | Path):
+        socket_path = Path(socket_path).expanduser()
+        _remove_stale_socket(socket_path)
+        socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # The socket is created by bind() with the umask applied: make it owner-only from the start
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.handle_connection, path=str(socket_path))
+        finally:
+            os.umask(umask)
+        logger.info(f"Serving on {socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = ServerRequest.model_validate_json(line)
+                except ValidationError as e:
+                    await _send(writer, {"type": "error", "message": f"Invalid request: {e}"})
+                    continue
+
+                if request.type == "ping":
+                    await _send(writer, {"type": "pong"})
+                elif request.type == "reset":
+                    self._drop_session(request.session)
+                    await _send(writer, {"type": "reset"})
+                elif request.type == "run":
+                    if not await self._run(request, reader, writer):
+                        break
+        except ConnectionError:
+            logger.debug("Client disconnected")
+        finally:
+            writer.close()
+
+    async def _run(
+        self, request: ServerRequest, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Stream one run to the client. Returns False if the client went away or cancelled mid-run."""
+        run_task = asyncio.create_task(self._stream_run(request, writer))
+        control_task = asyncio.create_task(reader.readline())
+        try:
+            await asyncio.wait({run_task, control_task}, return_when=asyncio.FIRST_COMPLETED)
+            if run_task.done():
+                run_task.result()
+                return True
+            # EOF, a cancel request or anything else sent mid-run ends the run
+            logger.info(f"Run cancelled by the client (session {request.session})")
+            return False
+        finally:
+            control_task.cancel()
+            run_task.cancel()
+            # Wait until both have settled: the reader must be free for the next request
+            await asyncio.gather(control_task, run_task, return_exceptions=True)
+
+    async def _stream_run(self, request: ServerRequest, writer: asyncio.StreamWriter):
+        async with self._session_locks[request.session]:
+            workflow = await self._workflows.get()
+            try:
+                async for output in workflow.run(
+                    request.query, global_context=self._session(request.session)
+                ):
+                    await _send(writer, output.model_dump())
+            except Exception as e:
+                logger.exception("Workflow run failed")
+                await _send(writer, {"type": "error", "message": f"{type(e).__name__}: {e}"})
+            finally:
+                self._workflows.put_nowait(workflow)
+
+    def _session(self, session_id: str) -> GlobalContext:
+        """The session's conversation. Beyond `max_sessions`, the least recently used are dropped."""
+        if session_id in self._sessions:
+            self._sessions.move_to_end(session_id)
+            return self._sessions[session_id]
+
+        global_context = self._sessions[session_id] = GlobalContext()
+        while len(self._sessions) > self._max_sessions:
+            self._drop_session(next(iter(self._sessions)))
+        return global_context
+
+    def _drop_session(self, session_id: str):
+        self._sessions.pop(session_id, None)
+        lock = self._session_locks.get(session_id)
+        if lock is not None and not lock.locked():
+            del self._session_locks[session_id]
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict):
+    writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+def _remove_stale_socket(socket_path: Path):
+    """Remove a socket left behind by a server that is gone; refuse to replace a live one."""
+    if not socket_path.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(socket_path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            socket_path.unlink(missing_ok=True)
+            return
+    raise RuntimeError(f"An easylocai server is already running on {socket_path}")
+
+
+async def _warm_up_model(ollama_client: AsyncClient, model: str):
+    """Load the default model before the first request (an empty prompt only loads it)."""
+    try:
+        await ollama_client.generate(
+            model=model, prompt="", keep_alive=get_llm_settings().keep_alive
+        )
+        get_model_router().residency.touch(model)
+    except Exception as e:
+        logger.warning(f"Failed to warm up {model}: {e}")
+
+
+async def run_server(socket_path: str = DEFAULT_SOCKET_PATH, *, concurrency: int = 1):
+    """Start MCP servers, the tool index and the model once, then serve runs until interrupted."""
+    ollama_client = AsyncClient(host="http://localhost:11434")
+    workflows = build_workflow_pool(
+        concurrency,
+        config_dict=load_config_dict(),
+        search_engine=AdvancedSearchEngine(),
+        ollama_client=ollama_client,
+    )
+
+    async with AsyncExitStack() as stack:
+        for workflow in workflows:
+            await workflow.initialize(stack)
+        await _warm_up_model(ollama_client, GPT_OSS_20B)
+
+        print(f"easylocai is serving on {Path(socket_path).expanduser()}")
+        try:
+            await WorkflowServer(workflows).serve(socket_path)
+        finally:
+            log_session_stats()
@@ -125,3 +125,14 @@ class ConsoleSpinner:
 
     def set_prefix(self, prefix: str):
         self._prefix = prefix
+
+
+async def stream_answer(console: Console, outputs, messages: list[dict[str, str]]):
+    """Show workflow status outputs on a spinner and append the result to `messages`."""
+    with ConsoleSpinner(console) as spinner:
+        async for output in outputs:
+            if output.type == "status":
+                spinner.set_prefix(output.message)
+                continue
+            if output.type == "result":
+                messages.append({"role": "assistant", "content": output.message})
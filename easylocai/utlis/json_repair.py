@@ -0,0 +1,141 @@
+import re
+
+_CODE_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+
+def repair_json(text: str) -> str | None:
+    """
+    Best-effort local repair of a malformed JSON object produced by an LLM.
+
+    Handles the common failure modes of structured output:
+    - markdown code fences around the object
+    - prose before or after the object
+    - trailing commas
+    - truncated output (unterminated string, missing closing brackets, dangling key or comma)
+
+    Returns the repaired JSON text, or None if no JSON object can be found.
+    The result is not guaranteed to be valid; callers validate it against their model.
+    """
+    fenced = _CODE_FENCE_PATTERN.search(text)
+    if fenced and "{" in fenced.group(1):
+        text = fenced.group(1)
+
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    stack = []
+    in_string = False
+    escaped = False
+    end = None
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                end = pos + 1
+                break
+
+    if end is not None:
+        # complete object: drop whatever prose follows it
+        candidate = text[start:end]
+    else:
+        candidate = _close_truncated(text[start:], stack, in_string, escaped)
+
+    return _remove_trailing_commas(candidate)
+
+
+def _remove_trailing_commas(text: str) -> str:
+    """Remove commas directly followed by a closing bracket, leaving string values untouched."""
+    result = []
+    in_string = False
+    escaped = False
+    for pos, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "," and _next_non_space(text, pos + 1) in ("}", "]"):
+            continue
+        result.append(char)
+    return "".join(result)
+
+
+def _next_non_space(text: str, pos: int) -> str:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return text[pos] if pos < len(text) else ""
+
+
+def _close_truncated(text: str, stack: list[str], in_string: bool, escaped: bool) -> str:
+    if in_string:
+        if escaped:
+            text = text[:-1]
+        text += '"'
+
+    text = text.rstrip()
+    # A dangling comma, colon or key without value cannot be completed meaningfully, so drop it.
+    while True:
+        if text.endswith(","):
+            text = text[:-1].rstrip()
+        elif text.endswith(":"):
+            text = _drop_last_string(text[:-1].rstrip())
+        elif text.endswith('"') and stack and stack[-1] == "}" and _is_dangling_key(text):
+            text = _drop_last_string(text)
+        else:
+            break
+
+    return text + "".join(reversed(stack))
+
+
+def _is_dangling_key(text: str) -> bool:
+    """True if the string that ends `text` is an object key without a value (preceded by '{' or ',')."""
+    key_start = _last_string_start(text)
+    if key_start is None:
+        return False
+    before = text[:key_start].rstrip()
+    return before.endswith("{") or before.endswith(",")
+
+
+def _drop_last_string(text: str) -> str:
+    key_start = _last_string_start(text)
+    if key_start is None:
+        return text
+    return text[:key_start].rstrip()
+
+
+def _last_string_start(text: str) -> int | None:
+    if not text.endswith('"'):
+        return None
+    pos = len(text) - 2
+    while pos >= 0:
+        if text[pos] == '"':
+            backslashes = 0
+            check = pos - 1
+            while check >= 0 and text[check] == "\\":
+                backslashes += 1
+                check -= 1
+            if backslashes % 2 == 0:
+                return pos
+        pos -= 1
+    return None
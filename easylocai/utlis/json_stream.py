@@ -0,0 +1,89 @@
+import json
+from typing import Any
+
+
+class IncrementalJSONObjectParser:
+    """
+    Incrementally scans a JSON object that arrives in chunks (e.g. streamed LLM output).
+
+    Each top-level member is reported as soon as its value is complete, and `done` becomes True
+    when the closing brace of the top-level object arrives, so the caller can stop reading the stream.
+    Text before the opening brace (e.g. a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._start: int | None = None
+        self._end: int | None = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: int | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._end is not None
+
+    @property
+    def text(self) -> str:
+        """The JSON object text seen so far (complete once `done` is True)."""
+        if self._start is None:
+            return ""
+        end = self._end if self._end is not None else len(self._text)
+        return self._text[self._start : end]
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Consume a chunk and return the (key, value) pairs of the members completed by it."""
+        if self.done:
+            return []
+
+        self._text += chunk
+        completed = []
+        text = self._text
+        for pos in range(self._pos, len(text)):
+            char = text[pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._start is None:
+                if char == "{":
+                    self._start = pos
+                    self._depth = 1
+                    self._member_start = pos + 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_member(pos, completed)
+                    self._end = pos + 1
+                    self._pos = pos + 1
+                    return completed
+            elif char == "," and self._depth == 1:
+                self._complete_member(pos, completed)
+                self._member_start = pos + 1
+
+        self._pos = len(text)
+        return completed
+
+    def _complete_member(self, end: int, completed: list[tuple[str, Any]]):
+        member = self._text[self._member_start : end].strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return
+        completed.extend(parsed.items())
@@ -19,3 +19,20 @@ def pretty_prompt_text(title: str, prompt: str):
     results.append("+" + "-" * (width - 2) + "+")
 
     return "\n".join(results)
+
+
+class LazyPrettyPromptText:
+    """
+    Log message wrapper that runs `pretty_prompt_text` only when the record is emitted.
+
+    Usage: logger.debug(LazyPrettyPromptText(title, prompt))
+    """
+
+    __slots__ = ("_title", "_prompt")
+
+    def __init__(self, title: str, prompt: str):
+        self._title = title
+        self._prompt = prompt
+
+    def __str__(self) -> str:
+        return pretty_prompt_text(self._title, self._prompt)
@@ -1,10 +1,14 @@
+import asyncio
 import logging
+import uuid
 from contextlib import AsyncExitStack
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Literal
 
 from ollama import AsyncClient
+from pydantic import BaseModel, Field
 
 from easylocai.agents.plan_agent import (
+    FastPlanMode,
     PlanAgent,
     PlanAgentInput,
     PlanAgentOutput,
@@ -17,7 +21,16 @@ from easylocai.agents.replan_agent import (
 from easylocai.agents.single_task_agent import (
     SingleTaskAgent,
     SingleTaskAgentOutput,
+    SpeculationMode,
 )
+from easylocai.core.checkpoint import (
+    CheckpointStage,
+    CheckpointStore,
+    WorkflowCheckpoint,
+)
+from easylocai.core.deadline import deadline_after, deadline_stream, is_expired
+from easylocai.core.metrics import scoped_stream
+from easylocai.core.task_graph import TaskGraph
 from easylocai.core.tool_manager import ToolManager
 from easylocai.schemas.common import EasyLocaiWorkflowOutput
 from easylocai.schemas.context import (
@@ -45,6 +58,105 @@ def ensure_initialized(func):
     return wrapper
 
 
+class DeadlineSettings(BaseModel):
+    """Seconds each part of a run may take. None means unbounded."""
+
+    run: float | None = Field(
+        default=None,
+        gt=0,
+        description="Whole run. When it expires, the run ends with the results gathered so far.",
+    )
+    plan: float | None = Field(default=None, gt=0, description="Initial planning.")
+    task: float | None = Field(
+        default=None,
+        gt=0,
+        description="One task. An expired task is recorded with its partial results and the run continues.",
+    )
+    replan: float | None = Field(
+        default=None,
+        gt=0,
+        description="One replanning step. When it expires, the run ends with the results gathered so far.",
+    )
+
+
+class WorkflowSettings(BaseModel):
+    execution_mode: Literal["sequential", "task_graph"] = Field(
+        default="sequential",
+        description="'sequential' runs one task at a time. 'task_graph' plans dependencies and runs independent tasks in parallel.",
+    )
+    max_parallel_tasks: int = Field(
+        default=3,
+        ge=1,
+        description="Maximum number of tasks executed at once in 'task_graph' mode.",
+    )
+    fast_plan: FastPlanMode = Field(
+        default="off",
+        description="Skip QueryReformatter for short queries with no earlier turn to refer to: 'off', 'skip' (plan the original query) or 'combined' (reformat and plan in one call).",
+    )
+    fast_plan_max_query_chars: int = Field(
+        default=300,
+        ge=0,
+        description="Longest query planned without a separate QueryReformatter call in 'skip' and 'combined' mode; longer ones may carry a preamble and use both calls.",
+    )
+    parallel_subtasks: bool = Field(
+        default=False,
+        description="Route independent subtasks in batches and execute each batch concurrently.",
+    )
+    speculation: SpeculationMode = Field(
+        default="prefetch",
+        description="Work done for the next planned task while the replanner runs: 'off', 'prefetch' (tool candidates) or 'route' (also the first routing step).",
+    )
+    prefilter_subtask_results: bool = Field(
+        default=True,
+        description="Skip the SubtaskResultFilter LLM call for errors, small and high-confidence results.",
+    )
+    checkpoint_dir: str | None = Field(
+        default=None,
+        description="Directory for the checkpoints of unfinished runs, used by 'easylocai resume' (e.g. '~/.easylocai/checkpoints'). null (default) disables checkpointing.",
+    )
+    deadlines: DeadlineSettings = Field(
+        default_factory=DeadlineSettings,
+        description="Per-run and per-stage deadlines in seconds.",
+    )
+    tool_search_cache_size: int = Field(
+        default=256,
+        ge=0,
+        description="Number of tool search results kept in the LRU cache. 0 disables the cache.",
+    )
+
+
+def build_workflow_pool(
+    size: int,
+    *,
+    config_dict: dict,
+    search_engine: AdvancedSearchEngine,
+    ollama_client: AsyncClient,
+) -> list["EasylocaiWorkflow"]:
+    """
+    Workflows for `size` concurrent runs. Workflows keep per-run agent state, so each run needs its
+    own, but they all share the first one's ToolManager: MCP servers and the tool index start once.
+    """
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    workflows = [
+        EasylocaiWorkflow(
+            config_dict=config_dict,
+            search_engine=search_engine,
+            ollama_client=ollama_client,
+        )
+    ]
+    workflows.extend(
+        EasylocaiWorkflow(
+            config_dict=config_dict,
+            search_engine=search_engine,
+            ollama_client=ollama_client,
+            tool_manager=workflows[0].tool_manager,
+        )
+        for _ in range(size - 1)
+    )
+    return workflows
+
+
 class EasylocaiWorkflow:
     def __init__(
         self,
@@ -52,21 +164,60 @@ class EasylocaiWorkflow:
         config_dict: dict,
         search_engine: AdvancedSearchEngine,
         ollama_client: AsyncClient,
+        tool_manager: ToolManager | None = None,
     ):
-        self._tool_manager = ToolManager(
-            search_engine, mpc_servers=config_dict["mcpServers"]
+        """`tool_manager`: share the (already initialized) tools of another workflow instead of starting them."""
+        self._settings = WorkflowSettings.model_validate(config_dict.get("workflow") or {})
+        task_graph_mode = self._settings.execution_mode == "task_graph"
+
+        self._owns_tool_manager = tool_manager is None
+        self._tool_manager = tool_manager or ToolManager(
+            search_engine,
+            mpc_servers=config_dict["mcpServers"],
+            search_cache_size=self._settings.tool_search_cache_size,
+        )
+        self._plan_agent = PlanAgent(
+            client=ollama_client,
+            plan_task_graph=task_graph_mode,
+            fast_plan=self._settings.fast_plan,
+            fast_plan_max_query_chars=self._settings.fast_plan_max_query_chars,
         )
-        self._plan_agent = PlanAgent(client=ollama_client)
         self._replan_agent = ReplanAgent(client=ollama_client)
         self._single_task_agent = SingleTaskAgent(
             client=ollama_client,
             tool_manager=self._tool_manager,
+            parallel_subtasks=self._settings.parallel_subtasks,
+            prefilter_subtask_results=self._settings.prefilter_subtask_results,
+            speculation=self._settings.speculation,
+        )
+        # One agent per concurrently executed task: the pool bounds how many run at once, and an
+        # agent's speculative prefetch must belong to a single task
+        self._parallel_task_agents = [self._single_task_agent]
+        if task_graph_mode:
+            self._parallel_task_agents.extend(
+                SingleTaskAgent(
+                    client=ollama_client,
+                    tool_manager=self._tool_manager,
+                    parallel_subtasks=self._settings.parallel_subtasks,
+                    prefilter_subtask_results=self._settings.prefilter_subtask_results,
+                )
+                for _ in range(self._settings.max_parallel_tasks - 1)
+            )
+        self._checkpoint_store = (
+            CheckpointStore(self._settings.checkpoint_dir)
+            if self._settings.checkpoint_dir is not None
+            else None
         )
         self._initialized = False
 
-    def initialize(self, stack: AsyncExitStack):
+    @property
+    def tool_manager(self) -> ToolManager:
+        return self._tool_manager
+
+    async def initialize(self, stack: AsyncExitStack):
+        if self._owns_tool_manager:
+            await self._tool_manager.initialize(stack)
         self._initialized = True
-        return self._tool_manager.initialize(stack)
 
     @ensure_initialized
     async def run(
@@ -74,6 +225,68 @@ class EasylocaiWorkflow:
         user_query: str,
         *,
         global_context: GlobalContext,
+    ) -> AsyncGenerator[EasyLocaiWorkflowOutput, None]:
+        # Every LLM call of this run is tagged with the run id in the metrics registry
+        run_id = uuid.uuid4().hex[:12]
+        logger.debug(f"Workflow run {run_id}: {user_query}")
+        async for output in scoped_stream(
+            self._run(
+                user_query,
+                global_context=global_context,
+                run_id=run_id,
+                run_deadline=deadline_after(self._settings.deadlines.run),
+            ),
+            run_id=run_id,
+        ):
+            yield output
+
+    @property
+    def checkpoints_enabled(self) -> bool:
+        return self._checkpoint_store is not None
+
+    def load_checkpoint(self, run_id: str | None = None) -> WorkflowCheckpoint | None:
+        """The checkpoint of an unfinished run (the most recent one if `run_id` is None)."""
+        if self._checkpoint_store is None:
+            return None
+        return self._checkpoint_store.load(run_id)
+
+    @ensure_initialized
+    async def resume(
+        self,
+        checkpoint: WorkflowCheckpoint,
+        *,
+        global_context: GlobalContext,
+    ) -> AsyncGenerator[EasyLocaiWorkflowOutput, None]:
+        """Continue an interrupted run from its checkpoint. Completed tasks and subtasks are not re-executed."""
+        logger.debug(f"Resuming workflow run {checkpoint.run_id} at stage {checkpoint.stage}")
+        workflow_context = checkpoint.workflow_context
+        global_context.conversation_histories = workflow_context.conversation_histories
+
+        task_graph = None
+        if checkpoint.stage == "planned" and checkpoint.task_dependencies is not None:
+            task_graph = TaskGraph(workflow_context.task_list, checkpoint.task_dependencies)
+
+        async for output in scoped_stream(
+            self._execute(
+                workflow_context,
+                global_context=global_context,
+                run_id=checkpoint.run_id,
+                task_graph=task_graph,
+                pending_task=checkpoint.pending_task,
+                replan_first=checkpoint.stage == "replan",
+                run_deadline=deadline_after(self._settings.deadlines.run),
+            ),
+            run_id=checkpoint.run_id,
+        ):
+            yield output
+
+    async def _run(
+        self,
+        user_query: str,
+        *,
+        global_context: GlobalContext,
+        run_id: str,
+        run_deadline: float | None = None,
     ) -> AsyncGenerator[EasyLocaiWorkflowOutput, None]:
         workflow_context = WorkflowContext(
             conversation_histories=global_context.conversation_histories,
@@ -82,9 +295,24 @@ class EasylocaiWorkflow:
 
         yield EasyLocaiWorkflowOutput(type="status", message="Thinking...")
 
-        plan_output: PlanAgentOutput = await self._plan_agent.run(
-            PlanAgentInput(workflow_context=workflow_context)
-        )
+        plan_deadline = deadline_after(self._settings.deadlines.plan, within=run_deadline)
+        try:
+            async with asyncio.timeout_at(plan_deadline):
+                plan_output: PlanAgentOutput = await self._plan_agent.run(
+                    PlanAgentInput(workflow_context=workflow_context)
+                )
+        except TimeoutError:
+            if not is_expired(plan_deadline):
+                raise
+            logger.warning(f"Workflow run {run_id}: planning hit its deadline")
+            yield self._finish(
+                workflow_context,
+                global_context=global_context,
+                run_id=run_id,
+                answer=self._best_answer_so_far(workflow_context),
+                partial=True,
+            )
+            return
 
         workflow_context.query_context = plan_output.query_context
         workflow_context.reformatted_user_query = plan_output.reformatted_user_query
@@ -92,45 +320,124 @@ class EasylocaiWorkflow:
 
         logger.debug(f"Plan output: {plan_output}")
 
-        answer = None
-        while True:
-            next_task = workflow_context.task_list[0]
-            yield EasyLocaiWorkflowOutput(type="status", message=next_task)
+        task_graph = None
+        if plan_output.task_dependencies is not None:
+            task_graph = TaskGraph(plan_output.task_list, plan_output.task_dependencies)
 
-            single_task_context = SingleTaskAgentContext(
-                conversation_histories=workflow_context.conversation_histories,
-                original_user_query=workflow_context.original_user_query,
-                query_context=workflow_context.query_context,
-                reformatted_user_query=workflow_context.reformatted_user_query,
-                task_list=workflow_context.task_list,
-                executed_task_results=workflow_context.executed_task_results,
-                original_task=next_task,
-            )
+        self._save_checkpoint(
+            run_id,
+            "planned",
+            workflow_context,
+            task_dependencies=plan_output.task_dependencies,
+        )
 
-            task_output: SingleTaskAgentOutput = await self._single_task_agent.run(
-                single_task_context
-            )
+        async for output in self._execute(
+            workflow_context,
+            global_context=global_context,
+            run_id=run_id,
+            task_graph=task_graph,
+            run_deadline=run_deadline,
+        ):
+            yield output
 
-            workflow_context.executed_task_results.append(
-                ExecutedTaskResult(
-                    executed_task=task_output.executed_task,
-                    result=task_output.result,
-                )
-            )
+    async def _execute(
+        self,
+        workflow_context: WorkflowContext,
+        *,
+        global_context: GlobalContext,
+        run_id: str,
+        task_graph: TaskGraph | None = None,
+        pending_task: SingleTaskAgentContext | None = None,
+        replan_first: bool = False,
+        run_deadline: float | None = None,
+    ) -> AsyncGenerator[EasyLocaiWorkflowOutput, None]:
+        """
+        Execute and replan until the replanner answers. A checkpoint is saved after every step.
 
-            yield EasyLocaiWorkflowOutput(type="status", message="Check for completion...")
+        When the run deadline (or a replanning deadline) expires, in-flight LLM requests and tool
+        calls are cancelled and the run ends with the results gathered so far; its checkpoint is
+        kept so it can still be resumed.
+        """
+        deadlines = self._settings.deadlines
+        replan_deadline: float | None = None
+        try:
+            while True:
+                if replan_first:
+                    replan_first = False
+                elif task_graph is not None:
+                    async for output in self._execute_task_graph(
+                        workflow_context, task_graph, run_id=run_id, run_deadline=run_deadline
+                    ):
+                        yield output
+                    # Tasks added by the replanner have no dependency edges and run one at a time.
+                    task_graph = None
+                    self._save_checkpoint(run_id, "replan", workflow_context)
+                else:
+                    async for output in self._execute_next_task(
+                        workflow_context,
+                        run_id=run_id,
+                        pending_task=pending_task,
+                        run_deadline=run_deadline,
+                    ):
+                        yield output
+                    pending_task = None
+                    self._speculate_next_task(workflow_context)
+                    self._save_checkpoint(run_id, "replan", workflow_context)
 
-            replan_output: ReplanAgentOutput = await self._replan_agent.run(
-                ReplanAgentInput(workflow_context=workflow_context)
-            )
-            logger.debug(f"Replan output: {replan_output}")
+                yield EasyLocaiWorkflowOutput(type="status", message="Check for completion...")
+
+                replan_output: ReplanAgentOutput | None = None
+                replan_deadline = deadline_after(deadlines.replan, within=run_deadline)
+                async for event in deadline_stream(
+                    self._replan_agent.run_stream(
+                        ReplanAgentInput(workflow_context=workflow_context)
+                    ),
+                    replan_deadline,
+                ):
+                    if event.type == "status":
+                        yield EasyLocaiWorkflowOutput(type="status", message=event.message)
+                    else:
+                        replan_output = event.output
+                replan_deadline = None
+                logger.debug(f"Replan output: {replan_output}")
 
-            if replan_output.response is not None:
-                answer = replan_output.response
-                break
+                if replan_output.response is not None:
+                    self._single_task_agent.cancel_speculation()
+                    yield self._finish(
+                        workflow_context,
+                        global_context=global_context,
+                        run_id=run_id,
+                        answer=replan_output.response,
+                    )
+                    return
 
-            workflow_context.task_list = replan_output.tasks
+                workflow_context.task_list = replan_output.tasks
+                self._save_checkpoint(run_id, "planned", workflow_context)
+        except TimeoutError:
+            # Not a deadline, e.g. a client timeout inside a task
+            if not is_expired(run_deadline) and not is_expired(replan_deadline):
+                raise
+            logger.warning(f"Workflow run {run_id} hit its deadline, answering with results so far")
+            yield self._finish(
+                workflow_context,
+                global_context=global_context,
+                run_id=run_id,
+                answer=self._best_answer_so_far(workflow_context),
+                partial=True,
+            )
+        finally:
+            self._single_task_agent.cancel_speculation("cancelled")
 
+    def _finish(
+        self,
+        workflow_context: WorkflowContext,
+        *,
+        global_context: GlobalContext,
+        run_id: str,
+        answer: str,
+        partial: bool = False,
+    ) -> EasyLocaiWorkflowOutput:
+        user_query = workflow_context.original_user_query
         global_context.conversation_histories.append(
             ConversationHistory(
                 original_user_query=user_query,
@@ -139,5 +446,259 @@ class EasylocaiWorkflow:
                 response=answer,
             )
         )
+        if self._checkpoint_store is not None and not partial:
+            self._checkpoint_store.delete(run_id)
+
+        return EasyLocaiWorkflowOutput(type="result", message=answer, partial=partial)
+
+    @staticmethod
+    def _best_answer_so_far(workflow_context: WorkflowContext) -> str:
+        results = workflow_context.executed_task_results
+        if not results:
+            return "The run hit its deadline before any task finished."
+        lines = [f"- {r.executed_task}: {r.result}" for r in results]
+        return "The run hit its deadline before the final answer. Results so far:\n" + "\n".join(
+            lines
+        )
+
+    @staticmethod
+    def _timed_out_task_result(single_task_context: SingleTaskAgentContext) -> ExecutedTaskResult:
+        """A task that hit the task deadline, recorded with the subtask results it got to."""
+        result = "The task did not finish within its deadline."
+        if single_task_context.subtask_results:
+            result += " Partial results:\n" + "\n".join(
+                f"- {r.subtask}: {r.result}" for r in single_task_context.subtask_results
+            )
+        return ExecutedTaskResult(executed_task=single_task_context.original_task, result=result)
+
+    def _save_checkpoint(
+        self,
+        run_id: str,
+        stage: CheckpointStage,
+        workflow_context: WorkflowContext,
+        *,
+        task_dependencies: list[list[int]] | None = None,
+        pending_task: SingleTaskAgentContext | None = None,
+    ):
+        if self._checkpoint_store is None:
+            return
+        try:
+            self._checkpoint_store.save(
+                WorkflowCheckpoint(
+                    run_id=run_id,
+                    stage=stage,
+                    workflow_context=workflow_context,
+                    task_dependencies=task_dependencies,
+                    pending_task=pending_task,
+                )
+            )
+        except OSError as e:
+            logger.warning(f"Failed to save checkpoint of run {run_id}: {e}")
+
+    async def _execute_next_task(
+        self,
+        workflow_context: WorkflowContext,
+        *,
+        run_id: str,
+        pending_task: SingleTaskAgentContext | None = None,
+        run_deadline: float | None = None,
+    ) -> AsyncGenerator[EasyLocaiWorkflowOutput, None]:
+        """Execute the first task of `task_list`, or continue the interrupted `pending_task`."""
+        if pending_task is not None:
+            single_task_context = pending_task
+            single_task_context.executed_task_results = workflow_context.executed_task_results
+        else:
+            single_task_context = self._single_task_context(
+                workflow_context,
+                task=workflow_context.task_list[0],
+                executed_task_results=workflow_context.executed_task_results,
+            )
+        yield EasyLocaiWorkflowOutput(type="status", message=single_task_context.original_task)
+
+        # The agent appends to `subtask_results` in place; checkpoint whenever a subtask finished
+        checkpointed_subtasks = len(single_task_context.subtask_results)
+        task_output: SingleTaskAgentOutput | None = None
+        task_deadline = deadline_after(self._settings.deadlines.task, within=run_deadline)
+        try:
+            async for event in deadline_stream(
+                self._single_task_agent.run_stream(single_task_context),
+                task_deadline,
+            ):
+                if event.type == "status":
+                    if len(single_task_context.subtask_results) != checkpointed_subtasks:
+                        checkpointed_subtasks = len(single_task_context.subtask_results)
+                        self._save_checkpoint(
+                            run_id, "task", workflow_context, pending_task=single_task_context
+                        )
+                    yield EasyLocaiWorkflowOutput(type="status", message=event.message)
+                else:
+                    task_output = event.output
+        except BaseException as e:
+            # Whatever stopped the task (a crash, cancellation or deadline), keep the subtasks
+            # finished since the last status event for `resume`
+            if len(single_task_context.subtask_results) != checkpointed_subtasks:
+                self._save_checkpoint(
+                    run_id, "task", workflow_context, pending_task=single_task_context
+                )
+            if (
+                not isinstance(e, TimeoutError)
+                or not is_expired(task_deadline)
+                or is_expired(run_deadline)
+            ):
+                raise
+            logger.warning(f"Task hit its deadline: {single_task_context.original_task}")
+            workflow_context.executed_task_results.append(
+                self._timed_out_task_result(single_task_context)
+            )
+            return
+
+        workflow_context.executed_task_results.append(
+            ExecutedTaskResult(
+                executed_task=task_output.executed_task,
+                result=task_output.result,
+            )
+        )
+
+    def _speculate_next_task(self, workflow_context: WorkflowContext):
+        """Start preparing the next planned task, betting that the replanner keeps it."""
+        if len(workflow_context.task_list) < 2:
+            return
+        self._single_task_agent.speculate(
+            self._single_task_context(
+                workflow_context,
+                task=workflow_context.task_list[1],
+                executed_task_results=list(workflow_context.executed_task_results),
+            )
+        )
+
+    async def _execute_task_graph(
+        self,
+        workflow_context: WorkflowContext,
+        task_graph: TaskGraph,
+        *,
+        run_id: str | None = None,
+        run_deadline: float | None = None,
+    ) -> AsyncGenerator[EasyLocaiWorkflowOutput, None]:
+        """
+        Execute every task of the graph as soon as its dependencies are done, at most
+        `max_parallel_tasks` at once. Each task sees the results of its own (transitive) dependencies.
+        Results are appended to `executed_task_results` in plan order, independent of completion order.
+
+        If a task fails, or the run is cancelled or hits its deadline, the results of the tasks that
+        finished are kept and the unfinished rest of the graph is checkpointed.
+        """
+        logger.debug(f"Executing task graph, parallel levels: {task_graph.levels()}")
+
+        previous_results = list(workflow_context.executed_task_results)
+        results: dict[int, ExecutedTaskResult] = {}
+        done = {index: asyncio.Event() for index in range(len(task_graph))}
+        agents: asyncio.Queue[SingleTaskAgent] = asyncio.Queue()
+        for agent in self._parallel_task_agents:
+            agents.put_nowait(agent)
+        outputs: asyncio.Queue[EasyLocaiWorkflowOutput] = asyncio.Queue()
+
+        async def execute(index: int):
+            for dependency in task_graph.dependencies(index):
+                await done[dependency].wait()
+
+            agent = await agents.get()
+            try:
+                task = task_graph.task(index)
+                outputs.put_nowait(EasyLocaiWorkflowOutput(type="status", message=task))
+                single_task_context = self._single_task_context(
+                    workflow_context,
+                    task=task,
+                    executed_task_results=previous_results
+                    + [results[ancestor] for ancestor in task_graph.ancestors(index)],
+                )
+                task_output: SingleTaskAgentOutput | None = None
+                task_deadline = deadline_after(self._settings.deadlines.task, within=run_deadline)
+                try:
+                    async for event in deadline_stream(
+                        agent.run_stream(single_task_context),
+                        task_deadline,
+                    ):
+                        if event.type == "status":
+                            outputs.put_nowait(
+                                EasyLocaiWorkflowOutput(type="status", message=event.message)
+                            )
+                        else:
+                            task_output = event.output
+                except TimeoutError:
+                    if not is_expired(task_deadline) or is_expired(run_deadline):
+                        raise
+                    logger.warning(f"Task hit its deadline: {task}")
+            finally:
+                agents.put_nowait(agent)
+
+            if task_output is None:
+                results[index] = self._timed_out_task_result(single_task_context)
+            else:
+                results[index] = ExecutedTaskResult(
+                    executed_task=task_output.executed_task,
+                    result=task_output.result,
+                )
+            done[index].set()
+
+        tasks = [asyncio.create_task(execute(index)) for index in range(len(task_graph))]
+        all_done = asyncio.gather(*tasks)
+        try:
+            while not all_done.done():
+                next_output = asyncio.ensure_future(outputs.get())
+                await asyncio.wait(
+                    {next_output, all_done}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_output.done():
+                    yield next_output.result()
+                else:
+                    next_output.cancel()
+            while not outputs.empty():
+                yield outputs.get_nowait()
+            # Raises the first task error, if any
+            all_done.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            finished = [index for index in range(len(task_graph)) if index in results]
+            workflow_context.executed_task_results.extend(results[index] for index in finished)
+            if run_id is not None and len(finished) < len(task_graph):
+                self._save_graph_checkpoint(run_id, workflow_context, task_graph, set(finished))
+
+    def _save_graph_checkpoint(
+        self,
+        run_id: str,
+        workflow_context: WorkflowContext,
+        task_graph: TaskGraph,
+        finished: set[int],
+    ):
+        """Checkpoint the unfinished tasks of a graph; the finished ones are in `executed_task_results`."""
+        remaining = [index for index in range(len(task_graph)) if index not in finished]
+        position = {index: new_index for new_index, index in enumerate(remaining)}
+        self._save_checkpoint(
+            run_id,
+            "planned",
+            workflow_context.model_copy(
+                update={"task_list": [task_graph.task(index) for index in remaining]}
+            ),
+            task_dependencies=[
+                [position[d] for d in task_graph.dependencies(index) if d in position]
+                for index in remaining
+            ],
+        )
 
-        yield EasyLocaiWorkflowOutput(type="result", message=answer)
+    @staticmethod
+    def _single_task_context(
+        workflow_context: WorkflowContext,
+        *,
+        task: str,
+        executed_task_results: list[ExecutedTaskResult],
+    ) -> SingleTaskAgentContext:
+        return SingleTaskAgentContext(
+            conversation_histories=workflow_context.conversation_histories,
+            original_user_query=workflow_context.original_user_query,
+            query_context=workflow_context.query_context,
+            reformatted_user_query=workflow_context.reformatted_user_query,
+            task_list=workflow_context.task_list,
+            executed_task_results=executed_task_results,
+            original_task=task,
+        )
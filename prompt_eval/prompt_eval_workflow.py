@@ -7,6 +7,8 @@ from jinja2 import FileSystemLoader, Environment, Template
 from ollama import AsyncClient
 from pydantic import BaseModel
 
+from easylocai.core.response_cache import LLMResponseCache, make_cache_key
+
 
 @dataclass
 class EvalResultItem:
@@ -107,12 +109,14 @@ class PromptEvalWorkflow:
         model_info: dict,
         user_input_schema: Type[BaseModel] | None = None,
         output_model: Type[BaseModel] | None = None,
+        response_cache: LLMResponseCache | None = None,
     ):
         self._prompt_path_info = prompt_path_info
         self._input_file_path = input_file_path
         self._model_info = model_info
         self._user_input_schema = user_input_schema
         self._output_model = output_model
+        self._response_cache = response_cache
 
     async def run(self, config_path: str | None = None, output_file: str | None = None, output_format: str = "text"):
         results = await self.run_and_collect()
@@ -200,19 +204,7 @@ class PromptEvalWorkflow:
         results: list[dict] = []
 
         for chat_input in chat_input_list:
-            if self._output_model:
-                response = await ollama_client.chat(
-                    model=self._model_info["model"],
-                    messages=chat_input["messages"],
-                    options=self._model_info.get("options"),
-                    format=self._output_model.model_json_schema(),
-                )
-            else:
-                response = await ollama_client.chat(
-                    model=self._model_info["model"],
-                    messages=chat_input["messages"],
-                    options=self._model_info.get("options"),
-                )
+            response = await self._chat(ollama_client, chat_input["messages"])
             results.append(
                 {
                     "id": chat_input["id"],
@@ -226,6 +218,46 @@ class PromptEvalWorkflow:
 
         return results
 
+    async def _chat(self, ollama_client: AsyncClient, messages: list[dict]) -> dict:
+        output_format = self._output_model.model_json_schema() if self._output_model else None
+
+        cache_key = None
+        if self._response_cache is not None:
+            cache_key = make_cache_key(
+                model=self._model_info["model"],
+                options=self._model_info.get("options"),
+                think=None,
+                format=output_format,
+                messages=messages,
+            )
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if output_format is not None:
+            response = await ollama_client.chat(
+                model=self._model_info["model"],
+                messages=messages,
+                options=self._model_info.get("options"),
+                format=output_format,
+            )
+        else:
+            response = await ollama_client.chat(
+                model=self._model_info["model"],
+                messages=messages,
+                options=self._model_info.get("options"),
+            )
+
+        response = {
+            "message": {
+                "content": response["message"]["content"],
+                "thinking": response["message"]["thinking"],
+            }
+        }
+        if cache_key is not None and response["message"]["content"]:
+            self._response_cache.put(cache_key, response)
+        return response
+
     def _build_output(self, results: list[dict], config_path: str | None) -> EvalOutput:
         output_model_str: str | None = (
             self._output_model.__module__ + "." + self._output_model.__name__
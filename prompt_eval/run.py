@@ -2,18 +2,21 @@
 Run prompt eval for a given config file.
 
 Usage:
-    python -m prompt_eval.run <config_file> [--output <path>] [--format text|json]
+    python -m prompt_eval.run <config_file> [--output <path>] [--format text|json] [--cache <dir>]
 
 Example:
     python -m prompt_eval.run resources/prompt_eval/configs/plan_prompt_v2_config.json
     python -m prompt_eval.run resources/prompt_eval/configs/plan_prompt_v2_config.json --output results.md
     python -m prompt_eval.run resources/prompt_eval/configs/plan_prompt_v2_config.json --output results.json --format json
+    python -m prompt_eval.run resources/prompt_eval/configs/plan_prompt_v2_config.json --cache ~/.easylocai/cache/prompt_eval
 """
 import asyncio
 import importlib
 import json
+import os
 import sys
 
+from easylocai.core.response_cache import LLMResponseCache
 from prompt_eval.prompt_eval_workflow import PromptEvalWorkflow
 
 _DEFAULT_MODEL_INFO = {
@@ -21,6 +24,7 @@ _DEFAULT_MODEL_INFO = {
     "model": "gpt-oss:20b",
     "options": {"temperature": 0.2},
 }
+_CACHE_MAX_SIZE_BYTES = 512 * 1024 * 1024
 
 
 def _load_class(dotted_path: str):
@@ -29,25 +33,43 @@ def _load_class(dotted_path: str):
     return getattr(module, class_name)
 
 
-async def run(config_path: str, output_file: str | None = None, output_format: str = "text"):
+async def run(
+    config_path: str,
+    output_file: str | None = None,
+    output_format: str = "text",
+    cache_dir: str | None = None,
+):
     with open(config_path) as f:
         config = json.load(f)
 
     output_model = _load_class(config["output_model"]) if config.get("output_model") else None
     model_info = {**_DEFAULT_MODEL_INFO, **config.get("model_info", {})}
 
+    response_cache = (
+        LLMResponseCache(
+            os.path.expanduser(cache_dir),
+            max_size_bytes=_CACHE_MAX_SIZE_BYTES,
+        )
+        if cache_dir
+        else None
+    )
+
     workflow = PromptEvalWorkflow(
         input_file_path=config["input_file"],
         prompt_path_info=config["prompt_info"],
         model_info=model_info,
         output_model=output_model,
+        response_cache=response_cache,
     )
     await workflow.run(config_path=config_path, output_file=output_file, output_format=output_format)
 
+    if response_cache is not None:
+        print(f"Response cache: {response_cache.stats()}")
+
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python -m prompt_eval.run <config_file> [--output <path>] [--format text|json]")
+        print("Usage: python -m prompt_eval.run <config_file> [--output <path>] [--format text|json] [--cache <dir>]")
         print("Example: python -m prompt_eval.run resources/prompt_eval/configs/plan_prompt_v2_config.json")
         print("Example: python -m prompt_eval.run resources/prompt_eval/configs/plan_prompt_v2_config.json --output results.md")
         print("Example: python -m prompt_eval.run resources/prompt_eval/configs/plan_prompt_v2_config.json --output results.json --format json")
@@ -55,6 +77,7 @@ if __name__ == "__main__":
 
     _output_file = None
     _output_format = "text"
+    _cache_dir = None
 
     args = sys.argv[1:]
     config_arg = args[0]
@@ -73,4 +96,16 @@ if __name__ == "__main__":
                 sys.exit(1)
             _output_format = fmt
 
-    asyncio.run(run(config_arg, output_file=_output_file, output_format=_output_format))
+    if "--cache" in args:
+        idx = args.index("--cache")
+        if idx + 1 < len(args):
+            _cache_dir = args[idx + 1]
+
+    asyncio.run(
+        run(
+            config_arg,
+            output_file=_output_file,
+            output_format=_output_format,
+            cache_dir=_cache_dir,
+        )
+    )
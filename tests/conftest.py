@@ -1,11 +1,18 @@
 import asyncio
 import logging
+import os
 import sys
 from contextlib import AsyncExitStack
 
 import pytest
 from ollama import AsyncClient
 
+from easylocai.core.llm_settings import (
+    ResponseCacheSettings,
+    configure_llm_settings,
+    get_llm_settings,
+)
+from easylocai.core.response_cache import get_response_cache
 from easylocai.core.tool_manager import ToolManager
 from easylocai.search_engines.advanced_search_engine import AdvancedSearchEngine
 
@@ -37,6 +44,26 @@ def _setup_easylocai_debug_logging():
     return logger
 
 
+@pytest.fixture(scope="session", autouse=True)
+def llm_response_cache():
+    """Serve repeated LLM calls from the on-disk response cache when EASYLOCAI_TEST_LLM_CACHE_DIR is set."""
+    cache_dir = os.environ.get("EASYLOCAI_TEST_LLM_CACHE_DIR")
+    if not cache_dir:
+        yield None
+        return
+
+    previous_settings = get_llm_settings()
+    configure_llm_settings(
+        previous_settings.model_copy(
+            update={"response_cache": ResponseCacheSettings(path=cache_dir)}
+        )
+    )
+    response_cache = get_response_cache()
+    yield response_cache
+    logging.getLogger(__name__).info(f"LLM response cache stats: {response_cache.stats()}")
+    configure_llm_settings(previous_settings)
+
+
 @pytest.fixture
 def ollama_client():
     return AsyncClient(host="http://localhost:11434")
@@ -0,0 +1,116 @@
+import asyncio
+import random
+import statistics
+import time
+
+from rank_bm25 import BM25Okapi
+from tabulate import tabulate
+
+from easylocai.core.search_engine import Record
+from easylocai.search_engines.keyword_search_engine import KeywordSearchEngineCollection
+
+CATALOG_SIZES = [100, 1_000, 10_000, 100_000]
+QUERY_COUNT = 50
+TOP_K = 10
+
+# Vocabulary shaped like MCP tool descriptions: a few very common words and a long tail
+COMMON_WORDS = ["the", "a", "of", "to", "file", "read", "write", "list", "get", "create"]
+random.seed(0)
+RARE_WORDS = [
+    "".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=random.randint(4, 10)))
+    for _ in range(20_000)
+]
+
+
+def make_document(rng: random.Random) -> str:
+    words = rng.choices(COMMON_WORDS, k=rng.randint(2, 6))
+    words += rng.choices(RARE_WORDS, k=rng.randint(3, 12))
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def make_query(rng: random.Random) -> str:
+    return " ".join(rng.choices(COMMON_WORDS, k=2) + rng.choices(RARE_WORDS, k=3))
+
+
+def milliseconds(timings: list[float]) -> str:
+    return f"{statistics.median(timings) * 1000:.2f}"
+
+
+async def benchmark(catalog_size: int, collection_arguments: dict) -> list:
+    rng = random.Random(catalog_size)
+    collection = KeywordSearchEngineCollection(**collection_arguments)
+    records = [
+        Record(id=str(i), document=make_document(rng), metadata=None)
+        for i in range(catalog_size)
+    ]
+    start = time.perf_counter()
+    await collection.add(records)
+    add_seconds = time.perf_counter() - start
+    queries = [make_query(rng) for _ in range(QUERY_COUNT)]
+
+    # The first query after an add builds the scoring matrix
+    start = time.perf_counter()
+    await collection.query([queries[0]], top_k=TOP_K)
+    first_query_seconds = time.perf_counter() - start
+
+    indexed_timings = []
+    for query in queries:
+        start = time.perf_counter()
+        await collection.query([query], top_k=TOP_K)
+        indexed_timings.append(time.perf_counter() - start)
+
+    # All queries in one call, scored as one batch
+    start = time.perf_counter()
+    await collection.query(queries, top_k=TOP_K)
+    batch_per_query_seconds = (time.perf_counter() - start) / len(queries)
+
+    # Baseline: rank_bm25 scoring every document, then a full sort of all scores
+    bm25 = BM25Okapi([collection._tokenize(r.document) for r in collection._records])
+    baseline_timings = []
+    for query in queries[:10]:
+        start = time.perf_counter()
+        scores = bm25.get_scores(collection._tokenize(query))
+        sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:TOP_K]
+        baseline_timings.append(time.perf_counter() - start)
+
+    return [
+        catalog_size,
+        f"{add_seconds * 1000:.0f}",
+        f"{first_query_seconds * 1000:.2f}",
+        milliseconds(indexed_timings),
+        f"{batch_per_query_seconds * 1000:.2f}",
+        milliseconds(baseline_timings),
+        f"{statistics.median(baseline_timings) / statistics.median(indexed_timings):.0f}x",
+    ]
+
+
+async def main():
+    for case_id, collection_arguments in [
+        ("keyword", {}),
+        ("keyword_ngram", {"min_gram": 3, "max_gram": 5}),
+    ]:
+        rows = [
+            await benchmark(catalog_size, collection_arguments)
+            for catalog_size in CATALOG_SIZES
+        ]
+        print(f"\n{case_id}: median query latency (top_k={TOP_K})")
+        print(
+            tabulate(
+                rows,
+                headers=[
+                    "Tools",
+                    "Add (ms)",
+                    "First query (ms)",
+                    "Query (ms)",
+                    f"Batch of {QUERY_COUNT}, per query (ms)",
+                    "rank_bm25 + sort (ms)",
+                    "Speedup",
+                ],
+                tablefmt="grid",
+            )
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -68,3 +68,19 @@ class TestSingleTaskAgent:
 
         assert isinstance(output.executed_task, str)
         assert isinstance(output.result, str)
+
+    @pytest.mark.asyncio
+    async def test_parallel_subtasks(self, ollama_client, tool_manager):
+        agent = SingleTaskAgent(
+            client=ollama_client,
+            tool_manager=tool_manager,
+            parallel_subtasks=True,
+        )
+        context = SingleTaskAgentContext(
+            original_user_query="List the files in the current directory and compute 12 * 7",
+            original_task="List the files in the current directory and compute 12 * 7",
+        )
+        output: SingleTaskAgentOutput = await agent.run(context)
+
+        assert isinstance(output.result, str)
+        assert len(output.result) > 0
@@ -0,0 +1,123 @@
+import pytest
+
+from easylocai.agents.plan_agent import PlanAgent, PlanAgentInput, has_anaphora
+from easylocai.core.metrics import get_metrics_registry
+from easylocai.schemas.context import ConversationHistory, WorkflowContext
+from tests.unittests.conftest import FakeChatClient
+
+_OUTPUTS = {
+    "QueryReformatterOutput": {"reformed_query": "Explain the file.", "query_context": None},
+    "PlannerOutput": {"tasks": ["Read a.txt", "Summarize a.txt"]},
+    "ReformatPlannerOutput": {
+        "reformed_query": "Read a.txt.",
+        "query_context": None,
+        "tasks": ["Read a.txt"],
+    },
+    "TaskGraphPlannerOutput": {"tasks": [{"task": "Read a.txt", "depends_on": []}]},
+}
+
+
+def _input(query: str, *, with_history: bool = False) -> PlanAgentInput:
+    histories = (
+        [
+            ConversationHistory(
+                original_user_query="Read a.txt",
+                reformatted_user_query="Read a.txt.",
+                response="hello",
+            )
+        ]
+        if with_history
+        else []
+    )
+    return PlanAgentInput(
+        workflow_context=WorkflowContext(
+            original_user_query=query, conversation_histories=histories
+        )
+    )
+
+
+class TestHasAnaphora:
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("Explain it", True),
+            ("Save that to b.txt", True),
+            ("Do the same for b.txt", True),
+            ("Read a.txt", False),
+            ("What is the capital of Italy?", False),
+        ],
+    )
+    def test_has_anaphora(self, query, expected):
+        assert has_anaphora(query) is expected
+
+
+class TestPlanAgentFastPlan:
+    @pytest.fixture(autouse=True)
+    def clear_registry(self):
+        get_metrics_registry().clear()
+        yield
+        get_metrics_registry().clear()
+
+    @pytest.fixture
+    def client(self):
+        return FakeChatClient(lambda request: _OUTPUTS[request["format"]["title"]])
+
+    async def test_off_always_reformats(self, client):
+        agent = PlanAgent(client=client)
+
+        output = await agent.run(_input("Read a.txt"))
+
+        assert client.calls == ["QueryReformatterOutput", "PlannerOutput"]
+        assert output.reformatted_user_query == "Explain the file."
+
+    async def test_skip_plans_original_query(self, client):
+        agent = PlanAgent(client=client, fast_plan="skip")
+
+        output = await agent.run(_input("Read a.txt", with_history=True))
+
+        assert client.calls == ["PlannerOutput"]
+        assert output.reformatted_user_query == "Read a.txt"
+        assert output.query_context is None
+        assert output.task_list == ["Read a.txt", "Summarize a.txt"]
+        assert get_metrics_registry().counters("fast_plan.") == {"fast_plan.skipped": 1}
+
+    async def test_skip_reformats_long_query(self, client):
+        agent = PlanAgent(client=client, fast_plan="skip", fast_plan_max_query_chars=5)
+
+        await agent.run(_input("I keep notes in a.txt. Read a.txt"))
+
+        assert client.calls == ["QueryReformatterOutput", "PlannerOutput"]
+        assert get_metrics_registry().counters("fast_plan.") == {"fast_plan.full": 1}
+
+    async def test_anaphora_with_history_reformats(self, client):
+        agent = PlanAgent(client=client, fast_plan="combined")
+
+        await agent.run(_input("Explain it", with_history=True))
+
+        assert client.calls == ["QueryReformatterOutput", "PlannerOutput"]
+        assert get_metrics_registry().counters("fast_plan.") == {"fast_plan.full": 1}
+
+    async def test_combined_short_query(self, client):
+        agent = PlanAgent(client=client, fast_plan="combined")
+
+        output = await agent.run(_input("Explain it"))
+
+        assert client.calls == ["ReformatPlannerOutput"]
+        assert output.reformatted_user_query == "Read a.txt."
+        assert output.task_list == ["Read a.txt"]
+        assert output.task_dependencies is None
+
+    async def test_combined_long_query_uses_both_calls(self, client):
+        agent = PlanAgent(client=client, fast_plan="combined", fast_plan_max_query_chars=5)
+
+        await agent.run(_input("Read a.txt"))
+
+        assert client.calls == ["QueryReformatterOutput", "PlannerOutput"]
+
+    async def test_combined_with_task_graph_skips_reformatter(self, client):
+        agent = PlanAgent(client=client, plan_task_graph=True, fast_plan="combined")
+
+        output = await agent.run(_input("Read a.txt"))
+
+        assert client.calls == ["TaskGraphPlannerOutput"]
+        assert output.task_dependencies == [[]]
@@ -0,0 +1,222 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from easylocai.agents.single_task_agent import SingleTaskAgent
+from easylocai.core.metrics import get_metrics_registry
+from easylocai.schemas.context import SingleTaskAgentContext
+from tests.unittests.conftest import FakeChatClient, output_name
+
+
+def _fake_chat_client() -> FakeChatClient:
+    """Answers each LLM call by the title of its output schema (or system prompt for plain text)."""
+    router_calls = 0
+
+    async def respond(request: dict):
+        nonlocal router_calls
+        name = output_name(request)
+        if name == "TaskRouterOutput":
+            if name in client.calls[:-1]:
+                content = {
+                    "subtask": None,
+                    "subtask_type": None,
+                    "finished": True,
+                    "finished_reason": "done",
+                }
+            else:
+                content = {
+                    "subtask": "Read a.txt",
+                    "subtask_type": "tool",
+                    "finished": False,
+                    "finished_reason": None,
+                }
+        elif name == "ToolSelectorOutput":
+            content = {
+                "selected_tool": {
+                    "server_name": "fs",
+                    "tool_name": "read_file",
+                    "tool_args": {"path": "a.txt"},
+                },
+                "failure_reason": None,
+            }
+        elif name == "TaskRouterOutputV2":
+            router_calls += 1
+            if router_calls == 1:
+                content = {
+                    "subtasks": [
+                        {"subtask": "Read a.txt", "subtask_type": "tool"},
+                        {"subtask": "Read b.txt", "subtask_type": "tool"},
+                        {"subtask": "Compute 12 * 7", "subtask_type": "reasoning"},
+                    ],
+                    "finished": False,
+                    "finished_reason": None,
+                }
+            else:
+                content = {"subtasks": [], "finished": True, "finished_reason": "done"}
+        elif name == "ToolSelectorOutputV2":
+            content = {
+                "results": [
+                    {
+                        "subtask": "Read b.txt",
+                        "selected_tool": {
+                            "server_name": "fs",
+                            "tool_name": "read_file",
+                            "tool_args": {"path": "b.txt"},
+                        },
+                        "failure_reason": None,
+                    },
+                    {
+                        "subtask": "Read a.txt",
+                        "selected_tool": {
+                            "server_name": "fs",
+                            "tool_name": "read_file",
+                            "tool_args": {"path": "a.txt"},
+                        },
+                        "failure_reason": None,
+                    },
+                ]
+            }
+        elif name == "ReasoningOutput":
+            content = {"reasoning": "12 * 7 = 84", "final": "84", "confidence": 100}
+        else:
+            # result filters: echo the last user message
+            await asyncio.sleep(0)
+            content = request["messages"][-1]["content"][-60:]
+        return content
+
+    client = FakeChatClient(respond)
+    return client
+
+
+class _FakeServerManager:
+    def __init__(self, failing_paths: tuple[str, ...] = ()):
+        self.calls = []
+        self._failing_paths = failing_paths
+
+    async def call_tool(self, server_name, tool_name, tool_args):
+        self.calls.append(tool_args["path"])
+        return SimpleNamespace(
+            isError=tool_args["path"] in self._failing_paths,
+            structuredContent=None,
+            content=f"contents of {tool_args['path']}",
+        )
+
+
+class _FakeToolManager:
+    def __init__(self, failing_paths: tuple[str, ...] = ()):
+        self._server_manager = _FakeServerManager(failing_paths)
+        self.queries = []
+
+    async def search_tools(self, queries, *, n_results):
+        self.queries.append(queries)
+        return [
+            SimpleNamespace(
+                server_name="fs",
+                name="read_file",
+                description="Read a file",
+                input_schema={"path": "string"},
+            )
+        ]
+
+
+class TestSingleTaskAgentParallelSubtasks:
+    async def test_routes_once_and_fans_out(self):
+        client = _fake_chat_client()
+        tool_manager = _FakeToolManager()
+        agent = SingleTaskAgent(
+            client=client, tool_manager=tool_manager, parallel_subtasks=True
+        )
+        ctx = SingleTaskAgentContext(
+            original_user_query="Read a.txt and b.txt and compute 12 * 7",
+            original_task="Read a.txt and b.txt and compute 12 * 7",
+        )
+
+        events = [event async for event in agent.run_stream(ctx)]
+
+        assert [e.message for e in events if e.type == "status"] == [
+            "Read a.txt",
+            "Read b.txt",
+            "Compute 12 * 7",
+        ]
+        assert events[-1].type == "output"
+        # one routing call per batch and a single tool selection for both tool subtasks
+        assert client.calls.count("TaskRouterOutputV2") == 2
+        assert client.calls.count("ToolSelectorOutputV2") == 1
+        assert tool_manager.queries[-1] == ["Read a.txt", "Read b.txt"]
+        assert sorted(tool_manager._server_manager.calls) == ["a.txt", "b.txt"]
+        # results are recorded in routing order
+        assert [r.subtask for r in ctx.subtask_results] == [
+            "Read a.txt",
+            "Read b.txt",
+            "Compute 12 * 7",
+        ]
+        assert "a.txt" in ctx.subtask_results[0].result
+        assert "b.txt" in ctx.subtask_results[1].result
+
+    async def test_think_signals_are_kept_per_task(self):
+        agent = SingleTaskAgent(
+            client=_fake_chat_client(),
+            tool_manager=_FakeToolManager(failing_paths=("b.txt",)),
+            parallel_subtasks=True,
+        )
+        ctx = SingleTaskAgentContext(
+            original_user_query="Read a.txt and b.txt and compute 12 * 7",
+            original_task="Read a.txt and b.txt and compute 12 * 7",
+        )
+
+        await agent.run(ctx)
+
+        assert ctx.failed_subtasks == 1
+        assert ctx.reasoning_confidence == 100
+
+
+class TestSingleTaskAgentSpeculation:
+    @pytest.fixture(autouse=True)
+    def clear_registry(self):
+        get_metrics_registry().clear()
+        yield
+        get_metrics_registry().clear()
+
+    @staticmethod
+    def _context(task: str) -> SingleTaskAgentContext:
+        return SingleTaskAgentContext(original_user_query="Read a.txt", original_task=task)
+
+    async def test_matching_context_commits_speculative_route(self):
+        client = _fake_chat_client()
+        tool_manager = _FakeToolManager()
+        agent = SingleTaskAgent(
+            client=client, tool_manager=tool_manager, speculation="route"
+        )
+
+        agent.speculate(self._context("Read a.txt"))
+        output = await agent.run(self._context("Read a.txt"))
+
+        assert output.result
+        # the speculative first route is reused: only the finishing route is called afterwards
+        assert client.calls.count("TaskRouterOutput") == 2
+        assert len(tool_manager.queries) == 2  # task candidates + subtask candidates
+        assert get_metrics_registry().counters("speculation.") == {"speculation.hit": 1}
+
+    async def test_different_context_cancels_speculation(self):
+        agent = SingleTaskAgent(
+            client=_fake_chat_client(), tool_manager=_FakeToolManager(), speculation="prefetch"
+        )
+
+        agent.speculate(self._context("Read b.txt"))
+        await agent.run(self._context("Read a.txt"))
+        agent.speculate(self._context("Read c.txt"))
+        agent.cancel_speculation()
+
+        assert get_metrics_registry().counters("speculation.") == {
+            "speculation.discarded": 1,
+            "speculation.miss": 1,
+        }
+        assert get_metrics_registry().hit_rate("speculation.") == 0.0
+
+    async def test_off(self):
+        agent = SingleTaskAgent(client=_fake_chat_client(), tool_manager=_FakeToolManager())
+
+        agent.speculate(self._context("Read a.txt"))
+
+        assert agent._speculation is None
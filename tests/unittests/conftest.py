@@ -0,0 +1,86 @@
+import inspect
+import json
+from typing import Any, Awaitable, Callable
+
+import pytest
+from ollama import ChatResponse
+
+from easylocai.core.llm_settings import configure_llm_settings, get_llm_settings
+
+Content = str | dict[str, Any]
+
+
+def output_name(request: dict) -> str:
+    """Title of the requested output schema, or the start of the system prompt for plain text output."""
+    output_format = request["format"]
+    return output_format["title"] if output_format else request["messages"][0]["content"][:40]
+
+
+class FakeChatClient:
+    """
+    Stand-in for `ollama.AsyncClient` in LLM call tests.
+
+    `respond` is either a list of response contents, answered in order, or a function (sync or async)
+    of the request keyword arguments returning the content. A dict content is sent as JSON.
+    `response_fields` are added to every response (e.g. token counts). Streamed requests get the
+    whole content as one chunk.
+    """
+
+    def __init__(
+        self,
+        respond: list[Content] | Callable[[dict], Content | Awaitable[Content]],
+        *,
+        response_fields: dict[str, Any] | None = None,
+    ):
+        self._respond = respond
+        self._response_fields = response_fields or {}
+        self.requests: list[dict] = []
+
+    @property
+    def call_count(self) -> int:
+        return len(self.requests)
+
+    @property
+    def calls(self) -> list[str]:
+        return [output_name(request) for request in self.requests]
+
+    @property
+    def models(self) -> list[str]:
+        return [request["model"] for request in self.requests]
+
+    @property
+    def thinks(self) -> list:
+        return [request["think"] for request in self.requests]
+
+    async def chat(self, **kwargs):
+        self.requests.append(kwargs)
+        if callable(self._respond):
+            content = self._respond(kwargs)
+            if inspect.isawaitable(content):
+                content = await content
+        else:
+            content = self._respond[len(self.requests) - 1]
+        if isinstance(content, dict):
+            content = json.dumps(content)
+
+        if kwargs.get("stream"):
+            return self._stream(content)
+        return ChatResponse.model_validate(
+            {
+                "model": kwargs["model"],
+                "message": {"role": "assistant", "content": content},
+                **self._response_fields,
+            }
+        )
+
+    @staticmethod
+    async def _stream(content: str):
+        yield {"message": {"role": "assistant", "content": content}}
+
+
+@pytest.fixture
+def restore_llm_settings():
+    """Put back the process-wide LLM settings a test configured."""
+    settings = get_llm_settings()
+    yield
+    configure_llm_settings(settings)
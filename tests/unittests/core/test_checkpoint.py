@@ -0,0 +1,74 @@
+import os
+
+from easylocai.core.checkpoint import CheckpointStore, WorkflowCheckpoint
+from easylocai.schemas.context import SingleTaskAgentContext, SubtaskResult, WorkflowContext
+
+
+def _checkpoint(run_id: str) -> WorkflowCheckpoint:
+    return WorkflowCheckpoint(
+        run_id=run_id,
+        stage="task",
+        workflow_context=WorkflowContext(original_user_query="q", task_list=["read a"]),
+        pending_task=SingleTaskAgentContext(
+            original_user_query="q",
+            original_task="read a",
+            subtask_results=[SubtaskResult(subtask="list files", result="a.txt")],
+        ),
+    )
+
+
+def _touch(store: CheckpointStore, run_id: str, mtime: int):
+    path = store._path(run_id)
+    os.utime(path, ns=(mtime, mtime))
+
+
+class TestCheckpointStore:
+    def test_round_trip(self, tmp_path):
+        store = CheckpointStore(tmp_path)
+        store.save(_checkpoint("run1"))
+
+        loaded = store.load("run1")
+
+        assert loaded == _checkpoint("run1").model_copy(update={"updated_at": loaded.updated_at})
+        assert list(tmp_path.iterdir()) == [tmp_path / "run1.json"]
+
+    def test_load_latest(self, tmp_path):
+        store = CheckpointStore(tmp_path)
+        store.save(_checkpoint("old"))
+        store.save(_checkpoint("new"))
+        _touch(store, "old", 1_000)
+        _touch(store, "new", 2_000)
+
+        assert store.load().run_id == "new"
+        assert store.run_ids() == ["new", "old"]
+
+    def test_missing(self, tmp_path):
+        store = CheckpointStore(tmp_path / "none")
+
+        assert store.load() is None
+        assert store.load("run1") is None
+
+    def test_delete(self, tmp_path):
+        store = CheckpointStore(tmp_path)
+        store.save(_checkpoint("run1"))
+        store.delete("run1")
+
+        assert store.load("run1") is None
+
+    def test_unreadable_checkpoint_is_skipped(self, tmp_path):
+        store = CheckpointStore(tmp_path)
+        store.save(_checkpoint("good"))
+        (tmp_path / "bad.json").write_text("{}", encoding="utf-8")
+        _touch(store, "good", 1_000)
+
+        assert store.load().run_id == "good"
+
+    def test_prune(self, tmp_path):
+        store = CheckpointStore(tmp_path, max_checkpoints=2)
+        for index, run_id in enumerate(["a", "b", "c"]):
+            store.save(_checkpoint(run_id))
+            _touch(store, run_id, (index + 1) * 1_000)
+
+        store.save(_checkpoint("d"))
+
+        assert sorted(store.run_ids()) == ["c", "d"]
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from easylocai.core.deadline import deadline_after, deadline_stream, is_expired
+
+
+async def _numbers(delays: list[float]):
+    for index, delay in enumerate(delays):
+        await asyncio.sleep(delay)
+        yield index
+
+
+class TestDeadline:
+    async def test_deadline_after(self):
+        now = asyncio.get_running_loop().time()
+
+        assert deadline_after(None) is None
+        assert deadline_after(None, within=now + 1) == now + 1
+        assert deadline_after(10, within=now + 1) == now + 1
+        assert deadline_after(1) >= now + 1
+
+    async def test_is_expired(self):
+        assert not is_expired(None)
+        assert is_expired(asyncio.get_running_loop().time())
+        assert not is_expired(deadline_after(10))
+
+    async def test_stream_without_deadline(self):
+        assert [n async for n in deadline_stream(_numbers([0, 0]), None)] == [0, 1]
+
+    async def test_stream_deadline_expires(self):
+        received = []
+
+        with pytest.raises(TimeoutError):
+            async for n in deadline_stream(_numbers([0, 0, 10]), deadline_after(0.05)):
+                received.append(n)
+
+        assert received == [0, 1]
+
+    async def test_consumer_time_is_not_bounded(self):
+        received = []
+
+        async for n in deadline_stream(_numbers([0, 0]), deadline_after(0.2)):
+            received.append(n)
+            # Work done by the consumer between items does not cancel the stream
+            await asyncio.sleep(0.05)
+
+        assert received == [0, 1]
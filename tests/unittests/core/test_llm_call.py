@@ -0,0 +1,366 @@
+import asyncio
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from easylocai.core.llm_settings import (
+    LLMSettings,
+    configure_llm_settings,
+    get_llm_settings,
+)
+from easylocai.core.metrics import get_metrics_registry
+from easylocai.core.model_router import get_model_router
+from easylocai.core.response_cache import get_response_cache
+from easylocai.core.token_budget import estimate_messages_tokens
+from easylocai.llm_calls.subtask_result_filter import (
+    SubtaskResultFilter,
+    SubtaskResultFilterInput,
+)
+from easylocai.llm_calls.task_router import TaskRouter, TaskRouterInput
+from easylocai.schemas.context import ConversationHistory
+from tests.unittests.conftest import FakeChatClient
+
+
+@pytest.mark.usefixtures("restore_llm_settings")
+class TestLLMCallV2TokenBudget:
+    async def test_num_ctx_is_sent(self):
+        configure_llm_settings({"token_budget": {"num_ctx": 8192}})
+        client = FakeChatClient(["Found a.py"])
+
+        await SubtaskResultFilter(client=client).call(
+            SubtaskResultFilterInput(subtask="List files", result={})
+        )
+
+        assert client.requests[0]["options"]["num_ctx"] == 8192
+
+    def test_oversized_input_is_trimmed(self):
+        configure_llm_settings(
+            {"token_budget": {"max_prompt_tokens_by_call": {"SubtaskResultFilter": 2000}}}
+        )
+        input_ = SubtaskResultFilterInput(
+            subtask="List files", result={"content": "a.py " * 10000}
+        )
+
+        messages = SubtaskResultFilter(client=None).render_messages(input_)
+
+        assert estimate_messages_tokens(messages) <= 2000
+        assert "...[truncated]..." in messages[1]["content"]
+        assert "List files" in messages[1]["content"]
+
+    def test_disabled_budget_keeps_input(self):
+        configure_llm_settings({"token_budget": {"enabled": False}})
+        input_ = SubtaskResultFilterInput(
+            subtask="List files", result={"content": "a.py " * 10000}
+        )
+
+        llm_call = SubtaskResultFilter(client=None)
+        messages = llm_call.render_messages(input_)
+
+        assert "...[truncated]..." not in messages[1]["content"]
+        assert "num_ctx" not in llm_call._options
+
+
+class TestLLMCallV2RenderMessages:
+    @pytest.fixture
+    def llm_call(self):
+        return SubtaskResultFilter(client=None)
+
+    def test_render_messages(self, llm_call):
+        messages = llm_call.render_messages(
+            SubtaskResultFilterInput(subtask="List files", result={"content": "a.py"})
+        )
+
+        assert [m["role"] for m in messages] == ["system", "user"]
+        assert "List files" in messages[1]["content"]
+        assert "a.py" in messages[1]["content"]
+
+    def test_render_messages_skips_pretty_formatting_when_debug_disabled(
+        self, llm_call
+    ):
+        easylocai_logger = logging.getLogger("easylocai")
+        level = easylocai_logger.level
+        easylocai_logger.setLevel(logging.INFO)
+        try:
+            with patch("easylocai.utlis.prompt.pretty_prompt_text") as mock_pretty:
+                llm_call.render_messages(
+                    SubtaskResultFilterInput(subtask="List files", result={})
+                )
+            mock_pretty.assert_not_called()
+        finally:
+            easylocai_logger.setLevel(level)
+
+
+class TestLLMCallV2PrefixStableLayout:
+    @staticmethod
+    def _task_router_input(iteration_results):
+        return TaskRouterInput(
+            task="Count Python files",
+            query_context=None,
+            conversation_histories=[
+                ConversationHistory(
+                    original_user_query="Find Python files",
+                    reformatted_user_query="Find Python files",
+                    response="a.py, b.py",
+                )
+            ],
+            tool_candidates=[
+                {
+                    "server_name": "filesystem",
+                    "tool_name": "list_directory",
+                    "tool_description": "List a directory",
+                }
+            ],
+            previous_task_results=[],
+            iteration_results=iteration_results,
+        )
+
+    def test_default_layout_renders_single_user_message(self):
+        llm_call = TaskRouter(client=None)
+
+        messages = llm_call.render_messages(self._task_router_input([]))
+
+        assert [m["role"] for m in messages] == ["system", "user"]
+
+    def test_prefix_stable_layout_shares_prefix(self):
+        llm_call = TaskRouter(client=None, message_layout="prefix_stable")
+
+        first = llm_call.render_messages(self._task_router_input([]))
+        second = llm_call.render_messages(
+            self._task_router_input([{"subtask": "list files", "result": "a.py"}])
+        )
+
+        assert [m["role"] for m in first] == ["system", "user", "assistant", "user"]
+        assert first[:-1] == second[:-1]
+        assert first[-1] != second[-1]
+        # The tool catalog is searched per call, so it must not be part of the shared prefix
+        assert "list_directory" in first[-1]["content"]
+        assert "CONVERSATION_HISTORY" not in first[-1]["content"]
+
+    def test_prefix_stable_layout_without_stable_template(self):
+        llm_call = SubtaskResultFilter(client=None, message_layout="prefix_stable")
+
+        messages = llm_call.render_messages(
+            SubtaskResultFilterInput(subtask="List files", result={})
+        )
+
+        assert [m["role"] for m in messages] == ["system", "user"]
+
+
+@pytest.mark.usefixtures("restore_llm_settings")
+class TestLLMSettings:
+    def test_configure_from_dict(self):
+        configure_llm_settings(
+            {
+                "message_layout": "prefix_stable",
+                "keep_alive": "30m",
+                "keep_alive_by_call": {"TaskRouter": -1},
+            }
+        )
+
+        assert TaskRouter(client=None)._message_layout == "prefix_stable"
+        assert TaskRouter(client=None)._keep_alive == -1
+        assert SubtaskResultFilter(client=None)._keep_alive == "30m"
+
+    def test_configure_none_resets_to_defaults(self):
+        configure_llm_settings({"message_layout": "prefix_stable"})
+        configure_llm_settings(None)
+
+        assert get_llm_settings() == LLMSettings()
+
+
+class _FakeStreamClient:
+    def __init__(self, chunks: list[str]):
+        self._chunks = chunks
+        self.consumed = 0
+        self.closed = False
+
+    async def chat(self, **kwargs):
+        assert kwargs["stream"] is True
+        return self._stream()
+
+    async def _stream(self):
+        try:
+            for chunk in self._chunks:
+                self.consumed += 1
+                yield {"message": {"role": "assistant", "content": chunk}}
+        finally:
+            self.closed = True
+
+
+class TestLLMCallV2CallStream:
+    async def test_call_stream_yields_fields_then_output(self):
+        client = _FakeStreamClient(
+            [
+                '{"subtask": "List files", ',
+                '"subtask_type": "tool", "finished": false, ',
+                '"finished_reason": null}',
+                "\n\n\n",
+            ]
+        )
+        task_router = TaskRouter(client=client)
+
+        events = [
+            event
+            async for event in task_router.call_stream(
+                TestLLMCallV2PrefixStableLayout._task_router_input([])
+            )
+        ]
+
+        assert [(e.type, e.field) for e in events] == [
+            ("field", "subtask"),
+            ("field", "subtask_type"),
+            ("field", "finished"),
+            ("field", "finished_reason"),
+            ("output", None),
+        ]
+        assert events[0].value == "List files"
+        assert events[-1].output.subtask == "List files"
+        # generation is aborted after the closing brace
+        assert client.consumed == 3
+        assert client.closed
+
+    async def test_call_stream_plain_text_output(self):
+        client = _FakeStreamClient(["Found ", "a.py"])
+        subtask_result_filter = SubtaskResultFilter(client=client)
+
+        events = [
+            event
+            async for event in subtask_result_filter.call_stream(
+                SubtaskResultFilterInput(subtask="List files", result={})
+            )
+        ]
+
+        assert len(events) == 1
+        assert events[0].output.root == "Found a.py"
+
+
+class TestLLMCallV2ResponseCache:
+    @pytest.fixture(autouse=True)
+    def response_cache_settings(self, tmp_path, restore_llm_settings):
+        configure_llm_settings(
+            {"response_cache": {"path": str(tmp_path), "max_size_mb": 1}}
+        )
+
+    async def test_cached_response_is_reused(self):
+        input_ = SubtaskResultFilterInput(subtask="List files", result={})
+        client = FakeChatClient(["Found a.py"])
+
+        first = await SubtaskResultFilter(client=client).call(input_)
+        second = await SubtaskResultFilter(client=client).call(input_)
+
+        assert first.root == second.root == "Found a.py"
+        assert client.call_count == 1
+        assert get_response_cache().stats()["hits"] == 1
+
+    async def test_invalid_response_is_not_cached(self):
+        input_ = TestLLMCallV2PrefixStableLayout._task_router_input([])
+        valid = '{"subtask": null, "subtask_type": null, "finished": true, "finished_reason": "done"}'
+        client = FakeChatClient(["not json", valid, valid])
+
+        await TaskRouter(client=client).call(input_)
+        await TaskRouter(client=client).call(input_)
+
+        assert client.call_count == 2
+        assert get_response_cache().stats()["writes"] == 1
+
+    async def test_response_is_cached_under_the_answering_model(self, tmp_path):
+        configure_llm_settings(
+            {
+                "response_cache": {"path": str(tmp_path), "max_size_mb": 1},
+                "model_routing": {"model_by_call": {"SubtaskResultFilter": "small"}},
+            }
+        )
+        input_ = SubtaskResultFilterInput(subtask="List files", result={})
+        client = FakeChatClient(["Found by default", "Found by small"])
+        residency = get_model_router().residency
+
+        # "small" is not loaded, so the call is routed to the resident default model
+        residency.touch("gpt-oss:20b")
+        routed = await SubtaskResultFilter(client=client).call(input_)
+        residency.touch("small")
+        first_tier = await SubtaskResultFilter(client=client).call(input_)
+
+        assert routed.root == "Found by default"
+        assert first_tier.root == "Found by small"
+        assert client.models == ["gpt-oss:20b", "small"]
+
+
+class TestLLMCallV2Recovery:
+    VALID = '{"subtask": null, "subtask_type": null, "finished": true, "finished_reason": "done"}'
+
+    @pytest.fixture(autouse=True)
+    def clear_registry(self):
+        get_metrics_registry().clear()
+        yield
+        get_metrics_registry().clear()
+
+    @staticmethod
+    def _recovery_paths() -> list[str | None]:
+        return [m.recovery_path for m in get_metrics_registry().records]
+
+    async def test_first_try(self):
+        task_router = TaskRouter(client=FakeChatClient([self.VALID]))
+
+        await task_router.call(TestLLMCallV2PrefixStableLayout._task_router_input([]))
+
+        assert self._recovery_paths() == ["first_try"]
+        assert get_metrics_registry().summary()["by_call"]["TaskRouter"]["recovery"] == {
+            "first_try": 1
+        }
+
+    async def test_local_repair_skips_regeneration(self):
+        client = FakeChatClient(["```json\n" + self.VALID[:-1] + ",\n```"])
+        task_router = TaskRouter(client=client)
+
+        output = await task_router.call(
+            TestLLMCallV2PrefixStableLayout._task_router_input([])
+        )
+
+        assert output.finished is True
+        assert client.call_count == 1
+        assert self._recovery_paths() == ["repaired"]
+
+    async def test_corrective_turn(self):
+        client = FakeChatClient(['{"subtask": "x"}', self.VALID])
+        task_router = TaskRouter(client=client)
+
+        output = await task_router.call(
+            TestLLMCallV2PrefixStableLayout._task_router_input([])
+        )
+
+        assert output.finished is True
+        assert self._recovery_paths() == [None, "corrective"]
+        first_messages = client.requests[0]["messages"]
+        retry_messages = client.requests[1]["messages"]
+        assert retry_messages[: len(first_messages)] == first_messages
+        assert retry_messages[-2] == {"role": "assistant", "content": '{"subtask": "x"}'}
+        assert "could not be parsed" in retry_messages[-1]["content"]
+
+    async def test_concurrent_calls_on_one_instance(self):
+        client = FakeChatClient([self.VALID, "```json\n" + self.VALID + "\n```"])
+        task_router = TaskRouter(client=client)
+        input_ = TestLLMCallV2PrefixStableLayout._task_router_input([])
+
+        await asyncio.gather(task_router.call(input_), task_router.call(input_))
+
+        assert sorted(self._recovery_paths()) == ["first_try", "repaired"]
+
+    async def test_raises_after_max_retries(self):
+        client = FakeChatClient(["", "", ""])
+        task_router = TaskRouter(client=client)
+
+        with pytest.raises(ValueError, match="empty response"):
+            await task_router.call(
+                TestLLMCallV2PrefixStableLayout._task_router_input([])
+            )
+        assert client.call_count == 3
+
+    async def test_retry_escalates_think_level(self):
+        client = FakeChatClient(["", "", "Found a.py"])
+
+        await SubtaskResultFilter(client=client).call(
+            SubtaskResultFilterInput(subtask="List files", result={})
+        )
+
+        assert [r["think"] for r in client.requests] == ["low", "medium", "high"]
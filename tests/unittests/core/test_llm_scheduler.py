@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from easylocai.core.llm_scheduler import LLMScheduler
+
+
+class TestLLMScheduler:
+    async def test_limits_in_flight_requests(self):
+        scheduler = LLMScheduler(max_in_flight=2)
+        running = 0
+        max_running = 0
+
+        async def request():
+            nonlocal running, max_running
+            async with scheduler.slot():
+                running += 1
+                max_running = max(max_running, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(request() for _ in range(6)))
+
+        assert max_running == 2
+        assert scheduler.in_flight == 0
+        assert scheduler.stats()["by_priority"]["normal"]["requests"] == 6
+
+    async def test_serves_waiting_requests_by_priority(self):
+        scheduler = LLMScheduler(max_in_flight=1)
+        order = []
+        release = asyncio.Event()
+
+        async def blocker():
+            async with scheduler.slot():
+                await release.wait()
+
+        async def request(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        blocker_task = asyncio.create_task(blocker())
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(request("low", "low")),
+            asyncio.create_task(request("normal", "normal")),
+            asyncio.create_task(request("high", "high")),
+            asyncio.create_task(request("normal2", "normal")),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queued == 4
+
+        release.set()
+        await asyncio.gather(blocker_task, *tasks)
+
+        assert order == ["high", "normal", "normal2", "low"]
+        assert scheduler.stats()["by_priority"]["low"]["max_wait"] > 0
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        scheduler = LLMScheduler(max_in_flight=1)
+        release = asyncio.Event()
+
+        async def blocker():
+            async with scheduler.slot():
+                await release.wait()
+
+        async def request():
+            async with scheduler.slot():
+                return "done"
+
+        blocker_task = asyncio.create_task(blocker())
+        await asyncio.sleep(0)
+        cancelled_task = asyncio.create_task(request())
+        waiting_task = asyncio.create_task(request())
+        await asyncio.sleep(0)
+
+        cancelled_task.cancel()
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled_task
+        assert await waiting_task == "done"
+        await blocker_task
+        assert scheduler.in_flight == 0
+        assert scheduler.stats()["by_priority"]["normal"]["cancelled"] == 1
+
+    def test_invalid_max_in_flight(self):
+        with pytest.raises(ValueError):
+            LLMScheduler(max_in_flight=0)
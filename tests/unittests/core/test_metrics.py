@@ -0,0 +1,159 @@
+import json
+
+import pytest
+from ollama import ChatResponse
+
+from easylocai.core.agent import Agent, AgentStreamEvent
+from easylocai.core.metrics import (
+    Histogram,
+    LLMCallMetric,
+    MetricsRegistry,
+    get_metrics_registry,
+    metrics_scope,
+    scoped_stream,
+)
+from easylocai.llm_calls.subtask_result_filter import (
+    SubtaskResultFilter,
+    SubtaskResultFilterInput,
+    SubtaskResultFilterOutput,
+)
+from tests.unittests.conftest import FakeChatClient
+
+
+def make_metric(**kwargs) -> LLMCallMetric:
+    return LLMCallMetric(
+        **{"call_name": "Planner", "model": "gpt-oss:20b", "recorded_at": 0.0, **kwargs}
+    )
+
+
+class TestHistogram:
+    def test_observe(self):
+        histogram = Histogram(buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        result = histogram.to_dict()
+
+        assert result["count"] == 4
+        assert result["min"] == 0.5
+        assert result["max"] == 10
+        assert result["buckets"] == {"<=1": 2, "<=5": 1, ">5": 1}
+
+
+class TestLLMCallMetric:
+    def test_from_response_converts_nanoseconds(self):
+        response = ChatResponse.model_validate(
+            {
+                "model": "gpt-oss:20b",
+                "message": {"role": "assistant", "content": "ok"},
+                "total_duration": 2_000_000_000,
+                "prompt_eval_count": 100,
+                "prompt_eval_duration": 500_000_000,
+                "eval_count": 20,
+            }
+        )
+
+        metric = LLMCallMetric.from_response(response, call_name="Planner", model="m")
+
+        assert metric.total_duration == 2.0
+        assert metric.prompt_eval_duration == 0.5
+        assert metric.prompt_eval_count == 100
+        assert metric.eval_count == 20
+        assert metric.eval_duration is None
+        assert metric.load_duration is None
+
+
+class TestMetricsRegistry:
+    def test_summary(self, tmp_path):
+        registry = MetricsRegistry()
+        registry.record(
+            make_metric(
+                agent="PlanAgent",
+                run_id="run-1",
+                render_duration=0.25,
+                wall_duration=2.0,
+                eval_count=100,
+                eval_duration=2.0,
+            )
+        )
+        registry.record(make_metric(agent="PlanAgent", run_id="run-1", attempt=1, aborted=True))
+        registry.record(make_metric(call_name="Replanner", cached=True, render_duration=0.5))
+
+        summary = registry.summary()
+
+        assert summary["total"]["calls"] == 3
+        assert summary["total"]["cached"] == 1
+        assert summary["by_call"]["Planner"]["retries"] == 1
+        assert summary["by_call"]["Planner"]["aborted"] == 1
+        assert summary["by_call"]["Planner"]["eval_tokens_per_sec"] == 50.0
+        assert summary["by_call"]["Planner"]["wall_duration"]["count"] == 2
+        assert summary["by_call"]["Planner"]["render_duration"] == 0.25
+        assert summary["total"]["render_duration"] == 0.75
+        assert summary["by_agent"]["PlanAgent"]["calls"] == 2
+        assert summary["by_agent"]["-"]["calls"] == 1
+        assert summary["by_run"]["run-1"]["calls"] == 2
+
+        registry.dump(tmp_path / "metrics.json")
+        dumped = json.loads((tmp_path / "metrics.json").read_text())
+        assert len(dumped["records"]) == 3
+
+    def test_max_records(self):
+        registry = MetricsRegistry(max_records=2)
+        for _ in range(3):
+            registry.record(make_metric())
+
+        assert len(registry.records) == 2
+        assert registry.summary()["total"]["calls"] == 3
+
+
+def _fake_chat_client() -> FakeChatClient:
+    return FakeChatClient(
+        lambda request: "Found a.py",
+        response_fields={"eval_count": 3, "eval_duration": 1_000_000_000},
+    )
+
+
+class _FilterAgent(Agent[SubtaskResultFilterInput, SubtaskResultFilterOutput]):
+    def __init__(self):
+        self._filter = SubtaskResultFilter(client=_fake_chat_client())
+
+    async def _run_stream(self, input_):
+        yield AgentStreamEvent(type="status", message="filtering")
+        yield AgentStreamEvent(type="output", output=await self._filter.call(input_))
+
+
+class TestMetricsTagging:
+    @pytest.fixture(autouse=True)
+    def clear_registry(self):
+        get_metrics_registry().clear()
+        yield
+        get_metrics_registry().clear()
+
+    async def test_llm_call_is_tagged_with_agent_and_run_id(self):
+        input_ = SubtaskResultFilterInput(subtask="List files", result={})
+
+        async def run():
+            async for event in _FilterAgent().run_stream(input_):
+                yield event
+
+        events = [event async for event in scoped_stream(run(), run_id="run-1")]
+
+        assert events[-1].output.root == "Found a.py"
+        [metric] = get_metrics_registry().records
+        assert metric.call_name == "SubtaskResultFilter"
+        assert metric.agent == "_FilterAgent"
+        assert metric.run_id == "run-1"
+        assert metric.eval_count == 3
+        assert metric.eval_duration == 1.0
+        assert metric.render_duration > 0
+
+    async def test_scope_does_not_leak(self):
+        with metrics_scope(agent="PlanAgent"):
+            await SubtaskResultFilter(client=_fake_chat_client()).call(
+                SubtaskResultFilterInput(subtask="List files", result={})
+            )
+        await SubtaskResultFilter(client=_fake_chat_client()).call(
+            SubtaskResultFilterInput(subtask="List files", result={})
+        )
+
+        assert [m.agent for m in get_metrics_registry().records] == ["PlanAgent", None]
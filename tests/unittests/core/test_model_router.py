@@ -0,0 +1,112 @@
+from unittest.mock import patch
+
+import pytest
+
+from easylocai.core.llm_settings import (
+    ModelRoutingSettings,
+    configure_llm_settings,
+)
+from easylocai.core.model_router import ModelResidency, ModelRouter, get_model_router
+from easylocai.llm_calls.subtask_result_filter import (
+    SubtaskResultFilter,
+    SubtaskResultFilterInput,
+)
+from tests.unittests.conftest import FakeChatClient
+
+
+class TestModelResidency:
+    def test_least_recently_used_model_is_evicted(self):
+        residency = ModelResidency(max_loaded_models=2, ttl=300)
+        residency.touch("a")
+        residency.touch("b")
+        residency.touch("a")
+        residency.touch("c")
+
+        assert residency.resident_models() == ["a", "c"]
+        assert not residency.is_resident("b")
+
+    def test_model_expires_after_ttl(self):
+        residency = ModelResidency(max_loaded_models=2, ttl=300)
+        with patch("easylocai.core.model_router.time.monotonic", return_value=0):
+            residency.touch("a")
+        with patch("easylocai.core.model_router.time.monotonic", return_value=301):
+            assert not residency.is_resident("a")
+
+
+class TestModelRouter:
+    @pytest.fixture
+    def router(self):
+        return ModelRouter(
+            ModelRoutingSettings(
+                model_by_call={"SubtaskResultFilter": "small"}, max_loaded_models=1
+            )
+        )
+
+    def test_tiers(self, router):
+        assert router.tiers("SubtaskResultFilter", "large") == ["small", "large"]
+        assert router.tiers("Planner", "large") == ["large"]
+
+    def test_escalation_model(self):
+        router = ModelRouter(ModelRoutingSettings(escalation_model="huge"))
+
+        assert router.tiers("Planner", "large") == ["large", "huge"]
+
+    def test_route_prefers_resident_model(self, router):
+        tiers = ["small", "large"]
+        assert router.route("SubtaskResultFilter", tiers) == tiers
+
+        router.residency.touch("large")
+        assert router.route("SubtaskResultFilter", tiers) == ["large"]
+
+        router.residency.touch("small")
+        assert router.route("SubtaskResultFilter", tiers) == tiers
+
+    def test_route_without_prefer_resident(self):
+        router = ModelRouter(ModelRoutingSettings(prefer_resident=False))
+        router.residency.touch("large")
+
+        assert router.route("SubtaskResultFilter", ["small", "large"]) == ["small", "large"]
+
+    def test_model_for_attempt(self, router):
+        assert [router.model_for_attempt(["small", "large"], a) for a in range(3)] == [
+            "small",
+            "large",
+            "large",
+        ]
+
+
+class TestLLMCallModelEscalation:
+    @pytest.fixture(autouse=True)
+    def routing_settings(self, restore_llm_settings):
+        configure_llm_settings(
+            {"model_routing": {"model_by_call": {"SubtaskResultFilter": "small"}}}
+        )
+
+    async def test_validation_failure_escalates_to_large_model(self):
+        client = FakeChatClient(["", "Found a.py"])
+
+        output = await SubtaskResultFilter(client=client).call(
+            SubtaskResultFilterInput(subtask="List files", result={})
+        )
+
+        assert output.root == "Found a.py"
+        assert client.models == ["small", "gpt-oss:20b"]
+        assert get_model_router().residency.resident_models() == ["small", "gpt-oss:20b"]
+
+    async def test_escalated_response_is_not_served_to_the_first_tier(self, tmp_path):
+        configure_llm_settings(
+            {
+                "model_routing": {"model_by_call": {"SubtaskResultFilter": "small"}},
+                "response_cache": {"path": str(tmp_path), "max_size_mb": 1},
+            }
+        )
+        input_ = SubtaskResultFilterInput(subtask="List files", result={})
+        client = FakeChatClient(["", "Found by large", "Found by small"])
+
+        escalated = await SubtaskResultFilter(client=client).call(input_)
+        first_tier = await SubtaskResultFilter(client=client).call(input_)
+        cached = await SubtaskResultFilter(client=client).call(input_)
+
+        assert escalated.root == "Found by large"
+        assert first_tier.root == cached.root == "Found by small"
+        assert client.models == ["small", "gpt-oss:20b", "small"]
@@ -0,0 +1,54 @@
+import pytest
+from pydantic import BaseModel, RootModel
+
+from easylocai.core.prompt_registry import PromptRegistry, get_prompt_registry
+
+
+class _OutputModel(BaseModel):
+    answer: str
+
+
+class _TextOutputModel(RootModel[str]):
+    root: str
+
+
+class TestPromptRegistry:
+    @pytest.fixture
+    def registry(self, tmp_path):
+        (tmp_path / "prompts").mkdir()
+        (tmp_path / "prompts" / "system.jinja2").write_text("You are a helpful assistant.")
+        (tmp_path / "prompts" / "user.jinja2").write_text("Query: {{ query }}")
+        return PromptRegistry(tmp_path)
+
+    def test_get_template_compiles_once(self, registry):
+        template1 = registry.get_template("prompts/user.jinja2")
+        template2 = registry.get_template("prompts/user.jinja2")
+
+        assert template1 is template2
+        assert template1.render(query="hello") == "Query: hello"
+
+    def test_get_static_text_is_cached(self, registry, tmp_path):
+        text = registry.get_static_text("prompts/system.jinja2")
+        (tmp_path / "prompts" / "system.jinja2").write_text("changed")
+
+        assert text == "You are a helpful assistant."
+        assert registry.get_static_text("prompts/system.jinja2") is text
+
+    def test_get_output_format(self, registry):
+        output_format = registry.get_output_format(_OutputModel)
+
+        assert output_format == _OutputModel.model_json_schema()
+        assert registry.get_output_format(_OutputModel) is output_format
+
+    def test_get_output_format_root_model_is_none(self, registry):
+        assert registry.get_output_format(_TextOutputModel) is None
+
+    def test_clear(self, registry):
+        template = registry.get_template("prompts/user.jinja2")
+        registry.clear()
+
+        assert registry.get_template("prompts/user.jinja2") is not template
+
+
+def test_get_prompt_registry_is_process_wide():
+    assert get_prompt_registry() is get_prompt_registry()
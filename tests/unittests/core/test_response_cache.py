@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from easylocai.core.response_cache import LLMResponseCache, make_cache_key
+
+
+def make_key(content: str) -> str:
+    return make_cache_key(
+        model="gpt-oss:20b",
+        options={"temperature": 0.2},
+        think=None,
+        format=None,
+        messages=[{"role": "user", "content": content}],
+    )
+
+
+def make_response(content: str) -> dict:
+    return {"message": {"role": "assistant", "content": content}}
+
+
+class TestMakeCacheKey:
+    def test_same_request_same_key(self):
+        assert make_key("hello") == make_key("hello")
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"model": "gpt-oss:120b"},
+            {"options": {"temperature": 0.1}},
+            {"think": "medium"},
+            {"format": {"type": "object"}},
+            {"messages": [{"role": "user", "content": "bye"}]},
+        ],
+    )
+    def test_any_request_change_changes_key(self, changes):
+        kwargs = {
+            "model": "gpt-oss:20b",
+            "options": {"temperature": 0.2},
+            "think": None,
+            "format": None,
+            "messages": [{"role": "user", "content": "hello"}],
+        }
+        assert make_cache_key(**kwargs) != make_cache_key(**{**kwargs, **changes})
+
+
+class TestLLMResponseCache:
+    def test_write_through(self, tmp_path):
+        cache = LLMResponseCache(tmp_path, max_size_bytes=1024 * 1024)
+
+        assert cache.get(make_key("a")) is None
+        cache.put(make_key("a"), make_response("A"))
+
+        assert cache.get(make_key("a")) == make_response("A")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 1
+
+    def test_home_is_expanded(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("HOME", str(tmp_path))
+
+        LLMResponseCache("~/cache", max_size_bytes=1024 * 1024)
+
+        assert (tmp_path / "cache").is_dir()
+
+    def test_entries_survive_new_instance(self, tmp_path):
+        LLMResponseCache(tmp_path, max_size_bytes=1024 * 1024).put(
+            make_key("a"), make_response("A")
+        )
+
+        cache = LLMResponseCache(tmp_path, max_size_bytes=1024 * 1024)
+
+        assert cache.get(make_key("a")) == make_response("A")
+        assert cache.stats()["entries"] == 1
+
+    def test_read_only_does_not_write(self, tmp_path):
+        cache = LLMResponseCache(tmp_path, max_size_bytes=1024 * 1024, mode="read_only")
+
+        cache.put(make_key("a"), make_response("A"))
+
+        assert cache.get(make_key("a")) is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_bypass_by_call(self, tmp_path):
+        cache = LLMResponseCache(
+            tmp_path,
+            max_size_bytes=1024 * 1024,
+            mode_by_call={"Reasoning": "bypass"},
+        )
+        cache.put(make_key("a"), make_response("A"))
+
+        assert cache.get(make_key("a"), call_name="Reasoning") is None
+        assert cache.get(make_key("a"), call_name="Planner") == make_response("A")
+
+    def test_lru_eviction(self, tmp_path):
+        cache = LLMResponseCache(tmp_path, max_size_bytes=1024 * 1024)
+        cache.put(make_key("a"), make_response("A" * 400))
+        entry_size = cache.stats()["size_bytes"]
+        cache = LLMResponseCache(tmp_path, max_size_bytes=entry_size * 3 - 10)
+        cache.put(make_key("b"), make_response("B" * 400))
+
+        # "a" is older, but reading it makes "b" the least recently used entry
+        os.utime(tmp_path / f"{make_key('a')}.json", (1, 1))
+        os.utime(tmp_path / f"{make_key('b')}.json", (2, 2))
+        assert cache.get(make_key("a")) is not None
+
+        cache.put(make_key("c"), make_response("C" * 400))
+
+        assert cache.get(make_key("b")) is None
+        assert cache.get(make_key("a")) is not None
+        assert cache.get(make_key("c")) is not None
+        assert cache.stats()["evictions"] == 1
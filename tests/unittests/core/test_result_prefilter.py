@@ -0,0 +1,64 @@
+import pytest
+from mcp.types import ImageContent, TextContent
+
+from easylocai.core.metrics import get_metrics_registry
+from easylocai.core.result_prefilter import SubtaskResultPrefilter
+
+
+class TestSubtaskResultPrefilter:
+    @pytest.fixture(autouse=True)
+    def clear_registry(self):
+        get_metrics_registry().clear()
+        yield
+        get_metrics_registry().clear()
+
+    @pytest.fixture
+    def prefilter(self):
+        return SubtaskResultPrefilter(max_chars=50, min_reasoning_confidence=80)
+
+    def test_error_passthrough(self, prefilter):
+        assert prefilter.apply({"error": "File not found"}) == "Error: File not found"
+
+    def test_high_confidence_reasoning(self, prefilter):
+        result = {"reasoning": "x" * 500, "final": "84", "confidence": 90}
+
+        assert prefilter.apply(result) == "84"
+
+    def test_low_confidence_reasoning_needs_llm(self, prefilter):
+        result = {"reasoning": "...", "final": "84", "confidence": 40}
+
+        assert prefilter.apply(result) is None
+
+    def test_small_tool_content(self, prefilter):
+        result = {
+            "content": [
+                TextContent(type="text", text="a.py"),
+                TextContent(type="text", text="b.py"),
+            ]
+        }
+
+        assert prefilter.apply(result) == "a.py\nb.py"
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            [TextContent(type="text", text="x" * 51)],
+            [ImageContent(type="image", data="abc", mimeType="image/png")],
+        ],
+    )
+    def test_large_or_non_text_content_needs_llm(self, prefilter, content):
+        assert prefilter.apply({"content": content}) is None
+
+    def test_structured_content(self, prefilter):
+        assert prefilter.apply({"files": ["a.py"], "count": 1}) == '{"files":["a.py"],"count":1}'
+        assert prefilter.apply({"files": ["x" * 60]}) is None
+
+    def test_counters(self, prefilter):
+        prefilter.apply({"error": "boom"})
+        prefilter.apply({"error": "boom"})
+        prefilter.apply({"files": ["x" * 60]})
+
+        assert get_metrics_registry().counters("subtask_prefilter.") == {
+            "subtask_prefilter.error": 2,
+            "subtask_prefilter.llm": 1,
+        }
@@ -0,0 +1,21 @@
+from easylocai.core.task_graph import TaskGraph
+
+
+class TestTaskGraph:
+    def test_invalid_dependencies_are_dropped(self):
+        graph = TaskGraph(["a", "b", "c"], [[0, 1], [1, 2, 0], [0, 0, -1, 5]])
+
+        assert graph.dependencies(0) == ()
+        assert graph.dependencies(1) == (0,)
+        assert graph.dependencies(2) == (0,)
+
+    def test_ancestors(self):
+        graph = TaskGraph(["a", "b", "c", "d"], [[], [0], [], [1]])
+
+        assert graph.ancestors(3) == [0, 1]
+        assert graph.ancestors(2) == []
+
+    def test_levels(self):
+        graph = TaskGraph(["a", "b", "c", "d"], [[], [], [0, 1], [0]])
+
+        assert graph.levels() == [[0, 1], [2, 3]]
@@ -0,0 +1,137 @@
+import pytest
+
+from easylocai.agents.reasoning_agent import ReasoningAgent, ReasoningAgentInput
+from easylocai.core.llm_settings import (
+    ThinkPolicySettings,
+    configure_llm_settings,
+)
+from easylocai.core.think_policy import ThinkPolicy, think_level, think_param
+from tests.unittests.conftest import FakeChatClient
+
+
+class TestThinkParam:
+    @pytest.mark.parametrize(
+        "level, think",
+        [(None, None), ("off", False), ("low", "low"), ("high", "high")],
+    )
+    def test_round_trip(self, level, think):
+        assert think_param(level) == think
+        assert think_level(think) == level
+
+    def test_true_is_not_a_level(self):
+        assert think_level(True) is None
+
+
+class TestThinkPolicy:
+    @pytest.fixture
+    def policy(self):
+        return ThinkPolicy(ThinkPolicySettings(short_text_chars=10, long_text_chars=50))
+
+    def test_calls_without_level_use_server_default(self, policy):
+        assert policy.choose("Planner", default=None, text="x" * 100) is None
+
+    def test_level_by_call_overrides_default(self):
+        policy = ThinkPolicy(ThinkPolicySettings(level_by_call={"Planner": "high"}))
+
+        assert policy.choose("Planner", default="low") == "high"
+
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            ({"text": "x" * 20}, "medium"),
+            ({"text": "short"}, "low"),
+            ({"text": "x" * 100}, "high"),
+            ({"text": "short", "failures": 1}, "high"),
+            ({"text": "short", "previous_confidence": 20}, "high"),
+            ({"text": "short", "previous_confidence": 90}, "low"),
+            ({"text": "x" * 100, "failures": 2}, "high"),
+        ],
+    )
+    def test_choose(self, policy, kwargs, expected):
+        assert policy.choose("Reasoning", default="medium", **kwargs) == expected
+
+    def test_min_level(self):
+        policy = ThinkPolicy(ThinkPolicySettings(min_level="medium"))
+
+        assert policy.choose("Reasoning", default="medium", text="short") == "medium"
+
+    def test_escalate(self, policy):
+        assert policy.escalate("low") == "medium"
+        assert policy.escalate("high") is None
+        assert policy.escalate(None) is None
+
+    def test_disabled_policy_keeps_base_level(self):
+        policy = ThinkPolicy(ThinkPolicySettings(enabled=False))
+
+        assert policy.choose("Reasoning", default="medium", text="short", failures=3) == "medium"
+        assert policy.escalate("medium") is None
+        assert policy.max_escalations == 0
+
+
+def _reasoning_client(confidences: list[int]) -> FakeChatClient:
+    return FakeChatClient(
+        [
+            {"reasoning": "...", "final": f"answer {confidence}", "confidence": confidence}
+            for confidence in confidences
+        ]
+    )
+
+
+@pytest.mark.usefixtures("restore_llm_settings")
+class TestReasoningAgentThinkLevel:
+    @staticmethod
+    def _input(subtask: str) -> ReasoningAgentInput:
+        return ReasoningAgentInput(
+            original_task="Summarize the files",
+            task={"description": subtask},
+            query_context=None,
+            previous_task_results=[],
+        )
+
+    async def test_trivial_subtask_uses_low(self):
+        client = _reasoning_client([100])
+
+        await ReasoningAgent(client=client).run(self._input("Add 2 and 3"))
+
+        assert client.thinks == ["low"]
+
+    async def test_low_confidence_escalates(self):
+        client = _reasoning_client([10, 80])
+
+        output = await ReasoningAgent(client=client).run(self._input("Add 2 and 3"))
+
+        assert output.final == "answer 80"
+        assert client.thinks == ["low", "medium"]
+
+    async def test_agent_keeps_no_state_between_runs(self):
+        client = _reasoning_client([10, 10, 90])
+        agent = ReasoningAgent(client=client)
+
+        await agent.run(self._input("Add 2 and 3"))
+        await agent.run(self._input("Add 4 and 5"))
+
+        # the low confidence of the first run does not raise the level of the second
+        assert client.thinks == ["low", "medium", "low"]
+
+    @pytest.mark.parametrize(
+        "signals",
+        [{"previous_confidence": 10}, {"failures": 1}],
+    )
+    async def test_hard_task_signals_raise_the_level(self, signals):
+        client = _reasoning_client([90])
+
+        await ReasoningAgent(client=client).run(
+            self._input("Add 2 and 3").model_copy(update=signals)
+        )
+
+        # one step above the default medium instead of one below it for a short subtask
+        assert client.thinks == ["high"]
+
+    async def test_escalation_keeps_more_confident_answer(self):
+        configure_llm_settings({"think_policy": {"max_escalations": 2}})
+        client = _reasoning_client([30, 20, 10])
+
+        output = await ReasoningAgent(client=client).run(self._input("Add 2 and 3"))
+
+        assert output.final == "answer 30"
+        assert client.thinks == ["low", "medium", "high"]
@@ -0,0 +1,65 @@
+from easylocai.core.token_budget import (
+    TokenBudget,
+    estimate_messages_tokens,
+    estimate_tokens,
+)
+
+
+class TestEstimateTokens:
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("a" * 35) == 10
+
+    def test_estimate_messages_tokens_adds_message_overhead(self):
+        messages = [
+            {"role": "system", "content": "a" * 35},
+            {"role": "user", "content": "a" * 35},
+        ]
+
+        assert estimate_messages_tokens(messages) == 28
+
+
+class TestTokenBudget:
+    def test_section_tokens(self):
+        budget = TokenBudget(1000)
+
+        sections = budget.section_tokens(
+            {"histories": ["a" * 35], "results": [], "query": "hi"},
+            ("histories", "results"),
+        )
+
+        assert list(sections) == ["histories"]
+        assert sections["histories"] > 0
+
+    def test_fit_drops_oldest_entries_first(self):
+        budget = TokenBudget(1000)
+        input_dict = {"histories": ["a" * 350, "b" * 350, "c" * 350], "query": "hi"}
+
+        fitted = budget.fit(input_dict, fields=("histories",), excess_tokens=150)
+
+        assert fitted["histories"] == ["c" * 350]
+        assert fitted["query"] == "hi"
+        # the original input is left untouched
+        assert len(input_dict["histories"]) == 3
+
+    def test_fit_keeps_last_entry_and_truncates_largest_string(self):
+        budget = TokenBudget(1000, min_truncated_tokens=10)
+        input_dict = {
+            "results": [{"task": "small", "result": "x" * 3500}],
+        }
+
+        fitted = budget.fit(input_dict, fields=("results",), excess_tokens=500)
+
+        result = fitted["results"][0]["result"]
+        assert fitted["results"][0]["task"] == "small"
+        assert "...[truncated]..." in result
+        assert result.startswith("x") and result.endswith("x")
+        assert estimate_tokens(result) <= 1000 - 500 + 1
+
+    def test_fit_ignores_fields_outside_budget(self):
+        budget = TokenBudget(1000, min_truncated_tokens=10)
+        input_dict = {"query": "q" * 3500, "results": []}
+
+        fitted = budget.fit(input_dict, fields=("results",), excess_tokens=500)
+
+        assert fitted["query"] == "q" * 3500
@@ -0,0 +1,118 @@
+import pytest
+
+from easylocai.core.metrics import get_metrics_registry
+from easylocai.core.search_engine import Record
+from easylocai.core.tool_manager import ToolManager, ToolSearchCache, normalize_query
+
+
+def _record(tool_name: str, description: str = "") -> Record:
+    return Record(
+        id=f"fs:{tool_name}",
+        document=description or tool_name,
+        metadata={"server_name": "fs", "tool_name": tool_name},
+    )
+
+
+class _FakeCollection:
+    def __init__(self, records: list[Record]):
+        self.records = records
+        self.queries: list[list[str]] = []
+
+    async def query(self, queries: list[str], *, top_k: int) -> list[list[Record]]:
+        self.queries.append(queries)
+        return [self.records[:top_k] for _ in queries]
+
+
+class _FakeServer:
+    def get_tool(self, tool_name: str) -> str:
+        return tool_name
+
+
+class _FakeServerManager:
+    def get_server(self, server_name: str) -> _FakeServer:
+        return _FakeServer()
+
+
+class TestNormalizeQuery:
+    def test_normalize(self):
+        assert normalize_query("  List   the FILES.\n") == "list the files"
+
+
+class TestToolSearchCache:
+    def test_lru_eviction(self):
+        cache = ToolSearchCache(max_entries=2)
+        cache.put("a", 3, [("fs", "a")])
+        cache.put("b", 3, [("fs", "b")])
+        cache.get("a", 3)
+        cache.put("c", 3, [("fs", "c")])
+
+        assert cache.get("a", 3) == [("fs", "a")]
+        assert cache.get("b", 3) is None
+        assert len(cache) == 2
+
+    def test_keyed_on_top_k(self):
+        cache = ToolSearchCache()
+        cache.put("a", 3, [("fs", "a")])
+
+        assert cache.get("a", 5) is None
+
+    def test_catalog_change_clears(self):
+        cache = ToolSearchCache()
+        cache.set_catalog([_record("read_file")])
+        cache.put("a", 3, [("fs", "read_file")])
+
+        cache.set_catalog([_record("read_file")])
+        assert len(cache) == 1
+
+        cache.set_catalog([_record("read_file", "Read a file from disk")])
+        assert len(cache) == 0
+
+
+class TestToolManagerSearchCache:
+    @pytest.fixture(autouse=True)
+    def clear_registry(self):
+        get_metrics_registry().clear()
+        yield
+        get_metrics_registry().clear()
+
+    def _tool_manager(self, records: list[Record], **kwargs) -> ToolManager:
+        tool_manager = ToolManager(None, mpc_servers={}, **kwargs)
+        tool_manager._server_manager = _FakeServerManager()
+        tool_manager._tool_collection = _FakeCollection(records)
+        return tool_manager
+
+    async def test_repeated_query_skips_search(self):
+        tool_manager = self._tool_manager([_record("read_file"), _record("list_dir")])
+
+        first = await tool_manager.search_tools(["List files"], n_results=2)
+        second = await tool_manager.search_tools(["list   files."], n_results=2)
+
+        assert first == second == ["read_file", "list_dir"]
+        assert tool_manager._tool_collection.queries == [["List files"]]
+        assert get_metrics_registry().hit_rate("tool_search_cache.") == 0.5
+
+    async def test_only_missing_queries_are_searched(self):
+        tool_manager = self._tool_manager([_record("read_file")])
+        await tool_manager.search_tools(["a"], n_results=1)
+
+        tools = await tool_manager.search_tools(["a", "b"], n_results=1)
+
+        assert tools == ["read_file"]
+        assert tool_manager._tool_collection.queries == [["a"], ["b"]]
+
+    async def test_tools_found_by_several_queries_are_listed_once(self):
+        tool_manager = self._tool_manager(
+            [_record("read_file"), _record("list_dir"), _record("write_file")]
+        )
+
+        tools = await tool_manager.search_tools(["a", "b"], n_results=2)
+
+        assert tools == ["read_file", "list_dir"]
+
+    async def test_cache_disabled(self):
+        tool_manager = self._tool_manager([_record("read_file")], search_cache_size=0)
+
+        await tool_manager.search_tools(["a"], n_results=1)
+        await tool_manager.search_tools(["a"], n_results=1)
+
+        assert tool_manager._tool_collection.queries == [["a"], ["a"]]
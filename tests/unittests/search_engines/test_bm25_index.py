@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from rank_bm25 import BM25Okapi
+
+from easylocai.search_engines.bm25_index import BM25Index, top_k_indices
+
+
+class TestBM25Index:
+    def test_terms_are_interned(self):
+        index = BM25Index()
+        index.add([["a", "b", "a"], ["b", "c"]])
+
+        assert index.term_id("a") == 0
+        assert index.term_id("b") == 1
+        assert index.term_id("c") == 2
+        assert index.term_id("missing") is None
+        assert index.document_frequency("b") == 2
+        assert index.document_frequency("missing") == 0
+
+    def test_empty_index(self):
+        index = BM25Index()
+
+        assert len(index) == 0
+        assert index.get_scores(["anything"]).shape == (0,)
+
+    def test_idf_is_recomputed_lazily_after_add(self):
+        index = BM25Index()
+        index.add([["a", "b"], ["a", "c"]])
+        first_idf = index.idf()
+        assert index.idf() is first_idf
+
+        index.add([["c", "d"]])
+
+        assert index._idf is None
+        assert index.idf() is not first_idf
+        assert index.document_frequency("c") == 2
+
+    def test_common_terms_are_floored_like_bm25_okapi(self):
+        corpus = [["a", "b"], ["a", "c"], ["a", "d", "d"], ["e"]]
+        index = BM25Index()
+        index.add(corpus)
+
+        expected = BM25Okapi(corpus)
+        idf = index.idf()
+        for term, expected_idf in expected.idf.items():
+            assert idf[index.term_id(term)] == pytest.approx(expected_idf)
+        for query in (["a"], ["d"], ["a", "d", "missing"]):
+            np.testing.assert_allclose(index.get_scores(query), expected.get_scores(query))
+
+    def test_scores_after_more_adds_use_the_new_corpus(self):
+        index = BM25Index()
+        index.add([["a", "b"], ["b", "c"]])
+        index.get_scores(["b"])
+        index.add([["c", "c", "d"]])
+
+        expected = BM25Okapi([["a", "b"], ["b", "c"], ["c", "c", "d"]])
+        for query in (["c"], ["b", "b"], ["a", "d"]):
+            np.testing.assert_allclose(index.get_scores(query), expected.get_scores(query))
+
+    def test_batch_scores_match_single_query_scores(self):
+        corpus = [["a", "b"], ["a", "c"], ["a", "d", "d"], ["e"], ["b", "e", "e"]]
+        index = BM25Index()
+        index.add(corpus)
+        queries = [["a"], [], ["d", "e", "missing"], ["b", "b", "c"], ["missing"]]
+
+        batch_scores = index.get_batch_scores(queries)
+
+        assert batch_scores.shape == (5, 5)
+        expected = BM25Okapi(corpus)
+        for query, scores in zip(queries, batch_scores):
+            np.testing.assert_allclose(scores, expected.get_scores(query))
+
+    def test_top_k_splits_large_batches(self):
+        index = BM25Index()
+        index.add([["a", "b"], ["b", "c"], ["c", "d"], ["d"]])
+        queries = [["a"], ["b"], ["c"], ["d"], ["a", "d"]]
+
+        # Room for a single query per batch
+        chunked = index.top_k(queries, 2, max_batch_cells=4)
+
+        assert [r.tolist() for r in chunked] == [r.tolist() for r in index.top_k(queries, 2)]
+        assert chunked[0].tolist() == [0, 1]
+
+
+class TestTopKIndices:
+    @pytest.mark.parametrize("k", [0, 1, 3, 5, 8, 20])
+    def test_matches_a_stable_full_sort(self, k):
+        scores = np.array([0.5, 2.0, 0.0, 2.0, 1.0, 0.5, 0.5, 3.0])
+
+        expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
+
+        assert top_k_indices(scores, k).tolist() == expected
+
+    def test_ties_at_the_boundary_keep_the_lowest_indices(self):
+        scores = np.zeros(1000)
+        scores[500] = 1.0
+
+        assert top_k_indices(scores, 3).tolist() == [500, 0, 1]
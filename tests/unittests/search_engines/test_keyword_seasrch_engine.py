@@ -1,7 +1,8 @@
 import logging
-from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
+from rank_bm25 import BM25Okapi
 
 from easylocai.core.search_engine import Record
 from easylocai.search_engines.keyword_search_engine import (
@@ -15,20 +16,11 @@ logger = logging.getLogger(__name__)
 
 class TestKeywordSearchEngineCollection:
     @pytest.fixture
-    def mock_bm25(self):
-        with patch("easylocai.search_engines.keyword_search_engine.BM25Okapi") as mock:
-            mock_instance = MagicMock()
-            mock.return_value = mock_instance
-            yield mock, mock_instance
-
-    @pytest.fixture
-    def collection(self, mock_bm25):
+    def collection(self):
         return KeywordSearchEngineCollection()
 
-    async def test_add_single_document(self, collection, mock_bm25):
+    async def test_add_single_document(self, collection):
         """Test adding a single document to the collection."""
-        mock_cls, mock_instance = mock_bm25
-
         await collection.add(
             [
                 Record(
@@ -42,13 +34,10 @@ class TestKeywordSearchEngineCollection:
         assert len(collection._records) == 1
         assert collection._records[0].id == "doc1"
         assert collection._records[0].document == "This is a test document"
-        assert collection._records[0].idx == 0
-        mock_cls.assert_called_once()
+        assert len(collection._bm25) == 1
 
-    async def test_add_multiple_documents(self, collection, mock_bm25):
+    async def test_add_multiple_documents(self, collection):
         """Test adding multiple documents at once."""
-        mock_cls, mock_instance = mock_bm25
-
         await collection.add(
             [
                 Record(
@@ -73,9 +62,9 @@ class TestKeywordSearchEngineCollection:
         assert collection._records[0].id == "doc1"
         assert collection._records[1].id == "doc2"
         assert collection._records[2].id == "doc3"
-        mock_cls.assert_called_once()
+        assert len(collection._bm25) == 3
 
-    async def test_add_documents_with_metadata(self, collection, mock_bm25):
+    async def test_add_documents_with_metadata(self, collection):
         """Test adding documents with metadata."""
         await collection.add(
             [
@@ -89,7 +78,7 @@ class TestKeywordSearchEngineCollection:
         assert collection._records[0].metadata == {"author": "Alice"}
         assert collection._records[1].metadata == {"author": "Bob"}
 
-    async def test_add_documents_without_metadata(self, collection, mock_bm25):
+    async def test_add_documents_without_metadata(self, collection):
         """Test adding documents without metadata results in None."""
         await collection.add(
             [Record(id="doc1", document="Document without metadata", metadata=None)]
@@ -119,7 +108,6 @@ class TestKeywordSearchEngineCollection:
     async def test_add_duplicate_id_raises_error(
         self,
         collection,
-        mock_bm25,
         first_records,
         second_records,
     ):
@@ -130,7 +118,7 @@ class TestKeywordSearchEngineCollection:
 
         logger.info(f"Raised ValueError as expected: {exc_info.value}")
 
-    async def test_add_duplicate_id_in_batch_raises_error(self, collection, mock_bm25):
+    async def test_add_duplicate_id_in_batch_raises_error(self, collection):
         """Test that adding documents with duplicate id in same batch raises error."""
         await collection.add(
             [Record(id="doc1", document="First document", metadata=None)]
@@ -144,11 +132,13 @@ class TestKeywordSearchEngineCollection:
                 ]
             )
 
-    async def test_query(self, collection, mock_bm25):
-        """Test querying the collection after adding documents."""
-        mock_cls, mock_instance = mock_bm25
-        mock_instance.get_scores.return_value = [0.3, 0.9, 0.5]
+        # The failed batch is not added at all
+        assert [r.id for r in collection._records] == ["doc1"]
+        assert len(collection._bm25) == 1
+        await collection.add([Record(id="doc2", document="Second document", metadata=None)])
 
+    async def test_query(self, collection):
+        """Test querying the collection after adding documents."""
         await collection.add(
             [
                 Record(
@@ -165,9 +155,9 @@ class TestKeywordSearchEngineCollection:
 
         assert len(result) == 1
         assert len(result[0]) == 2
-        assert result[0][0].id == "doc2"
-        assert result[0][1].id == "doc3"
-        mock_instance.get_scores.assert_called_once()
+        # The shorter document wins on equal term frequency
+        assert result[0][0].id == "doc1"
+        assert result[0][1].id == "doc2"
 
     @pytest.mark.parametrize(
         "text,expected_tokens",
@@ -177,15 +167,34 @@ class TestKeywordSearchEngineCollection:
             ("UPPERCASE lowercase MixedCase", ["uppercase", "lowercase", "mixedcase"]),
         ],
     )
-    def test_tokenize(self, collection, mock_bm25, text, expected_tokens):
+    def test_tokenize(self, collection, text, expected_tokens):
         """Test the tokenization method with various inputs."""
         tokens = collection._tokenize(text)
         assert tokens == expected_tokens
 
-    async def test_bm25_index_is_built(self, collection, mock_bm25):
-        """Test that BM25 index is built after adding documents."""
-        mock_cls, mock_instance = mock_bm25
+    async def test_query_multiple_queries(self, collection):
+        """Test that a batch of queries returns the same results as querying one by one."""
+        await collection.add(
+            [
+                Record(id="doc1", document="Read a file from disk", metadata=None),
+                Record(id="doc2", document="Write a file to disk", metadata=None),
+                Record(id="doc3", document="Search the web", metadata=None),
+            ]
+        )
+        queries = ["read file", "web search", "write", "nothing matches"]
+
+        batch_result = await collection.query(queries, top_k=2)
+
+        assert len(batch_result) == len(queries)
+        for query, records in zip(queries, batch_result):
+            single_result = await collection.query([query], top_k=2)
+            assert [r.id for r in records] == [r.id for r in single_result[0]]
+        assert batch_result[0][0].id == "doc1"
+        assert batch_result[1][0].id == "doc3"
+        assert batch_result[2][0].id == "doc2"
 
+    async def test_bm25_index_is_built(self, collection):
+        """Test that BM25 index is built after adding documents."""
         await collection.add(
             [
                 Record(
@@ -199,27 +208,57 @@ class TestKeywordSearchEngineCollection:
             ]
         )
 
-        mock_cls.assert_called_once_with(
-            [
-                ["python", "is", "a", "programming", "language"],
-                ["machine", "learning", "uses", "python"],
-            ]
-        )
-
-    async def test_incremental_add_rebuilds_index(self, collection, mock_bm25):
-        """Test that adding documents incrementally rebuilds the BM25 index."""
-        mock_cls, mock_instance = mock_bm25
+        assert collection._bm25.document_frequency("python") == 2
+        assert collection._bm25.document_frequency("machine") == 1
+        assert collection._bm25.avgdl == 4.5
 
+    async def test_incremental_add_updates_index(self, collection):
+        """Test that adding documents incrementally gives the same scores as one full build."""
         await collection.add(
             [Record(id="doc1", document="First document", metadata=None)]
         )
+        first_scores = collection._bm25.get_scores(["first"])
 
         await collection.add(
             [Record(id="doc2", document="Second document", metadata=None)]
         )
 
-        assert mock_cls.call_count == 2
+        assert len(first_scores) == 1
         assert len(collection._records) == 2
+        expected = BM25Okapi([collection._tokenize(r.document) for r in collection._records])
+        for query in (["first"], ["document"], ["second", "document"]):
+            np.testing.assert_allclose(
+                collection._bm25.get_scores(query), expected.get_scores(query)
+            )
+
+    async def test_scores_match_bm25_okapi(self):
+        """Test that the incremental index scores exactly like rank_bm25 over the same corpus."""
+        collection = KeywordSearchEngineCollection(min_gram=3, max_gram=5)
+        documents = [
+            "Read the contents of a file from disk",
+            "Write text content to a file",
+            "List the files of a directory",
+            "Search the web for a query",
+            "Fetch a web page and convert it to markdown",
+            "Send a message to a Slack channel",
+            "Read messages from a Slack channel",
+            "Create a directory",
+        ]
+        # Several adds of different sizes
+        for start, end in [(0, 1), (1, 4), (4, 8)]:
+            await collection.add(
+                [
+                    Record(id=f"doc{i}", document=documents[i], metadata=None)
+                    for i in range(start, end)
+                ]
+            )
+
+        expected = BM25Okapi([collection._tokenize(r.document) for r in collection._records])
+        for query in ["read file", "slack message", "web page markdown", "directory", "unknown"]:
+            tokens = collection._tokenize(query)
+            np.testing.assert_allclose(
+                collection._bm25.get_scores(tokens), expected.get_scores(tokens)
+            )
 
 
 class TestKeywordSearchEngine:
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from easylocai.batch import BatchQuery, process_batch, read_batch_queries, run_batch_query
+from easylocai.schemas.common import EasyLocaiWorkflowOutput
+
+
+class _FakeWorkflow:
+    running = 0
+    max_running = 0
+
+    async def run(self, user_query, *, global_context):
+        cls = _FakeWorkflow
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            yield EasyLocaiWorkflowOutput(type="status", message="Thinking...")
+            await asyncio.sleep(0.01)
+            if user_query == "fail":
+                raise RuntimeError("boom")
+            assert global_context.conversation_histories == []
+            global_context.conversation_histories.append(user_query)
+            yield EasyLocaiWorkflowOutput(
+                type="result", message=f"answer to {user_query}", partial=user_query == "slow"
+            )
+        finally:
+            cls.running -= 1
+
+
+class TestReadBatchQueries:
+    def test_read(self):
+        lines = ['{"id": "a", "query": "Read a.txt"}\n', "\n", '"What is 2 + 2?"\n', '{"query": "x"}']
+
+        assert list(read_batch_queries(iter(lines))) == [
+            BatchQuery(id="a", query="Read a.txt"),
+            BatchQuery(id="3", query="What is 2 + 2?"),
+            BatchQuery(id="4", query="x"),
+        ]
+
+    def test_invalid_lines_are_yielded_with_an_error(self):
+        lines = ['{"query": "ok"}\n', "{not json\n", '{"id": "b"}\n', "[1, 2]\n"]
+
+        batch_queries = list(read_batch_queries(iter(lines)))
+
+        assert [(q.id, q.error is None) for q in batch_queries] == [
+            ("1", True),
+            ("2", False),
+            ("3", False),
+            ("4", False),
+        ]
+        assert batch_queries[1].query == "{not json"
+        assert batch_queries[1].error.startswith("Invalid JSON: ")
+
+
+class TestProcessBatch:
+    @pytest.fixture(autouse=True)
+    def reset_counts(self):
+        _FakeWorkflow.running = 0
+        _FakeWorkflow.max_running = 0
+
+    async def test_run_batch_query(self):
+        result = await run_batch_query(_FakeWorkflow(), BatchQuery(id="1", query="slow"))
+
+        assert result.answer == "answer to slow"
+        assert result.partial
+        assert result.error is None
+        assert 0 <= result.first_status_seconds <= result.duration_seconds
+
+    async def test_error_is_reported(self):
+        result = await run_batch_query(_FakeWorkflow(), BatchQuery(id="1", query="fail"))
+
+        assert result.answer is None
+        assert result.error == "RuntimeError: boom"
+
+    async def test_invalid_line_is_reported_without_running(self):
+        batch_query = BatchQuery(id="2", query="{not json", error="Invalid JSON: ...")
+
+        result = await run_batch_query(_FakeWorkflow(), batch_query)
+
+        assert result.error == "Invalid JSON: ..."
+        assert result.answer is None
+        assert _FakeWorkflow.max_running == 0
+
+    async def test_failing_on_result_stops_the_batch(self):
+        queries = [BatchQuery(id=str(i), query=f"q{i}") for i in range(10)]
+
+        def on_result(result):
+            raise OSError("No space left on device")
+
+        with pytest.raises(OSError, match="No space left on device"):
+            await asyncio.wait_for(
+                process_batch(iter(queries), [_FakeWorkflow(), _FakeWorkflow()], on_result),
+                timeout=1,
+            )
+        assert _FakeWorkflow.running == 0
+
+    async def test_bounded_concurrency(self):
+        queries = [BatchQuery(id=str(i), query=f"q{i}") for i in range(7)] + [
+            BatchQuery(id="f", query="fail")
+        ]
+        results = []
+
+        count = await process_batch(
+            iter(queries), [_FakeWorkflow(), _FakeWorkflow()], results.append
+        )
+
+        assert count == 8
+        assert _FakeWorkflow.max_running == 2
+        assert sorted(r.id for r in results) == sorted(q.id for q in queries)
+        assert {r.id: r.error for r in results if r.error} == {"f": "RuntimeError: boom"}
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import stat
+
+import pytest
+
+from easylocai.client import ServerError, WorkflowClient
+from easylocai.schemas.common import EasyLocaiWorkflowOutput
+from easylocai.server import WorkflowServer
+
+
+class _FakeWorkflow:
+    def __init__(self):
+        self.cancelled = asyncio.Event()
+
+    async def run(self, user_query, *, global_context):
+        yield EasyLocaiWorkflowOutput(type="status", message="Thinking...")
+        if user_query == "hang":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                self.cancelled.set()
+                raise
+        if user_query == "fail":
+            raise RuntimeError("boom")
+        global_context.conversation_histories.append(user_query)
+        yield EasyLocaiWorkflowOutput(
+            type="result",
+            message=f"turn {len(global_context.conversation_histories)}: {user_query}",
+        )
+
+
+class TestWorkflowServer:
+    @pytest.fixture
+    def workflow(self):
+        return _FakeWorkflow()
+
+    @pytest.fixture
+    async def socket_path(self, tmp_path, workflow):
+        socket_path = tmp_path / "s.sock"
+        server_task = asyncio.create_task(
+            WorkflowServer([workflow], max_sessions=2).serve(socket_path)
+        )
+        for _ in range(100):
+            if socket_path.exists():
+                break
+            await asyncio.sleep(0.01)
+        yield socket_path
+        server_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await server_task
+        assert not socket_path.exists()
+
+    async def test_run_streams_outputs_and_keeps_session_history(self, socket_path):
+        async with WorkflowClient(socket_path) as client:
+            assert await client.ping()
+            first = [o async for o in client.run("hello")]
+            second = [o async for o in client.run("again")]
+
+        assert [o.type for o in first] == ["status", "result"]
+        assert first[-1].message == "turn 1: hello"
+        assert second[-1].message == "turn 2: again"
+
+    async def test_socket_is_owner_only(self, socket_path):
+        assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+
+    async def test_least_recently_used_session_is_dropped(self, socket_path):
+        async with (
+            WorkflowClient(socket_path) as a,
+            WorkflowClient(socket_path) as b,
+            WorkflowClient(socket_path) as c,
+        ):
+            [o async for o in a.run("hello")]
+            [o async for o in b.run("hello")]
+            [o async for o in b.run("again")]
+            [o async for o in c.run("hello")]
+            a_outputs = [o async for o in a.run("again")]
+            c_outputs = [o async for o in c.run("again")]
+
+        assert a_outputs[-1].message == "turn 1: again"
+        assert c_outputs[-1].message == "turn 2: again"
+
+    async def test_sessions_are_separate(self, socket_path):
+        async with WorkflowClient(socket_path) as a, WorkflowClient(socket_path) as b:
+            [o async for o in a.run("hello")]
+            outputs = [o async for o in b.run("hello")]
+
+        assert outputs[-1].message == "turn 1: hello"
+
+    async def test_reset(self, socket_path):
+        async with WorkflowClient(socket_path) as client:
+            [o async for o in client.run("hello")]
+            await client.reset()
+            outputs = [o async for o in client.run("hello")]
+
+        assert outputs[-1].message == "turn 1: hello"
+
+    async def test_error(self, socket_path):
+        async with WorkflowClient(socket_path) as client:
+            with pytest.raises(ServerError, match="RuntimeError: boom"):
+                async for _ in client.run("fail"):
+                    pass
+            # The connection stays usable
+            assert await client.ping()
+
+    async def test_leaving_a_run_cancels_it(self, socket_path, workflow):
+        async with WorkflowClient(socket_path) as client:
+            async for output in client.run("hang"):
+                assert output.type == "status"
+                break
+
+            await asyncio.wait_for(workflow.cancelled.wait(), timeout=1)
+            # The next run reconnects to the same session, with the workflow back in the pool
+            outputs = [o async for o in client.run("hello")]
+
+        assert outputs[-1].message == "turn 1: hello"
+
+    async def test_invalid_request(self, socket_path):
+        reader, writer = await asyncio.open_unix_connection(str(socket_path))
+        writer.write(b'{"type": "run"}\n')
+        await writer.drain()
+
+        response = json.loads(await reader.readline())
+        writer.close()
+
+        assert response["type"] == "error"
+        assert "need a query" in response["message"]
@@ -0,0 +1,381 @@
+import asyncio
+
+import pytest
+
+from easylocai.agents.plan_agent import PlanAgentOutput
+from easylocai.agents.replan_agent import ReplanAgentOutput
+from easylocai.agents.single_task_agent import SingleTaskAgentOutput
+from easylocai.core.agent import Agent, AgentStreamEvent
+from easylocai.core.checkpoint import CheckpointStore
+from easylocai.core.task_graph import TaskGraph
+from easylocai.schemas.context import (
+    ExecutedTaskResult,
+    GlobalContext,
+    SubtaskResult,
+    WorkflowContext,
+)
+from easylocai.workflow import EasylocaiWorkflow, WorkflowSettings
+
+
+class _FakeSingleTaskAgent(Agent):
+    """Finishes each task after a per-task delay and records what it saw."""
+
+    running = 0
+    max_running = 0
+
+    def __init__(self, delays: dict[str, float], seen: dict[str, list[str]]):
+        self._delays = delays
+        self._seen = seen
+
+    async def _run_stream(self, input_):
+        cls = _FakeSingleTaskAgent
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            self._seen[input_.original_task] = [
+                r.executed_task for r in input_.executed_task_results
+            ]
+            yield AgentStreamEvent(type="status", message=f"working on {input_.original_task}")
+            await asyncio.sleep(self._delays.get(input_.original_task, 0))
+            if input_.original_task == "fail":
+                raise RuntimeError("task failed")
+        finally:
+            cls.running -= 1
+        yield AgentStreamEvent(
+            type="output",
+            output=SingleTaskAgentOutput(
+                executed_task=input_.original_task,
+                result=f"result of {input_.original_task}",
+            ),
+        )
+
+
+class TestExecuteTaskGraph:
+    @pytest.fixture
+    def seen(self):
+        return {}
+
+    @pytest.fixture
+    def workflow(self, seen):
+        workflow = EasylocaiWorkflow(
+            config_dict={
+                "mcpServers": {},
+                "workflow": {"execution_mode": "task_graph", "max_parallel_tasks": 2},
+            },
+            search_engine=None,
+            ollama_client=None,
+        )
+        delays = {"read a": 0.05, "read b": 0.01, "read c": 0.01}
+        workflow._parallel_task_agents = [
+            _FakeSingleTaskAgent(delays, seen) for _ in range(2)
+        ]
+        _FakeSingleTaskAgent.running = 0
+        _FakeSingleTaskAgent.max_running = 0
+        return workflow
+
+    @staticmethod
+    def _workflow_context(tasks: list[str]) -> WorkflowContext:
+        return WorkflowContext(
+            original_user_query="Compare a, b and c",
+            task_list=tasks,
+            executed_task_results=[
+                ExecutedTaskResult(executed_task="earlier", result="earlier result")
+            ],
+        )
+
+    async def test_independent_tasks_run_in_parallel_and_merge_in_plan_order(
+        self, workflow, seen
+    ):
+        tasks = ["read a", "read b", "read c", "compare"]
+        ctx = self._workflow_context(tasks)
+        graph = TaskGraph(tasks, [[], [], [], [0, 1, 2]])
+
+        outputs = [o async for o in workflow._execute_task_graph(ctx, graph)]
+
+        assert [r.executed_task for r in ctx.executed_task_results] == [
+            "earlier",
+            "read a",
+            "read b",
+            "read c",
+            "compare",
+        ]
+        assert _FakeSingleTaskAgent.max_running == 2
+        assert seen["read a"] == ["earlier"]
+        assert seen["compare"] == ["earlier", "read a", "read b", "read c"]
+        assert {o.message for o in outputs} >= {"read a", "working on compare"}
+
+    async def test_task_error_is_raised(self, workflow):
+        tasks = ["fail", "read a"]
+        ctx = self._workflow_context(tasks)
+
+        with pytest.raises(RuntimeError, match="task failed"):
+            async for _ in workflow._execute_task_graph(ctx, TaskGraph(tasks, [[], [0]])):
+                pass
+
+        assert [r.executed_task for r in ctx.executed_task_results] == ["earlier"]
+
+    async def test_finished_results_are_kept_when_a_task_fails(self, workflow, tmp_path):
+        workflow._checkpoint_store = CheckpointStore(tmp_path)
+        tasks = ["read b", "read a", "fail", "compare"]
+        ctx = self._workflow_context(tasks)
+        graph = TaskGraph(tasks, [[], [], [0], [1, 2]])
+
+        with pytest.raises(RuntimeError, match="task failed"):
+            async for _ in workflow._execute_task_graph(ctx, graph, run_id="run1"):
+                pass
+
+        # "read b" finished before "fail" raised; "read a" was still running
+        assert [r.executed_task for r in ctx.executed_task_results] == ["earlier", "read b"]
+        checkpoint = workflow.load_checkpoint("run1")
+        assert checkpoint.stage == "planned"
+        assert checkpoint.workflow_context.task_list == ["read a", "fail", "compare"]
+        assert checkpoint.task_dependencies == [[], [], [0, 1]]
+        assert [r.executed_task for r in checkpoint.workflow_context.executed_task_results] == [
+            "earlier",
+            "read b",
+        ]
+
+
+class _FakePlanAgent(Agent):
+    def __init__(self, task_dependencies: list[list[int]] | None = None):
+        self._task_dependencies = task_dependencies
+
+    async def _run(self, input_):
+        return PlanAgentOutput(
+            query_context=None,
+            reformatted_user_query="Summarize a",
+            task_list=["read a", "summarize a"],
+            task_dependencies=self._task_dependencies,
+        )
+
+
+class _FakeReplanAgent(Agent):
+    async def _run(self, input_):
+        executed = [r.executed_task for r in input_.workflow_context.executed_task_results]
+        if executed == ["read a"]:
+            return ReplanAgentOutput(tasks=["summarize a"], response=None)
+        return ReplanAgentOutput(tasks=[], response=f"done after {executed}")
+
+
+class _CrashingSingleTaskAgent(Agent):
+    """
+    Runs two subtasks per task; crashes with `crash_error` after the first subtask of "read a"
+    while `crash` is set, after a status event unless `crash_silently` is set. Hangs after the first subtask of the `hang_on` task until cancelled.
+    """
+
+    def __init__(self):
+        self.crash = True
+        self.crash_silently = False
+        self.crash_error: Exception = RuntimeError("Ollama went away")
+        self.hang_on: str | None = None
+        self.cancelled: list[str] = []
+        self.started_with: dict[str, list[str]] = {}
+
+    def speculate(self, ctx):
+        pass
+
+    def cancel_speculation(self, reason="discarded"):
+        pass
+
+    async def _run_stream(self, input_):
+        self.started_with.setdefault(
+            input_.original_task, [r.subtask for r in input_.subtask_results]
+        )
+        for step in ("step 1", "step 2"):
+            if step in [r.subtask for r in input_.subtask_results]:
+                continue
+            yield AgentStreamEvent(type="status", message=step)
+            input_.subtask_results.append(SubtaskResult(subtask=step, result="ok"))
+            if self.crash and input_.original_task == "read a":
+                if not self.crash_silently:
+                    yield AgentStreamEvent(type="status", message="next")
+                raise self.crash_error
+            if input_.original_task == self.hang_on:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    self.cancelled.append(input_.original_task)
+                    raise
+        yield AgentStreamEvent(
+            type="output",
+            output=SingleTaskAgentOutput(
+                executed_task=input_.original_task,
+                result=f"result of {input_.original_task}",
+            ),
+        )
+
+
+def _fake_agent_workflow(tmp_path, single_task_agent, **settings) -> EasylocaiWorkflow:
+    workflow = EasylocaiWorkflow(
+        config_dict={
+            "mcpServers": {},
+            "workflow": {"checkpoint_dir": str(tmp_path), **settings},
+        },
+        search_engine=None,
+        ollama_client=None,
+    )
+    workflow._initialized = True
+    workflow._plan_agent = _FakePlanAgent()
+    workflow._replan_agent = _FakeReplanAgent()
+    workflow._single_task_agent = single_task_agent
+    return workflow
+
+
+class TestCheckpointResume:
+    @pytest.fixture
+    def single_task_agent(self):
+        return _CrashingSingleTaskAgent()
+
+    @pytest.fixture
+    def workflow(self, tmp_path, single_task_agent):
+        return _fake_agent_workflow(tmp_path, single_task_agent)
+
+    async def test_resume_continues_interrupted_task(self, workflow, single_task_agent):
+        with pytest.raises(RuntimeError, match="Ollama went away"):
+            async for _ in workflow.run("Summarize a", global_context=GlobalContext()):
+                pass
+
+        checkpoint = workflow.load_checkpoint()
+        assert checkpoint.stage == "task"
+        assert [r.subtask for r in checkpoint.pending_task.subtask_results] == ["step 1"]
+
+        single_task_agent.crash = False
+        single_task_agent.started_with.clear()
+        global_context = GlobalContext()
+        outputs = [
+            o async for o in workflow.resume(checkpoint, global_context=global_context)
+        ]
+
+        assert single_task_agent.started_with == {"read a": ["step 1"], "summarize a": []}
+        assert outputs[-1].message == "done after ['read a', 'summarize a']"
+        assert global_context.conversation_histories[0].original_user_query == "Summarize a"
+        assert workflow.load_checkpoint() is None
+
+    async def test_crash_keeps_subtasks_finished_since_last_status(
+        self, workflow, single_task_agent
+    ):
+        single_task_agent.crash_silently = True
+        with pytest.raises(RuntimeError, match="Ollama went away"):
+            async for _ in workflow.run("Summarize a", global_context=GlobalContext()):
+                pass
+
+        checkpoint = workflow.load_checkpoint()
+        assert [r.subtask for r in checkpoint.pending_task.subtask_results] == ["step 1"]
+
+    def test_checkpointing_is_off_by_default(self):
+        assert WorkflowSettings().checkpoint_dir is None
+
+    async def test_resume_before_replan(self, workflow, single_task_agent):
+        single_task_agent.crash = False
+        ctx = WorkflowContext(
+            original_user_query="Summarize a",
+            task_list=["read a", "summarize a"],
+            executed_task_results=[ExecutedTaskResult(executed_task="read a", result="a")],
+        )
+        workflow._save_checkpoint("run1", "replan", ctx)
+
+        checkpoint = workflow.load_checkpoint("run1")
+        outputs = [o async for o in workflow.resume(checkpoint, global_context=GlobalContext())]
+
+        assert list(single_task_agent.started_with) == ["summarize a"]
+        assert outputs[-1].message == "done after ['read a', 'summarize a']"
+
+
+class TestDeadlines:
+    @pytest.fixture
+    def single_task_agent(self):
+        agent = _CrashingSingleTaskAgent()
+        agent.crash = False
+        return agent
+
+    async def test_run_deadline_answers_with_results_so_far(self, tmp_path, single_task_agent):
+        single_task_agent.hang_on = "summarize a"
+        workflow = _fake_agent_workflow(
+            tmp_path, single_task_agent, deadlines={"run": 0.2}
+        )
+        global_context = GlobalContext()
+
+        outputs = [o async for o in workflow.run("Summarize a", global_context=global_context)]
+
+        result = outputs[-1]
+        assert result.type == "result" and result.partial
+        assert "- read a: result of read a" in result.message
+        assert single_task_agent.cancelled == ["summarize a"]
+        assert global_context.conversation_histories[0].response == result.message
+        # The checkpoint is kept, so the run can still be resumed
+        assert workflow.load_checkpoint().stage == "task"
+
+    async def test_task_deadline_records_partial_task(self, tmp_path, single_task_agent):
+        single_task_agent.hang_on = "read a"
+        workflow = _fake_agent_workflow(
+            tmp_path, single_task_agent, deadlines={"task": 0.05}
+        )
+
+        outputs = [o async for o in workflow.run("Summarize a", global_context=GlobalContext())]
+
+        assert single_task_agent.cancelled == ["read a"]
+        assert not outputs[-1].partial
+        assert outputs[-1].message == "done after ['read a', 'summarize a']"
+        assert workflow.load_checkpoint() is None
+
+    async def test_run_deadline_in_task_graph_answers_with_graph_results(
+        self, tmp_path, single_task_agent
+    ):
+        single_task_agent.hang_on = "summarize a"
+        workflow = _fake_agent_workflow(
+            tmp_path, single_task_agent, execution_mode="task_graph", deadlines={"run": 0.2}
+        )
+        workflow._plan_agent = _FakePlanAgent(task_dependencies=[[], [0]])
+        workflow._parallel_task_agents = [single_task_agent]
+
+        outputs = [o async for o in workflow.run("Summarize a", global_context=GlobalContext())]
+
+        result = outputs[-1]
+        assert result.type == "result" and result.partial
+        assert "- read a: result of read a" in result.message
+        assert single_task_agent.cancelled == ["summarize a"]
+
+    async def test_timeout_inside_task_is_not_a_deadline(self, tmp_path, single_task_agent):
+        single_task_agent.crash = True
+        single_task_agent.crash_error = TimeoutError("MCP tool call timed out")
+        workflow = _fake_agent_workflow(tmp_path, single_task_agent, deadlines={"task": 10})
+
+        with pytest.raises(TimeoutError, match="MCP tool call timed out"):
+            async for _ in workflow.run("Summarize a", global_context=GlobalContext()):
+                pass
+
+    async def test_timeout_inside_task_graph_task_is_not_a_deadline(
+        self, tmp_path, single_task_agent
+    ):
+        single_task_agent.crash = True
+        single_task_agent.crash_error = TimeoutError("MCP tool call timed out")
+        workflow = _fake_agent_workflow(
+            tmp_path, single_task_agent, execution_mode="task_graph", deadlines={"task": 10}
+        )
+        workflow._parallel_task_agents = [single_task_agent]
+        ctx = WorkflowContext(original_user_query="Summarize a")
+        tasks = ["read a", "summarize a"]
+
+        with pytest.raises(TimeoutError, match="MCP tool call timed out"):
+            async for _ in workflow._execute_task_graph(ctx, TaskGraph(tasks, [[], [0]])):
+                pass
+
+    async def test_task_deadline_in_task_graph(self, tmp_path, single_task_agent):
+        single_task_agent.hang_on = "read a"
+        workflow = _fake_agent_workflow(
+            tmp_path,
+            single_task_agent,
+            execution_mode="task_graph",
+            deadlines={"task": 0.05},
+        )
+        workflow._parallel_task_agents = [single_task_agent]
+        ctx = WorkflowContext(original_user_query="Summarize a")
+        tasks = ["read a", "summarize a"]
+
+        async for _ in workflow._execute_task_graph(ctx, TaskGraph(tasks, [[], [0]])):
+            pass
+
+        first, second = ctx.executed_task_results
+        assert first.result.startswith("The task did not finish within its deadline.")
+        assert "- step 1: ok" in first.result
+        assert second.result == "result of summarize a"
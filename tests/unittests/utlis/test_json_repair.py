@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from easylocai.utlis.json_repair import repair_json
+
+
+class TestRepairJson:
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ('{"a": 1}', {"a": 1}),
+            ('```json\n{"a": [1, 2]}\n```', {"a": [1, 2]}),
+            ('Here is the result: {"a": 1} Let me know!', {"a": 1}),
+            ('{"a": 1,}', {"a": 1}),
+            ('{"a": [1, 2,], "b": "x, }"}', {"a": [1, 2], "b": "x, }"}),
+            ('{"a": "unterminated', {"a": "unterminated"}),
+            ('{"a": {"b": "c"}', {"a": {"b": "c"}}),
+            ('{"a": ["x", "y",', {"a": ["x", "y"]}),
+            ('{"a": 1, "b"', {"a": 1}),
+            ('{"a": 1, "b":', {"a": 1}),
+            ('{"a": "x\\', {"a": "x"}),
+        ],
+    )
+    def test_repair(self, text, expected):
+        assert json.loads(repair_json(text)) == expected
+
+    def test_string_values_are_untouched_when_valid(self):
+        text = '{"a": "x, }"}'
+
+        assert repair_json(text) == text
+
+    def test_no_object(self):
+        assert repair_json("I cannot answer that.") is None
@@ -0,0 +1,66 @@
+import pytest
+
+from easylocai.utlis.json_stream import IncrementalJSONObjectParser
+
+
+def feed_all(parser: IncrementalJSONObjectParser, chunks: list[str]) -> list:
+    fields = []
+    for chunk in chunks:
+        fields.extend(parser.feed(chunk))
+    return fields
+
+
+class TestIncrementalJSONObjectParser:
+    def test_fields_are_reported_when_complete(self):
+        parser = IncrementalJSONObjectParser()
+
+        assert parser.feed('{"subtask": "List ') == []
+        assert parser.feed('files", "subtask_type"') == [("subtask", "List files")]
+        assert parser.feed(': "tool", "finished": false') == [("subtask_type", "tool")]
+        assert not parser.done
+        assert parser.feed(', "finished_reason": null}') == [
+            ("finished", False),
+            ("finished_reason", None),
+        ]
+        assert parser.done
+        assert parser.text == (
+            '{"subtask": "List files", "subtask_type": "tool", '
+            '"finished": false, "finished_reason": null}'
+        )
+
+    @pytest.mark.parametrize(
+        "chunks,expected_fields",
+        [
+            (
+                ['{"tasks": ["a, b", "{c}"]', ', "response": "x"}'],
+                [("tasks", ["a, b", "{c}"]), ("response", "x")],
+            ),
+            (
+                ['{"a": {"b": [1, 2]}, "c": "quote \\" , }"}'],
+                [("a", {"b": [1, 2]}), ("c", 'quote " , }')],
+            ),
+            (['{}'], []),
+        ],
+    )
+    def test_nested_values_and_strings(self, chunks, expected_fields):
+        parser = IncrementalJSONObjectParser()
+
+        assert feed_all(parser, chunks) == expected_fields
+        assert parser.done
+
+    def test_ignores_text_around_object(self):
+        parser = IncrementalJSONObjectParser()
+
+        fields = feed_all(parser, ["```json\n", '{"a": 1}', "\n```", " trailing"])
+
+        assert fields == [("a", 1)]
+        assert parser.text == '{"a": 1}'
+
+    def test_single_character_chunks(self):
+        parser = IncrementalJSONObjectParser()
+        text = '{"subtask": null, "finished": true}'
+
+        fields = feed_all(parser, list(text))
+
+        assert fields == [("subtask", None), ("finished", True)]
+        assert parser.text == text